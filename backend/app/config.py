@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -10,6 +11,45 @@ class Settings(BaseSettings):
     uri: str = "bolt://localhost:7687"
     user: str = "neo4j"
     password: str = "supplymap-dev"
+    # "cypher" runs traversals in Neo4j; "snapshot" answers them from an in-process copy of the graph.
+    query_backend: Literal["cypher", "snapshot"] = "cypher"
+    # Answer impact requests from the precomputed reachability index (built from the snapshot).
+    reachability_index: bool = False
+    reachability_index_path: str = ""
+    # Per-company dominator (single point of failure) index; built on first use unless saved here.
+    dominator_index_path: str = ""
+    # Cypher form: "split" runs separate nodes/edges queries, "single" expands paths once per request,
+    # "distance" reads supply chains from the UPSTREAM_OF tier distance table (split while it is stale).
+    query_mode: Literal["split", "single", "distance"] = "split"
+    # Serve routes through the AsyncGraphDatabase driver instead of the sync driver + threadpool.
+    async_mode: bool = False
+    max_connection_pool_size: int = 100
+    connection_acquisition_timeout: float = 60.0
+    # Result cache for supply-chain/impact; dropped whenever the GraphMeta version marker changes.
+    cache_enabled: bool = True
+    cache_max_entries: int = 256
+    cache_ttl_seconds: float = 300.0
+    graph_version_check_seconds: float = 2.0
+    # Identical concurrent supply-chain/impact computations share one in-flight call.
+    singleflight_enabled: bool = True
+    # Recently served graph results kept for ?since= delta responses.
+    delta_history_entries: int = 64
+    # Graph write batches (POST /api/graph/batch): rows per write transaction, change records kept.
+    write_chunk_size: int = 1000
+    change_log_entries: int = 1000
+    # Background jobs (criticality sweep): concurrent jobs, and impact queries in flight per sweep.
+    job_workers: int = 2
+    sweep_workers: int = 8
+    # Map viewport queries: below cluster_max_zoom, nodes sharing a cluster_cell_px grid cell are merged.
+    cluster_max_zoom: int = 10
+    cluster_cell_px: int = 64
+    # Metrics: log queries slower than slow_query_ms (0 disables), optionally re-running them with PROFILE.
+    slow_query_ms: float = 500.0
+    slow_query_profile: bool = False
+    # /health reports the result of a background connectivity check run this often.
+    health_check_seconds: float = 10.0
+    # Debug: build and validate Pydantic models for graph responses instead of encoding dicts directly.
+    validate_responses: bool = False
 
     class Config:
         env_prefix = "NEO4J_"
@@ -1,17 +1,23 @@
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase, GraphDatabase
 
 from app.config import settings
 
 _driver = None
+_async_driver = None
+
+
+def _driver_config() -> dict:
+    return {
+        "auth": (settings.user, settings.password),
+        "max_connection_pool_size": settings.max_connection_pool_size,
+        "connection_acquisition_timeout": settings.connection_acquisition_timeout,
+    }
 
 
 def get_driver():
     global _driver
     if _driver is None:
-        _driver = GraphDatabase.driver(
-            settings.uri,
-            auth=(settings.user, settings.password),
-        )
+        _driver = GraphDatabase.driver(settings.uri, **_driver_config())
     return _driver
 
 
@@ -20,3 +26,17 @@ def close_driver():
     if _driver is not None:
         _driver.close()
         _driver = None
+
+
+def get_async_driver():
+    global _async_driver
+    if _async_driver is None:
+        _async_driver = AsyncGraphDatabase.driver(settings.uri, **_driver_config())
+    return _async_driver
+
+
+async def close_async_driver():
+    global _async_driver
+    if _async_driver is not None:
+        await _async_driver.close()
+        _async_driver = None
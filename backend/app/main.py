@@ -1,24 +1,64 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+import time
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
-from app.database import close_driver, get_driver
+from app import metrics
+from app.config import settings
+from app.database import close_async_driver, close_driver, get_async_driver, get_driver
 from app.routes import api_router
+from app.services.cache import result_cache
+from app.services.singleflight import flights
 
 logger = logging.getLogger(__name__)
 
 
+# Last background connectivity check, served by /health without a round trip.
+_health = {"neo4j": "unknown", "detail": None, "checked_at": None}
+
+
+async def _check_neo4j():
+    try:
+        if settings.async_mode:
+            await get_async_driver().verify_connectivity()
+        else:
+            await run_in_threadpool(get_driver().verify_connectivity)
+        _health.update(neo4j="connected", detail=None)
+        metrics.NEO4J_UP.set(1)
+    except Exception as e:
+        _health.update(neo4j="disconnected", detail=str(e))
+        metrics.NEO4J_UP.set(0)
+    _health["checked_at"] = time.time()
+
+
+async def _health_loop():
+    while True:
+        await asyncio.sleep(settings.health_check_seconds)
+        await _check_neo4j()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    try:
-        get_driver().verify_connectivity()
+    await _check_neo4j()
+    if _health["neo4j"] == "connected":
         logger.info("Neo4j connected")
-    except Exception as e:
-        logger.warning("Neo4j not available at startup: %s. Start Neo4j (docker compose up -d) and retry API calls.", e)
+    else:
+        logger.warning(
+            "Neo4j not available at startup: %s. Start Neo4j (docker compose up -d) and retry API calls.",
+            _health["detail"],
+        )
+    health_task = asyncio.create_task(_health_loop())
     yield
+    health_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await health_task
     close_driver()
+    await close_async_driver()
 
 
 app = FastAPI(
@@ -32,14 +72,45 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 app.include_router(api_router)
 
 
-@app.get("/health")
-def health():
+def _route_template(request: Request) -> str:
+    """Path template of the matched route (e.g. /api/criticality/{job_id}), keeping label cardinality bounded."""
+    # FastAPI versions that include routers lazily leave the router-local route in scope["route"]
+    # and keep the prefixed path on the effective route context.
+    route = request.scope.get("fastapi", {}).get("effective_route_context") or request.scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    t0 = time.perf_counter()
+    status = 500
     try:
-        get_driver().verify_connectivity()
-        return {"status": "ok", "neo4j": "connected"}
-    except Exception as e:
-        return {"status": "ok", "neo4j": "disconnected", "detail": str(e)}
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.HTTP_LATENCY.labels(request.method, _route_template(request), str(status)).observe(
+            time.perf_counter() - t0
+        )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    body, content_type = metrics.render()
+    return Response(body, media_type=content_type)
+
+
+@app.get("/health")
+async def health():
+    """Cached health: the last background connectivity check, refreshed every health_check_seconds."""
+    age = time.time() - _health["checked_at"] if _health["checked_at"] else None
+    body = {"status": "ok", "neo4j": _health["neo4j"], "checked_seconds_ago": age, "cache": result_cache.stats()}
+    body["singleflight"] = flights.stats()
+    if _health["detail"]:
+        body["detail"] = _health["detail"]
+    return body
@@ -0,0 +1,203 @@
+"""Prometheus metrics, Cypher query instrumentation and the slow-query log.
+
+Read queries go through run/arun (or stream/astream for cursors consumed row by row), which
+record per-query latency, rows returned and Neo4j's ResultSummary timings, and log queries
+slower than `slow_query_ms` with their parameters and, if enabled, a PROFILE plan.
+"""
+import logging
+import re
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+
+from app.config import settings
+
+slow_logger = logging.getLogger("app.slow_query")
+
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_ROW_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+HTTP_LATENCY = Histogram(
+    "supplymap_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+QUERY_LATENCY = Histogram(
+    "supplymap_query_duration_seconds",
+    "Cypher query wall time, run to last record",
+    ["query"],
+    buckets=_LATENCY_BUCKETS,
+)
+QUERY_ROWS = Histogram("supplymap_query_rows", "Records returned per Cypher query", ["query"], buckets=_ROW_BUCKETS)
+QUERY_AVAILABLE_AFTER = Histogram(
+    "supplymap_query_result_available_after_seconds",
+    "Neo4j ResultSummary.result_available_after (server time to first record)",
+    ["query"],
+    buckets=_LATENCY_BUCKETS,
+)
+QUERY_CONSUMED_AFTER = Histogram(
+    "supplymap_query_result_consumed_after_seconds",
+    "Neo4j ResultSummary.result_consumed_after (server time to stream all records)",
+    ["query"],
+    buckets=_LATENCY_BUCKETS,
+)
+QUERY_ERRORS = Counter("supplymap_query_errors_total", "Cypher queries that raised", ["query"])
+SLOW_QUERIES = Counter("supplymap_slow_queries_total", "Cypher queries slower than slow_query_ms", ["query"])
+# Each running query holds one pooled connection, so this is the pool's in-use count from our side.
+QUERIES_IN_FLIGHT = Gauge("supplymap_neo4j_queries_in_flight", "Cypher queries currently running (connections in use)")
+POOL_MAX = Gauge("supplymap_neo4j_pool_max_size", "Configured driver connection pool size")
+POOL_MAX.set(settings.max_connection_pool_size)
+NEO4J_UP = Gauge("supplymap_neo4j_up", "1 if the last background health check reached Neo4j")
+
+
+class _CacheCollector:
+    """Expose result cache and single-flight counters at scrape time."""
+
+    def collect(self):
+        from app.services.cache import result_cache
+        from app.services.singleflight import flights
+
+        for name, value in result_cache.stats().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield GaugeMetricFamily(f"supplymap_cache_{name}", f"Result cache {name}", value=value)
+        stats = flights.stats()
+        yield CounterMetricFamily(
+            "supplymap_singleflight_leaders", "Computations run by single-flight leaders", value=stats["leaders"]
+        )
+        yield CounterMetricFamily(
+            "supplymap_singleflight_coalesced",
+            "Calls that waited on an identical in-flight computation instead of running their own",
+            value=stats["coalesced"],
+        )
+        yield GaugeMetricFamily(
+            "supplymap_singleflight_in_flight", "Distinct computations currently in flight", value=stats["in_flight"]
+        )
+
+
+REGISTRY.register(_CacheCollector())
+
+
+def render() -> tuple[bytes, str]:
+    """(body, content type) for the /metrics endpoint."""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+# ----- Query instrumentation -----
+
+
+def _summarize_params(params: dict) -> dict:
+    out = {}
+    for key, value in params.items():
+        if isinstance(value, (list, tuple)) and len(value) > 10:
+            out[key] = f"<{len(value)} items: {list(value[:5])!r}...>"
+        else:
+            out[key] = value
+    return out
+
+
+def _format_plan(plan, depth: int = 0) -> tuple[list[str], int]:
+    """Indented operator tree of a PROFILE plan and its total db hits."""
+    if not plan:
+        return [], 0
+    hits = plan.get("dbHits", 0) or 0
+    lines = [f"{'  ' * depth}{plan.get('operatorType')} rows={plan.get('rows')} dbHits={hits}"]
+    for child in plan.get("children", []):
+        child_lines, child_hits = _format_plan(child, depth + 1)
+        lines += child_lines
+        hits += child_hits
+    return lines, hits
+
+
+def _log_slow(name: str, query: str, params: dict, elapsed: float, plan=None):
+    SLOW_QUERIES.labels(name).inc()
+    text = re.sub(r"\s+", " ", query).strip()
+    message = f"slow query {name}: {elapsed * 1000:.1f} ms\n  cypher: {text}\n  params: {_summarize_params(params)}"
+    if plan is not None:
+        lines, hits = _format_plan(plan)
+        message += f"\n  profile ({hits} db hits):\n    " + "\n    ".join(lines)
+    slow_logger.warning(message)
+
+
+def _is_slow(elapsed: float) -> bool:
+    return settings.slow_query_ms > 0 and elapsed * 1000 >= settings.slow_query_ms
+
+
+def _observe(name: str, elapsed: float, rows: int, summary):
+    QUERY_LATENCY.labels(name).observe(elapsed)
+    QUERY_ROWS.labels(name).observe(rows)
+    if summary is not None:
+        if summary.result_available_after is not None:
+            QUERY_AVAILABLE_AFTER.labels(name).observe(summary.result_available_after / 1000)
+        if summary.result_consumed_after is not None:
+            QUERY_CONSUMED_AFTER.labels(name).observe(summary.result_consumed_after / 1000)
+
+
+def _finish(session, name: str, query: str, params: dict, elapsed: float):
+    if _is_slow(elapsed):
+        plan = None
+        if settings.slow_query_profile:
+            plan = session.run("PROFILE " + query, **params).consume().profile
+        _log_slow(name, query, params, elapsed, plan)
+
+
+async def _afinish(session, name: str, query: str, params: dict, elapsed: float):
+    if _is_slow(elapsed):
+        plan = None
+        if settings.slow_query_profile:
+            result = await session.run("PROFILE " + query, **params)
+            plan = (await result.consume()).profile
+        _log_slow(name, query, params, elapsed, plan)
+
+
+def run(session, name: str, query: str, **params) -> list:
+    """Run a read query on session and return all records, with metrics and slow-query logging."""
+    return list(stream(session, name, query, **params))
+
+
+def stream(session, name: str, query: str, **params):
+    """Yield the records of a read query as they arrive; metrics are recorded once it is consumed."""
+    t0 = time.perf_counter()
+    rows = 0
+    QUERIES_IN_FLIGHT.inc()
+    try:
+        result = session.run(query, **params)
+        for record in result:
+            rows += 1
+            yield record
+        summary = result.consume()
+    except Exception:
+        QUERY_ERRORS.labels(name).inc()
+        raise
+    finally:
+        QUERIES_IN_FLIGHT.dec()
+    elapsed = time.perf_counter() - t0
+    _observe(name, elapsed, rows, summary)
+    _finish(session, name, query, params, elapsed)
+
+
+async def arun(session, name: str, query: str, **params) -> list:
+    """Async run()."""
+    return [record async for record in astream(session, name, query, **params)]
+
+
+async def astream(session, name: str, query: str, **params):
+    """Async stream()."""
+    t0 = time.perf_counter()
+    rows = 0
+    QUERIES_IN_FLIGHT.inc()
+    try:
+        result = await session.run(query, **params)
+        async for record in result:
+            rows += 1
+            yield record
+        summary = await result.consume()
+    except Exception:
+        QUERY_ERRORS.labels(name).inc()
+        raise
+    finally:
+        QUERIES_IN_FLIGHT.dec()
+    elapsed = time.perf_counter() - t0
+    _observe(name, elapsed, rows, summary)
+    await _afinish(session, name, query, params, elapsed)
@@ -1,19 +1,61 @@
 from app.models.schemas import (
     CompanyOut,
+    CompanyPage,
+    CompoundImpactRequest,
+    CriticalNode,
+    CriticalNodesResponse,
+    CriticalityRequest,
+    CriticalityRow,
+    EntityOut,
+    EntityPage,
+    ExpandRequest,
+    ExpandResponse,
+    GraphBatch,
+    GraphChange,
     MapNode,
     MapEdge,
     SupplyChainRequest,
     SupplyChainResponse,
     ImpactRequest,
     ImpactResponse,
+    ImpactTarget,
+    JobStatus,
+    NetworkResponse,
+    NodeRef,
+    NodeUpsert,
+    PortfolioRequest,
+    RelRef,
+    RelUpsert,
+    Viewport,
 )
 
 __all__ = [
     "CompanyOut",
+    "CompanyPage",
+    "CompoundImpactRequest",
+    "CriticalNode",
+    "CriticalNodesResponse",
+    "CriticalityRequest",
+    "CriticalityRow",
+    "EntityOut",
+    "EntityPage",
+    "ExpandRequest",
+    "ExpandResponse",
+    "GraphBatch",
+    "GraphChange",
     "MapNode",
     "MapEdge",
     "SupplyChainRequest",
     "SupplyChainResponse",
     "ImpactRequest",
     "ImpactResponse",
+    "ImpactTarget",
+    "JobStatus",
+    "NetworkResponse",
+    "NodeRef",
+    "NodeUpsert",
+    "PortfolioRequest",
+    "RelRef",
+    "RelUpsert",
+    "Viewport",
 ]
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -10,36 +10,216 @@ class CompanyOut(BaseModel):
     lon: Optional[float] = None
 
 
+class EntityOut(BaseModel):
+    id: str
+    name: str
+
+
+class CompanyPage(BaseModel):
+    items: list[CompanyOut]
+    next_after: Optional[str] = Field(default=None, description="Pass as ?after= to fetch the next page")
+
+
+class EntityPage(BaseModel):
+    items: list[EntityOut]
+    next_after: Optional[str] = Field(default=None, description="Pass as ?after= to fetch the next page")
+
+
 class MapNode(BaseModel):
     id: str
     name: str
-    type: str = Field(description="Node label: Company, Supplier, Factory, Port, Country")
+    type: str = Field(description="Node label: Company, Supplier, Factory, Port, Country (or Cluster in viewport responses)")
     tier: Optional[int] = None
+    company_tier: Optional[int] = Field(
+        default=None, description="Supply chain: SUPPLIES_TO hops to the requested company (0 = the company)"
+    )
     lat: Optional[float] = None
     lon: Optional[float] = None
+    count: Optional[int] = Field(default=None, description="Number of nodes merged into a Cluster or rollup group")
+    sources: Optional[list[str]] = Field(
+        default=None,
+        description="Compound impact: ids of the targets reaching this node; portfolio: ids of the companies it supplies",
+    )
+    exposure: Optional[float] = Field(default=None, description="Weighted impact: share of supply lost, 0..1")
+    tier_counts: Optional[dict[str, int]] = Field(
+        default=None, description="Rollup groups: member suppliers per tier (count holds all members)"
+    )
 
 
 class MapEdge(BaseModel):
     from_id: str
     to_id: str
     type: str = Field(description="Relationship type: SUPPLIES_TO, DEPENDS_ON, SHIPS_VIA, LOCATED_IN")
+    count: Optional[int] = Field(default=None, description="Number of relationships merged between clusters")
+
+
+class Viewport(BaseModel):
+    min_lat: float = Field(ge=-90, le=90)
+    min_lon: float = Field(ge=-180, le=180)
+    max_lat: float = Field(ge=-90, le=90)
+    max_lon: float = Field(ge=-180, le=180)
+    zoom: int = Field(ge=0, le=22, description="Map zoom level; dense areas are clustered below cluster_max_zoom")
+
+
+Rollup = Literal["country", "port"]
 
 
 class SupplyChainRequest(BaseModel):
     company_id: str
     depth: int = Field(default=4, ge=1, le=4)
+    rollup: Optional[Rollup] = Field(default=None, description="Collapse nodes into Country or Port groups")
+    viewport: Optional[Viewport] = None
+
+
+class PortfolioRequest(BaseModel):
+    company_ids: list[str] = Field(min_length=1, max_length=1024)
+    depth: int = Field(default=4, ge=1, le=4)
+    viewport: Optional[Viewport] = None
 
 
 class SupplyChainResponse(BaseModel):
     nodes: list[MapNode]
     edges: list[MapEdge]
+    bounds: Optional[list[float]] = Field(
+        default=None, description="[min_lat, min_lon, max_lat, max_lon] of the whole result (viewport requests only)"
+    )
 
 
 class ImpactRequest(BaseModel):
     scenario: str = Field(description="supplier_failure or port_closure")
     target_id: str
+    weighted: bool = Field(default=False, description="Score each node's exposure by SUPPLIES_TO volume")
+    rollup: Optional[Rollup] = Field(default=None, description="Collapse nodes into Country or Port groups")
+    viewport: Optional[Viewport] = None
+
+
+class ImpactTarget(BaseModel):
+    kind: Literal["supplier", "port", "country"] = Field(
+        description="supplier fails, port closes, or country: every supplier and port LOCATED_IN it"
+    )
+    id: str
+
+
+class CompoundImpactRequest(BaseModel):
+    targets: list[ImpactTarget] = Field(min_length=1, max_length=1024)
+    viewport: Optional[Viewport] = None
 
 
 class ImpactResponse(BaseModel):
     nodes: list[MapNode]
     edges: list[MapEdge]
+    bounds: Optional[list[float]] = Field(
+        default=None, description="[min_lat, min_lon, max_lat, max_lon] of the whole result (viewport requests only)"
+    )
+
+
+class NetworkResponse(BaseModel):
+    nodes: list[MapNode]
+    edges: list[MapEdge]
+
+
+class ExpandRequest(BaseModel):
+    frontier: list[str] = Field(max_length=10000, description="Ids of the nodes to expand from")
+    known: list[str] = Field(default_factory=list, description="Ids the client already has; not returned again")
+    direction: Literal["upstream", "downstream"] = Field(
+        default="upstream",
+        description="upstream: next supplier tier (SUPPLIES_TO); downstream: SUPPLIES_TO/DEPENDS_ON (impact)",
+    )
+
+
+class ExpandResponse(BaseModel):
+    nodes: list[MapNode]
+    edges: list[MapEdge]
+    frontier: list[str] = Field(description="Ids of the newly reached nodes; send as the next frontier")
+
+
+class CriticalNode(MapNode):
+    cut: int = Field(description="Upstream nodes (itself included) that lose every supply path to the company if it fails")
+    share: float = Field(description="cut as a share of the company's upstream nodes")
+    single_point: bool = Field(description="On every supply path from every source supplier to the company")
+
+
+class CriticalNodesResponse(BaseModel):
+    company_id: str
+    upstream: int = Field(description="Nodes upstream of the company over SUPPLIES_TO")
+    nodes: list[CriticalNode] = Field(description="Critical suppliers and ports, largest cut first")
+
+
+class CriticalityRequest(BaseModel):
+    scenarios: list[Literal["supplier_failure", "port_closure"]] = Field(
+        default_factory=lambda: ["supplier_failure", "port_closure"], min_length=1
+    )
+    target_ids: Optional[list[str]] = Field(default=None, description="Defaults to every Supplier/Port")
+
+
+class CriticalityRow(BaseModel):
+    rank: int
+    scenario: str
+    target_id: str
+    target_name: str
+    companies: int = Field(description="Companies impacted")
+    suppliers: int = Field(description="Suppliers impacted (excluding the target)")
+    factories: int
+    nodes: int
+    edges: int
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    kind: str
+    params: dict
+    status: str = Field(description="pending, running, done or failed")
+    done: int
+    total: int
+    error: Optional[str] = None
+    created_at: float
+    finished_at: Optional[float] = None
+    result: Optional[list[CriticalityRow]] = None
+
+
+NodeLabel = Literal["Company", "Supplier", "Factory", "Port", "Country"]
+RelType = Literal["SUPPLIES_TO", "DEPENDS_ON", "SHIPS_VIA", "LOCATED_IN"]
+PropertyValue = Optional[str | int | float | bool]
+
+
+class NodeRef(BaseModel):
+    label: NodeLabel
+    id: str
+
+
+class NodeUpsert(NodeRef):
+    props: dict[str, PropertyValue] = Field(
+        default_factory=dict, description="Properties to set (name, tier, lat, lon, ...); null removes one"
+    )
+
+
+class RelRef(BaseModel):
+    type: RelType
+    from_label: NodeLabel
+    from_id: str
+    to_label: NodeLabel
+    to_id: str
+
+
+class RelUpsert(RelRef):
+    props: dict[str, PropertyValue] = Field(default_factory=dict, description="e.g. product, volume")
+
+
+class GraphBatch(BaseModel):
+    """Applied in order: node upserts, relationship upserts, relationship deletes, node deletes."""
+
+    upsert_nodes: list[NodeUpsert] = Field(default_factory=list, max_length=100000)
+    upsert_relationships: list[RelUpsert] = Field(default_factory=list, max_length=100000)
+    delete_relationships: list[RelRef] = Field(default_factory=list, max_length=100000)
+    delete_nodes: list[NodeRef] = Field(default_factory=list, max_length=100000, description="Detached and deleted")
+
+
+class GraphChange(BaseModel):
+    version: int = Field(description="Graph version produced by this batch")
+    at: str
+    nodes_upserted: int
+    relationships_upserted: int
+    relationships_deleted: int
+    nodes_deleted: int
+    node_ids: list[str] = Field(description="Ids of the nodes touched, including relationship endpoints")
+    complete: bool = Field(description="False if the batch failed part-way (earlier chunks stay applied)")
@@ -0,0 +1,181 @@
+"""Response helpers shared by the graph routes."""
+import json
+
+import msgpack
+import orjson
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+
+from app.config import settings
+from app.models.schemas import MapEdge, MapNode
+from app.services import delta, graph_version
+from app.services.cache import result_cache
+
+NDJSON = "application/x-ndjson"
+COLUMNAR_JSON = "application/vnd.supplymap.columnar+json"
+MSGPACK = "application/x-msgpack"
+
+
+def columnar(nodes: list[dict], edges: list[dict], edge_ids: bool = False) -> dict:
+    """Columnar encoding of a (nodes, edges) result.
+
+    Node properties become parallel arrays; node and edge types are small-int codes into
+    `node_types` / `edge_types`; edges are index pairs into the node arrays (-1 if an endpoint
+    is not among the returned nodes). With edge_ids, edges also carry `from_id` / `to_id`, for
+    deltas whose edges can end at nodes the client already has.
+    """
+    node_types: dict[str, int] = {}
+    edge_types: dict[str, int] = {}
+    node_codes = [node_types.setdefault(n["type"], len(node_types)) for n in nodes]
+    edge_codes = [edge_types.setdefault(e["type"], len(edge_types)) for e in edges]
+    index = {n["id"]: i for i, n in enumerate(nodes)}
+    payload = {
+        "format": "columnar-v1",
+        "node_types": list(node_types),
+        "nodes": {
+            "id": [n["id"] for n in nodes],
+            "name": [n["name"] for n in nodes],
+            "type": node_codes,
+            "tier": [n.get("tier") for n in nodes],
+            "lat": [n.get("lat") for n in nodes],
+            "lon": [n.get("lon") for n in nodes],
+        },
+        "edge_types": list(edge_types),
+        "edges": {
+            "from": [index.get(e["from_id"], -1) for e in edges],
+            "to": [index.get(e["to_id"], -1) for e in edges],
+            "type": edge_codes,
+        },
+    }
+    # Per-company tiers, cluster and rollup sizes, compound-impact sources and weighted-impact
+    # exposure are only sent when present.
+    if any("company_tier" in n for n in nodes):
+        payload["nodes"]["company_tier"] = [n.get("company_tier") for n in nodes]
+    if any("count" in n for n in nodes):
+        payload["nodes"]["count"] = [n.get("count") for n in nodes]
+    if any("sources" in n for n in nodes):
+        payload["nodes"]["sources"] = [n.get("sources") for n in nodes]
+    if any("exposure" in n for n in nodes):
+        payload["nodes"]["exposure"] = [n.get("exposure") for n in nodes]
+    if any("tier_counts" in n for n in nodes):
+        payload["nodes"]["tier_counts"] = [n.get("tier_counts") for n in nodes]
+    if any("count" in e for e in edges):
+        payload["edges"]["count"] = [e.get("count") for e in edges]
+    if edge_ids:
+        payload["edges"]["from_id"] = [e["from_id"] for e in edges]
+        payload["edges"]["to_id"] = [e["to_id"] for e in edges]
+    return payload
+
+
+async def result_version() -> int:
+    """Graph version to tag a result with; read it before computing the result.
+
+    The result then reflects at least this version, so a later ?since= delta from it can only
+    repeat changes the client already has, never miss one.
+    """
+    if settings.async_mode:
+        return await graph_version.aget_version()
+    return await run_in_threadpool(graph_version.get_version)
+
+
+async def graph_response(
+    request: Request,
+    nodes: list[dict],
+    edges: list[dict],
+    model,
+    version: int,
+    extra: dict | None = None,
+    since: str | None = None,
+):
+    """Serialize a (nodes, edges) result, choosing the encoding from the Accept header.
+
+    - application/vnd.supplymap.columnar+json: columnar JSON (see columnar())
+    - application/x-msgpack: the same columnar payload as MessagePack
+    - otherwise: row JSON. The dicts built by the service layer are encoded directly with orjson,
+      skipping per-item Pydantic construction and FastAPI's response_model re-validation. With
+      validate_responses enabled, a validated `model` (SupplyChainResponse/ImpactResponse) is returned.
+
+    `extra` holds additional top-level fields (e.g. bounds) added to every encoding.
+
+    Every response carries a weak ETag, the content hash of the result and `version`, the graph
+    version read before it was computed (see result_version() and delta.py); a request whose If-None-Match matches the hash gets 304 Not Modified. With `since`
+    (an ETag the client got earlier for the same request), the response is instead a delta in the
+    same encoding, with `delta_base`: added or changed `nodes` and `edges` plus `removed_nodes`
+    (ids) and `removed_edges` if that result is still in this process's history, otherwise the
+    nodes and edges near the changes logged since its version plus `node_ids` (see delta.region).
+    If neither is available the full result is returned, without `delta_base`.
+
+    Hashing and encoding run in the threadpool; the hash of a cached result is computed once.
+    """
+    return await run_in_threadpool(_graph_response, request, nodes, edges, model, version, extra or {}, since)
+
+
+def _graph_response(request: Request, nodes, edges, model, version: int, extra: dict, since: str | None):
+    digest = delta.with_extra(result_cache.digest(nodes, lambda: delta.content_hash(nodes, edges)), extra)
+    headers = {"ETag": delta.make_etag(digest, version), "Vary": "Accept"}
+    if delta.matches(request.headers.get("if-none-match"), digest):
+        return Response(status_code=304, headers=headers)
+    changes = _delta(nodes, edges, digest, version, since) if since else None
+    delta.history.put(digest, nodes, edges)
+    if changes is not None:
+        changed_nodes, changed_edges = changes.pop("nodes"), changes.pop("edges")
+        fields = {**changes, "delta_base": since.strip(), **extra}
+        return _encode(request, changed_nodes, changed_edges, fields, headers, edge_ids=True)
+    if settings.validate_responses and not _wants_columnar(request):
+        validated = model(nodes=[MapNode(**n) for n in nodes], edges=[MapEdge(**e) for e in edges], **extra)
+        return Response(validated.model_dump_json(), media_type="application/json", headers=headers)
+    return _encode(request, nodes, edges, extra, headers)
+
+
+def _delta(nodes, edges, digest: str, version, since: str) -> dict | None:
+    base_digest, base_version = delta.parse_etag(since)
+    if base_digest == digest:
+        return {"nodes": [], "edges": [], "removed_nodes": [], "removed_edges": []}
+    base = delta.history.get(base_digest)
+    if base is not None:
+        return delta.diff(base, (nodes, edges))
+    # Same version but another hash means another request: the change log cannot relate the two.
+    if base_version is None or version is None or base_version >= version:
+        return None
+    changed = graph_version.changes_between(base_version, version)
+    return None if changed is None else delta.region(nodes, edges, changed)
+
+
+def _wants_columnar(request: Request) -> bool:
+    accept = request.headers.get("accept", "")
+    return COLUMNAR_JSON in accept or MSGPACK in accept or "application/msgpack" in accept
+
+
+def _encode(request: Request, nodes, edges, fields: dict, headers: dict, edge_ids: bool = False) -> Response:
+    accept = request.headers.get("accept", "")
+    if COLUMNAR_JSON in accept:
+        payload = {**columnar(nodes, edges, edge_ids), **fields}
+        return Response(orjson.dumps(payload), media_type=COLUMNAR_JSON, headers=headers)
+    if MSGPACK in accept or "application/msgpack" in accept:
+        return Response(msgpack.packb({**columnar(nodes, edges, edge_ids), **fields}), media_type=MSGPACK, headers=headers)
+    return Response(orjson.dumps({"nodes": nodes, "edges": edges, **fields}), media_type="application/json", headers=headers)
+
+
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    """True if the client asked for a streamed response (?stream=true or Accept: application/x-ndjson)."""
+    return stream or NDJSON in request.headers.get("accept", "")
+
+
+def _lines(items):
+    for kind, data in items:
+        yield json.dumps({kind: data}, separators=(",", ":")) + "\n"
+
+
+async def _alines(items):
+    async for kind, data in items:
+        yield json.dumps({kind: data}, separators=(",", ":")) + "\n"
+
+
+def ndjson_response(items) -> StreamingResponse:
+    """Stream ("node" | "edge", dict) items as one {"node": {...}} / {"edge": {...}} object per line.
+
+    Accepts a sync iterator (run in the threadpool by Starlette) or an async iterator.
+    """
+    lines = _alines(items) if hasattr(items, "__aiter__") else _lines(items)
+    return StreamingResponse(lines, media_type=NDJSON)
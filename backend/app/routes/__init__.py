@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.routes import companies, suppliers, ports, supply_chain, impact
+from app.routes import companies, suppliers, ports, supply_chain, impact, network, expand, criticality, graph
 
 api_router = APIRouter(prefix="/api")
 api_router.include_router(companies.router, prefix="/companies")
@@ -8,3 +8,7 @@ api_router.include_router(suppliers.router, prefix="/suppliers")
 api_router.include_router(ports.router, prefix="/ports")
 api_router.include_router(supply_chain.router, prefix="/supply-chain")
 api_router.include_router(impact.router, prefix="/impact")
+api_router.include_router(expand.router, prefix="/expand")
+api_router.include_router(network.router, prefix="/network")
+api_router.include_router(criticality.router, prefix="/criticality")
+api_router.include_router(graph.router, prefix="/graph")
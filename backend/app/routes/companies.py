@@ -1,15 +1,30 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 
-from app.models.schemas import CompanyOut
-from app.services.queries import list_companies
+from app.models.schemas import CompanyPage, CriticalNodesResponse
+from app.services import dominators, name_index
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[CompanyOut])
-def get_companies():
-    """List all companies for dropdowns."""
-    rows = list_companies()
-    if not rows:
-        return []
-    return [CompanyOut(**r) for r in rows]
+@router.get("", response_model=CompanyPage)
+async def get_companies(
+    q: str | None = Query(None, description="Case-insensitive name prefix"),
+    after: str | None = Query(None, description="Cursor from the previous page's next_after"),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Page through companies by name for dropdowns."""
+    try:
+        return await name_index.list_page("Company", after, limit, q)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{company_id}/critical-nodes", response_model=CriticalNodesResponse)
+async def get_critical_nodes(company_id: str, limit: int = Query(100, ge=1, le=10000)):
+    """Single points of failure of a company: the suppliers and ports whose failure cuts off part
+    (or, with single_point, all) of its supply, from the precomputed dominator index."""
+    result = await run_in_threadpool(dominators.critical_nodes, company_id, limit)
+    if result is None:
+        raise HTTPException(status_code=404, detail="company not found")
+    return result
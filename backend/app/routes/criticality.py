@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from app.models.schemas import CriticalityRequest, JobStatus
+from app.services import criticality, jobs
+
+router = APIRouter()
+
+
+@router.post("", response_model=JobStatus, status_code=202)
+async def post_criticality(body: CriticalityRequest):
+    """Start a criticality sweep (impact of every supplier failure / port closure, ranked).
+
+    Poll GET /api/criticality/{job_id} for progress and the ranked result.
+    """
+    scenarios = list(dict.fromkeys(body.scenarios))
+    job = jobs.submit(
+        "criticality",
+        {"scenarios": scenarios, "target_ids": body.target_ids},
+        lambda progress: criticality.cached_sweep(scenarios, body.target_ids, progress),
+    )
+    return job.to_dict(include_result=False)
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_criticality(job_id: str, limit: int = Query(100, ge=1, le=100000)):
+    """Status and progress of a sweep; once done, the top `limit` rows of the ranking."""
+    job = jobs.get_job(job_id)
+    if job is None or job.kind != "criticality":
+        raise HTTPException(status_code=404, detail="job not found")
+    status = job.to_dict()
+    if status["result"] is not None:
+        status["result"] = status["result"][:limit]
+    return status
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.schemas import ExpandRequest, ExpandResponse
+from app.responses import graph_response, result_version
+from app.services import async_queries
+from app.services.queries import expand
+
+router = APIRouter()
+
+
+@router.post("", response_model=ExpandResponse)
+async def post_expand(body: ExpandRequest, request: Request):
+    """Return the next hop from the frontier nodes (and its map context), without the nodes the
+    client already knows, so a chain can be grown one tier at a time."""
+    version = await result_version()
+    if settings.async_mode:
+        nodes, edges, frontier = await async_queries.expand(body.frontier, body.known, body.direction)
+    else:
+        nodes, edges, frontier = await run_in_threadpool(expand, body.frontier, body.known, body.direction)
+    return await graph_response(request, nodes, edges, ExpandResponse, version, {"frontier": frontier})
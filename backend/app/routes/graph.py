@@ -0,0 +1,30 @@
+import logging
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+
+from app.models.schemas import GraphBatch, GraphChange
+from app.services import writes
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.post("/batch", response_model=GraphChange)
+async def post_batch(body: GraphBatch):
+    """Apply node and relationship upserts (MERGE by id) and deletes, in chunked write transactions.
+
+    Returns the change record: the new graph version and the ids of the nodes touched. Batches
+    are idempotent, so one that failed part-way can be sent again.
+    """
+    try:
+        return await run_in_threadpool(writes.apply_batch, body)
+    except Exception as e:
+        logger.exception("Graph batch error")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/changes", response_model=list[GraphChange])
+async def get_changes(since: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    """Change records of batches applied after graph version `since`, oldest first."""
+    return await run_in_threadpool(writes.list_changes, since, limit)
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
 
-from app.models.schemas import ImpactRequest, ImpactResponse, MapNode, MapEdge
-from app.services.queries import get_impact
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.schemas import CompoundImpactRequest, ImpactRequest, ImpactResponse
+from app.responses import graph_response, ndjson_response, result_version, wants_ndjson
+from app.services import async_queries, geo, rollup
+from app.services.queries import get_compound_impact, get_impact, get_weighted_impact, iter_impact
 
 router = APIRouter()
 
@@ -9,12 +15,50 @@ ALLOWED_SCENARIOS = {"supplier_failure", "port_closure"}
 
 
 @router.post("", response_model=ImpactResponse)
-def post_impact(body: ImpactRequest):
-    """Return nodes and edges for impact of a disruption (supplier_failure or port_closure)."""
+async def post_impact(body: ImpactRequest, request: Request, stream: bool = False, since: Optional[str] = None):
+    """Return nodes and edges for impact of a disruption (supplier_failure or port_closure).
+
+    With weighted=true, every node also gets an `exposure` score: the share of its supply lost,
+    propagated downstream by SUPPLIES_TO volume. Rollup and viewport work as for the supply
+    chain. With ?stream=true or Accept: application/x-ndjson, unweighted nodes then edges are
+    streamed as NDJSON (rollup and viewport are ignored). Responses carry an ETag (304 on a
+    matching If-None-Match); ?since=<etag> returns only the changes since that result.
+    """
     if body.scenario not in ALLOWED_SCENARIOS:
         raise HTTPException(400, detail=f"scenario must be one of {ALLOWED_SCENARIOS}")
-    nodes, edges = get_impact(body.scenario, body.target_id)
-    return ImpactResponse(
-        nodes=[MapNode(**n) for n in nodes],
-        edges=[MapEdge(**e) for e in edges],
-    )
+    version = await result_version()
+    if body.weighted:
+        if settings.async_mode:
+            nodes, edges = await async_queries.get_weighted_impact(body.scenario, body.target_id)
+        else:
+            nodes, edges = await run_in_threadpool(get_weighted_impact, body.scenario, body.target_id)
+    elif wants_ndjson(request, stream):
+        if settings.async_mode:
+            return ndjson_response(async_queries.aiter_impact(body.scenario, body.target_id))
+        return ndjson_response(iter_impact(body.scenario, body.target_id))
+    elif settings.async_mode:
+        nodes, edges = await async_queries.get_impact(body.scenario, body.target_id)
+    else:
+        nodes, edges = await run_in_threadpool(get_impact, body.scenario, body.target_id)
+    if body.rollup is not None:
+        nodes, edges = await run_in_threadpool(rollup.rollup, nodes, edges, body.rollup)
+    extra = None
+    if body.viewport is not None:
+        nodes, edges, extra = await run_in_threadpool(geo.apply_viewport, nodes, edges, body.viewport)
+    return await graph_response(request, nodes, edges, ImpactResponse, version, extra, since)
+
+
+@router.post("/compound", response_model=ImpactResponse)
+async def post_compound_impact(body: CompoundImpactRequest, request: Request):
+    """Return the combined impact of several suppliers failing, ports closing and countries
+    going offline at once. Each node lists the target ids that reach it in `sources`."""
+    targets = [(t.kind, t.id) for t in body.targets]
+    version = await result_version()
+    if settings.async_mode:
+        nodes, edges = await async_queries.get_compound_impact(targets)
+    else:
+        nodes, edges = await run_in_threadpool(get_compound_impact, targets)
+    extra = None
+    if body.viewport is not None:
+        nodes, edges, extra = await run_in_threadpool(geo.apply_viewport, nodes, edges, body.viewport)
+    return await graph_response(request, nodes, edges, ImpactResponse, version, extra)
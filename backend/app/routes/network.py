@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.schemas import NetworkResponse, Viewport
+from app.responses import graph_response, result_version
+from app.services import async_queries
+from app.services.queries import get_network
+
+router = APIRouter()
+
+
+@router.get("", response_model=NetworkResponse)
+async def get_network_view(request: Request, viewport: Viewport = Depends()):
+    """Return every company, supplier, factory and port inside the viewport, with the
+    SUPPLIES_TO/SHIPS_VIA links between them; dense areas are clustered at low zoom."""
+    version = await result_version()
+    if settings.async_mode:
+        nodes, edges = await async_queries.get_network(viewport)
+    else:
+        nodes, edges = await run_in_threadpool(get_network, viewport)
+    return await graph_response(request, nodes, edges, NetworkResponse, version)
@@ -1,10 +1,19 @@
-from fastapi import APIRouter
-from app.services.queries import list_ports
+from fastapi import APIRouter, HTTPException, Query
+
+from app.models.schemas import EntityPage
+from app.services import name_index
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[dict])
-def get_ports():
-    """List ports for impact target dropdown."""
-    return list_ports()
+@router.get("", response_model=EntityPage)
+async def get_ports(
+    q: str | None = Query(None, description="Case-insensitive name prefix"),
+    after: str | None = Query(None, description="Cursor from the previous page's next_after"),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Page through ports by name for the impact target dropdown."""
+    try:
+        return await name_index.list_page("Port", after, limit, q)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
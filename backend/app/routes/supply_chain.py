@@ -1,23 +1,61 @@
 import logging
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 
-from app.models.schemas import SupplyChainRequest, SupplyChainResponse, MapNode, MapEdge
-from app.services.queries import get_supply_chain
+from app.config import settings
+from app.models.schemas import PortfolioRequest, SupplyChainRequest, SupplyChainResponse
+from app.responses import graph_response, ndjson_response, result_version, wants_ndjson
+from app.services import async_queries, geo, rollup
+from app.services.queries import get_portfolio, get_supply_chain, iter_supply_chain
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.post("", response_model=SupplyChainResponse)
-def post_supply_chain(body: SupplyChainRequest):
-    """Return nodes and edges for the supply chain (company + upstream) up to given depth."""
+async def post_supply_chain(body: SupplyChainRequest, request: Request, stream: bool = False, since: Optional[str] = None):
+    """Return nodes and edges for the supply chain (company + upstream) up to given depth.
+
+    With rollup="country" or "port", nodes are collapsed into one node per Country or Port with
+    member and per-tier supplier counts. With a viewport, only nodes inside it are returned
+    (clustered at low zoom) along with the bounds of the whole result. With ?stream=true or
+    Accept: application/x-ndjson, nodes then edges are streamed as NDJSON (rollup and viewport
+    are ignored). Responses carry an ETag (304 on a matching If-None-Match); ?since=<etag>
+    returns only the changes since that result.
+    """
+    if wants_ndjson(request, stream):
+        if settings.async_mode:
+            return ndjson_response(async_queries.aiter_supply_chain(body.company_id, body.depth))
+        return ndjson_response(iter_supply_chain(body.company_id, body.depth))
     try:
-        nodes, edges = get_supply_chain(body.company_id, body.depth)
-        return SupplyChainResponse(
-            nodes=[MapNode(**n) for n in nodes],
-            edges=[MapEdge(**e) for e in edges],
-        )
+        version = await result_version()
+        if settings.async_mode:
+            nodes, edges = await async_queries.get_supply_chain(body.company_id, body.depth)
+        else:
+            nodes, edges = await run_in_threadpool(get_supply_chain, body.company_id, body.depth)
+        if body.rollup is not None:
+            nodes, edges = await run_in_threadpool(rollup.rollup, nodes, edges, body.rollup)
+        extra = None
+        if body.viewport is not None:
+            nodes, edges, extra = await run_in_threadpool(geo.apply_viewport, nodes, edges, body.viewport)
+        return await graph_response(request, nodes, edges, SupplyChainResponse, version, extra, since)
     except Exception as e:
         logger.exception("Supply chain error")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/portfolio", response_model=SupplyChainResponse)
+async def post_portfolio(body: PortfolioRequest, request: Request, since: Optional[str] = None):
+    """Return the merged supply chains of several companies from one traversal, each node listing
+    the companies it supplies in `sources`. Viewport, ETag and ?since= work as for a single company."""
+    version = await result_version()
+    if settings.async_mode:
+        nodes, edges = await async_queries.get_portfolio(body.company_ids, body.depth)
+    else:
+        nodes, edges = await run_in_threadpool(get_portfolio, body.company_ids, body.depth)
+    extra = None
+    if body.viewport is not None:
+        nodes, edges, extra = await run_in_threadpool(geo.apply_viewport, nodes, edges, body.viewport)
+    return await graph_response(request, nodes, edges, SupplyChainResponse, version, extra, since)
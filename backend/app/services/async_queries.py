@@ -0,0 +1,169 @@
+"""Async versions of the queries in queries.py, built on the AsyncGraphDatabase driver.
+
+Query text is shared with queries.py; the two queries of the split form run concurrently
+on separate sessions.
+"""
+import asyncio
+
+from app import metrics
+from app.config import settings
+from app.database import get_async_driver
+from app.services import geo, reachability, snapshot
+from app.services.cache import acached
+from app.services.queries import (
+    _clamp_depth,
+    _distance_record_to_result,
+    _expand_query,
+    _impact_single_query,
+    _impact_split_queries,
+    _iter_result,
+    _network_queries,
+    _node_to_map_node,
+    _rows_to_edges,
+    _rows_to_nodes,
+    _single_record_to_result,
+    _supply_chain_distance_query,
+    _supply_chain_single_query,
+    _supply_chain_split_queries,
+    _viewport_params,
+)
+
+
+async def _fetch(name: str, q: str, **params) -> list:
+    """Run q in its own session and return all records."""
+    async with get_async_driver().session() as session:
+        return await metrics.arun(session, name, q, **params)
+
+
+async def _fetch_single(name: str, q: str, **params):
+    records = await _fetch(name, q, **params)
+    return records[0] if records else None
+
+
+async def get_supply_chain(company_id: str, depth: int) -> tuple[list[dict], list[dict]]:
+    """Async get_supply_chain; see queries.get_supply_chain."""
+    key = ("supply_chain", company_id, _clamp_depth(depth))
+    return await acached(key, lambda: _query_supply_chain(company_id, depth))
+
+
+async def get_impact(scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+    """Async get_impact; see queries.get_impact."""
+    return await acached(("impact", scenario, target_id), lambda: _query_impact(scenario, target_id))
+
+
+async def get_portfolio(company_ids: list[str], depth: int) -> tuple[list[dict], list[dict]]:
+    """Async get_portfolio; see queries.get_portfolio."""
+    ids = sorted(set(company_ids))
+    key = ("portfolio", tuple(ids), _clamp_depth(depth))
+    return await acached(key, lambda: asyncio.to_thread(snapshot.portfolio, ids, depth))
+
+
+async def get_weighted_impact(scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+    """Async get_weighted_impact; see queries.get_weighted_impact."""
+    key = ("weighted_impact", scenario, target_id)
+    return await acached(key, lambda: asyncio.to_thread(snapshot.weighted_impact, scenario, target_id))
+
+
+async def get_compound_impact(targets: list[tuple[str, str]]) -> tuple[list[dict], list[dict]]:
+    """Async get_compound_impact; see queries.get_compound_impact."""
+    targets = sorted(set(targets))
+    key = ("compound_impact", tuple(targets))
+    return await acached(key, lambda: asyncio.to_thread(snapshot.compound_impact, targets))
+
+
+async def _query_supply_chain(company_id: str, depth: int) -> tuple[list[dict], list[dict]]:
+    if settings.query_backend == "snapshot":
+        return await asyncio.to_thread(snapshot.get_supply_chain, company_id, depth)
+    if settings.query_mode == "distance":
+        record = await _fetch_single(
+            "supply_chain.distance", _supply_chain_distance_query(), company_id=company_id, depth=_clamp_depth(depth)
+        )
+        result = _distance_record_to_result(record, company_id)
+        if result is not None:
+            return result
+    if settings.query_mode == "single":
+        record = await _fetch_single("supply_chain.single", _supply_chain_single_query(depth), company_id=company_id)
+        return _single_record_to_result(record)
+    nodes_q, edges_q = _supply_chain_split_queries(depth)
+    node_records, edge_records = await asyncio.gather(
+        _fetch("supply_chain.nodes", nodes_q, company_id=company_id),
+        _fetch("supply_chain.edges", edges_q, company_id=company_id),
+    )
+    return _rows_to_nodes(node_records), _rows_to_edges(edge_records)
+
+
+async def _query_impact(scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+    if settings.reachability_index:
+        return await asyncio.to_thread(reachability.get_impact, scenario, target_id)
+    if settings.query_backend == "snapshot":
+        return await asyncio.to_thread(snapshot.get_impact, scenario, target_id)
+    if settings.query_mode == "single":
+        q = _impact_single_query(scenario)
+        if q is None:
+            return [], []
+        return _single_record_to_result(await _fetch_single(f"impact.{scenario}.single", q, target_id=target_id))
+    queries = _impact_split_queries(scenario)
+    if queries is None:
+        return [], []
+    nodes_q, edges_q = queries
+    node_records, edge_records = await asyncio.gather(
+        _fetch(f"impact.{scenario}.nodes", nodes_q, target_id=target_id),
+        _fetch(f"impact.{scenario}.edges", edges_q, target_id=target_id),
+    )
+    return _rows_to_nodes(node_records), _rows_to_edges(edge_records)
+
+
+async def expand(frontier: list[str], known: list[str], direction: str) -> tuple[list[dict], list[dict], list[str]]:
+    """Async expand; see queries.expand."""
+    if settings.query_backend == "snapshot":
+        return await asyncio.to_thread(snapshot.expand, frontier, known, direction)
+    record = await _fetch_single(f"expand.{direction}", _expand_query(direction), frontier=frontier, known=[*known, *frontier])
+    nodes, edges = _single_record_to_result(record)
+    return nodes, edges, record["frontier"] if record else []
+
+
+async def get_network(viewport) -> tuple[list[dict], list[dict]]:
+    """Async get_network; see queries.get_network."""
+    if settings.query_backend == "snapshot":
+        return await asyncio.to_thread(lambda: geo.network_from_snapshot(snapshot.get_snapshot(), viewport))
+    nodes_q, edges_q = _network_queries(geo.crosses_antimeridian(viewport))
+    params = _viewport_params(viewport)
+    node_records, edge_records = await asyncio.gather(
+        _fetch("network.nodes", nodes_q, **params), _fetch("network.edges", edges_q, **params)
+    )
+    node_rows = [dict(record) for record in node_records if record["id"] is not None]
+    return geo.network_from_rows(node_rows, [dict(record) for record in edge_records], viewport)
+
+
+async def aiter_supply_chain(company_id: str, depth: int):
+    """Async iter_supply_chain; see queries.iter_supply_chain."""
+    if settings.query_backend == "snapshot":
+        for item in _iter_result(await asyncio.to_thread(snapshot.get_supply_chain, company_id, depth)):
+            yield item
+        return
+    nodes_q, edges_q = _supply_chain_split_queries(depth)
+    async for item in _aiter_split("supply_chain", nodes_q, edges_q, company_id=company_id):
+        yield item
+
+
+async def aiter_impact(scenario: str, target_id: str):
+    """Async iter_impact; see queries.iter_impact."""
+    if settings.query_backend == "snapshot":
+        for item in _iter_result(await asyncio.to_thread(snapshot.get_impact, scenario, target_id)):
+            yield item
+        return
+    queries = _impact_split_queries(scenario)
+    if queries is None:
+        return
+    async for item in _aiter_split(f"impact.{scenario}", *queries, target_id=target_id):
+        yield item
+
+
+async def _aiter_split(name: str, nodes_q: str, edges_q: str, **params):
+    async with get_async_driver().session() as session:
+        async for record in metrics.astream(session, f"{name}.nodes", nodes_q, **params):
+            if record.get("node"):
+                yield "node", _node_to_map_node({"node": record["node"]})
+        async for r in metrics.astream(session, f"{name}.edges", edges_q, **params):
+            if r.get("from_id") and r.get("to_id"):
+                yield "edge", {"from_id": r["from_id"], "to_id": r["to_id"], "type": r["type"]}
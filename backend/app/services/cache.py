@@ -0,0 +1,163 @@
+"""Bounded LRU + TTL cache for supply chain and impact results, keyed by graph version."""
+import threading
+import time
+from collections import OrderedDict
+
+from app.config import settings
+from app.services import graph_version
+from app.services.singleflight import flights
+
+_MISSING = object()
+
+
+class ResultCache:
+    """Thread-safe LRU cache with per-entry TTL. All entries are dropped when the graph version changes.
+
+    Each entry can also hold the content digest of its (nodes, edges) value (see digest()), so a
+    result served many times is hashed once per graph version.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        # id() of a cached result's nodes list -> its key, to find the entry from a served result
+        self._owners: dict[int, object] = {}
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _sync_version(self, version):
+        if version != self._version:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._owners.clear()
+            self._version = version
+
+    def get(self, key, version):
+        """Return the cached value or _MISSING."""
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, version, value):
+        with self._lock:
+            if self._version is not None and version < self._version:
+                return  # computed against a graph that has since changed
+            self._sync_version(version)
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = [time.monotonic() + self.ttl_seconds, value, None]
+            if isinstance(value, tuple) and value and isinstance(value[0], list):
+                self._owners[id(value[0])] = key
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        _, value, _ = self._entries.pop(key)
+        if isinstance(value, tuple) and value and isinstance(value[0], list):
+            self._owners.pop(id(value[0]), None)
+
+    def digest(self, nodes: list, compute) -> str:
+        """Content digest of the result whose node list is `nodes`.
+
+        For a result held in the cache, compute() runs once and the digest is kept with the entry
+        (and dropped with it on the next graph version); for any other result it runs every time.
+        """
+        with self._lock:
+            key = self._owners.get(id(nodes))
+            entry = self._entries.get(key) if key is not None else None
+            if entry is not None and entry[1][0] is nodes and entry[2] is not None:
+                return entry[2]
+        digest = compute()
+        if entry is not None:
+            with self._lock:
+                if self._entries.get(key) is entry and entry[1][0] is nodes:
+                    entry[2] = digest
+        return digest
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._owners.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.cache_enabled,
+                "graph_version": self._version,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+result_cache = ResultCache(settings.cache_max_entries, settings.cache_ttl_seconds)
+
+
+def cached(key, compute):
+    """Return compute() through result_cache, keyed by key and the current graph version.
+
+    Concurrent misses for the same key share one compute() (see singleflight.py).
+    """
+    if not settings.cache_enabled:
+        return _coalesce(key, compute)
+    version = graph_version.get_version()
+    value = result_cache.get(key, version)
+    if value is _MISSING:
+
+        def compute_and_store():
+            result = compute()
+            result_cache.put(key, version, result)
+            return result
+
+        value = _coalesce((key, version), compute_and_store)
+    return value
+
+
+async def acached(key, compute):
+    """Async cached(); compute is a coroutine function."""
+    if not settings.cache_enabled:
+        return await _acoalesce(key, compute)
+    version = await graph_version.aget_version()
+    value = result_cache.get(key, version)
+    if value is _MISSING:
+
+        async def compute_and_store():
+            result = await compute()
+            result_cache.put(key, version, result)
+            return result
+
+        value = await _acoalesce((key, version), compute_and_store)
+    return value
+
+
+def _coalesce(key, compute):
+    return flights.do(key, compute) if settings.singleflight_enabled else compute()
+
+
+async def _acoalesce(key, compute):
+    return await flights.ado(key, compute) if settings.singleflight_enabled else await compute()
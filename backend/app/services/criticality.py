@@ -0,0 +1,93 @@
+"""Criticality sweep: the impact of every supplier failure and port closure, ranked.
+
+Each (scenario, target) pair is evaluated with the same code path as /api/impact, fanned out
+over `sweep_workers` threads, each holding its own Neo4j session (or reading the shared
+snapshot/reachability index). Results are ranked by impacted companies, then suppliers.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.config import settings
+from app.services import name_index
+from app.services.cache import cached
+from app.services.queries import _query_impact
+from app.services.snapshot import IMPACT_TARGET_LABELS
+
+SCENARIOS = tuple(IMPACT_TARGET_LABELS)
+
+
+def _targets(scenarios, target_ids) -> list[tuple[str, str]]:
+    if target_ids is not None:
+        return [(scenario, t) for scenario in scenarios for t in target_ids]
+    return [
+        (scenario, row["id"])
+        for scenario in scenarios
+        for row in name_index.get_index(IMPACT_TARGET_LABELS[scenario]).rows
+        if row["id"]
+    ]
+
+
+def _score(scenario: str, target_id: str) -> dict | None:
+    label = IMPACT_TARGET_LABELS[scenario]
+    nodes, edges = _query_impact(scenario, target_id)
+    target = next((n for n in nodes if n["id"] == target_id and n["type"] == label), None)
+    if target is None:
+        # A target that impacts nothing (e.g. a port nobody ships through) is not in its own
+        # result: it still ranks, with an all-zero row, as long as it exists.
+        target = name_index.get_index(label).get(target_id)
+        if target is None:
+            return None
+    counts = {"Company": 0, "Supplier": 0, "Factory": 0}
+    impacted = [n for n in nodes if n is not target]
+    for n in impacted:
+        if n["type"] in counts:
+            counts[n["type"]] += 1
+    return {
+        "scenario": scenario,
+        "target_id": target_id,
+        "target_name": target["name"],
+        "companies": counts["Company"],
+        "suppliers": counts["Supplier"],
+        "factories": counts["Factory"],
+        "nodes": len(impacted),
+        "edges": len(edges),
+    }
+
+
+def sweep(scenarios=SCENARIOS, target_ids=None, progress=None) -> list[dict]:
+    """Rank targets by impact. target_ids=None means every Supplier/Port for the scenarios.
+
+    progress(done, total) is called as targets complete. Targets that do not exist for a
+    scenario are skipped; existing ones that impact nothing get an all-zero row.
+    """
+    pairs = _targets(scenarios, target_ids)
+    rows = []
+    if progress:
+        progress(0, len(pairs))
+    with ThreadPoolExecutor(max_workers=max(1, settings.sweep_workers)) as pool:
+        futures = [pool.submit(_score, scenario, t) for scenario, t in pairs]
+        for done, future in enumerate(as_completed(futures), start=1):
+            row = future.result()
+            if row is not None:
+                rows.append(row)
+            if progress:
+                progress(done, len(pairs))
+    rows.sort(key=lambda r: (-r["companies"], -r["suppliers"], -r["nodes"], r["scenario"], r["target_id"]))
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    return rows
+
+
+def cached_sweep(scenarios=SCENARIOS, target_ids=None, progress=None) -> list[dict]:
+    """sweep() through the result cache, so a repeat sweep on the same graph version is free."""
+    key = ("criticality", tuple(scenarios), tuple(sorted(target_ids)) if target_ids is not None else None)
+    computed = False
+
+    def compute():
+        nonlocal computed
+        computed = True
+        return sweep(scenarios, target_ids, progress)
+
+    rows = cached(key, compute)
+    if progress and not computed:
+        progress(len(rows), len(rows))
+    return rows
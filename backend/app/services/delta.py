@@ -0,0 +1,134 @@
+"""Content hashes and deltas of graph results, for ETag / If-None-Match and ?since= requests.
+
+A result's hash covers its nodes, edges and extra fields in a canonical order (nodes by id, edges
+by endpoints and type), so the same graph gives the same ETag however it was computed. ETags also
+carry the graph version the result was served at (W/"<hash>.<version>"); If-None-Match compares
+the hash only.
+
+A client holding an earlier result can ask for just what changed since. Recently served results
+are kept in a bounded per-process history keyed by hash, giving an exact diff; otherwise the
+GraphChange log between the two versions bounds what can have changed (see region()), so any
+process can answer.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import orjson
+
+from app.config import settings
+
+
+def _edge_key(edge: dict) -> tuple:
+    return edge["from_id"], edge["to_id"], edge["type"]
+
+
+def content_hash(nodes: list[dict], edges: list[dict], extra: dict | None = None) -> str:
+    canonical = {
+        "nodes": sorted(nodes, key=lambda n: n["id"]),
+        "edges": sorted(edges, key=_edge_key),
+    }
+    return with_extra(hashlib.blake2b(orjson.dumps(canonical, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest(), extra)
+
+
+def with_extra(digest: str, extra: dict | None) -> str:
+    """Fold a result's extra fields into the hash of its nodes and edges (unchanged without extras)."""
+    if not extra:
+        return digest
+    return hashlib.blake2b(digest.encode() + orjson.dumps(extra, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+class ResultHistory:
+    """Bounded LRU of recently served (nodes, edges) results by content hash."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest: str):
+        with self._lock:
+            result = self._entries.get(digest)
+            if result is not None:
+                self._entries.move_to_end(digest)
+            return result
+
+    def put(self, digest: str, nodes: list[dict], edges: list[dict]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[digest] = (nodes, edges)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+history = ResultHistory(settings.delta_history_entries)
+
+
+def diff(old: tuple[list[dict], list[dict]], new: tuple[list[dict], list[dict]]) -> dict:
+    """Changes turning old into new: added or changed nodes/edges, and ids/keys of removed ones."""
+    old_nodes = {n["id"]: n for n in old[0]}
+    old_edges = {_edge_key(e): e for e in old[1]}
+    new_nodes, new_edges = new
+    new_ids = {n["id"] for n in new_nodes}
+    new_keys = {_edge_key(e) for e in new_edges}
+    return {
+        "nodes": [n for n in new_nodes if old_nodes.get(n["id"]) != n],
+        "edges": [e for e in new_edges if old_edges.get(_edge_key(e)) != e],
+        "removed_nodes": [node_id for node_id in old_nodes if node_id not in new_ids],
+        "removed_edges": [
+            {"from_id": f, "to_id": t, "type": k} for f, t, k in old_edges if (f, t, k) not in new_keys
+        ],
+    }
+
+
+def region(nodes: list[dict], edges: list[dict], changed: set) -> dict:
+    """Delta of a result from the node ids changed since the client's version (change log).
+
+    Without the old result, removals cannot be listed, so `node_ids` lists every node of the new
+    result and the client drops the others. A node outside the changed ids can only be new, or
+    have new edges or per-result fields, through a path of result edges from a changed node (the
+    change log also lists the neighbours of deleted nodes), so `nodes` is everything connected to
+    one and `edges` is every edge touching those; the client replaces its edges of the nodes in
+    `nodes` with them. Changes away from the result give an empty delta; changes inside a
+    connected result may resend most of it.
+    """
+    ids = {n["id"] for n in nodes}
+    neighbours: dict[str, list] = {}
+    for e in edges:
+        neighbours.setdefault(e["from_id"], []).append(e["to_id"])
+        neighbours.setdefault(e["to_id"], []).append(e["from_id"])
+    seen = set(changed) & ids
+    stack = list(seen)
+    while stack:
+        for other in neighbours.get(stack.pop(), ()):
+            if other in ids and other not in seen:
+                seen.add(other)
+                stack.append(other)
+    return {
+        "nodes": [n for n in nodes if n["id"] in seen],
+        "edges": [e for e in edges if e["from_id"] in seen or e["to_id"] in seen],
+        "node_ids": [n["id"] for n in nodes],
+    }
+
+
+def make_etag(digest: str, version) -> str:
+    return f'W/"{digest}"' if version is None else f'W/"{digest}.{version}"'
+
+
+def parse_etag(value: str) -> tuple[str, int | None]:
+    """(hash, graph version) of an ETag value (W/"abc.12", "abc" or bare); version None if absent."""
+    value = value.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    digest, _, version = value.strip('"').partition(".")
+    return digest, int(version) if version.isdigit() else None
+
+
+def matches(if_none_match: str | None, digest: str) -> bool:
+    """Weak comparison of an If-None-Match header against a content hash."""
+    if not if_none_match:
+        return False
+    tags = [t for t in if_none_match.split(",") if t.strip()]
+    return any(t.strip() == "*" or parse_etag(t)[0] == digest for t in tags)
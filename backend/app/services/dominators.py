@@ -0,0 +1,366 @@
+"""Single points of failure per company, from dominator trees of its supply graph.
+
+Material flows along SUPPLIES_TO into a company. In the reversed graph rooted at the company, a
+node d dominates v when every supply path from v to the company passes through d, so if d fails
+v's supply to the company is cut as well. Dominators are computed with the Cooper-Harvey-Kennedy
+iterative algorithm over a reverse postorder, which converges in one or two passes on supply
+graphs (close to acyclic), so a company costs about one pass over its upstream edges.
+
+For each company the index stores its critical nodes:
+
+- `cut`: how many upstream nodes lose every path to the company when the node fails (itself
+  included), i.e. the size of its dominator subtree;
+- `single_point`: the node lies on every supply path, from every source (upstream supplier
+  without suppliers of its own) to the company.
+
+A closed port cuts the suppliers that ship only through it. The cuts of all ports are found in
+one bitmask traversal of the company's supply graph (one bit per port, dropped at its shippers).
+
+Build it offline and save it next to the API:
+
+    python -m app.services.dominators build --out dominators.npz
+
+When the graph version changes only companies whose supply graph touches a changed node are
+recomputed (everything, if the changes are not known; see graph_version.changes_between).
+Builds and refreshes run on a background thread; until the index for the current version is
+ready, the requested company is analyzed directly.
+"""
+import argparse
+import logging
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from app.config import settings
+from app.services import graph_version, snapshot
+from app.services.snapshot import GraphSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry(NamedTuple):
+    """Critical nodes of one company (snapshot node indices) and the nodes its result depends on."""
+
+    upstream: int
+    nodes: np.ndarray
+    cut: np.ndarray
+    single: np.ndarray
+    members: np.ndarray
+
+
+def _upstream_order(snap: GraphSnapshot, root: int) -> list[int]:
+    """Reverse postorder of the nodes reachable from root over incoming SUPPLIES_TO (root first)."""
+    inc = snap.inc["SUPPLIES_TO"]
+    seen = {root}
+    postorder = []
+    stack = [(root, iter(inc.nbr[inc.indptr[root]:inc.indptr[root + 1]].tolist()))]
+    while stack:
+        node, children = stack[-1]
+        for child in children:
+            if child not in seen:
+                seen.add(child)
+                stack.append((child, iter(inc.nbr[inc.indptr[child]:inc.indptr[child + 1]].tolist())))
+                break
+        else:
+            stack.pop()
+            postorder.append(node)
+    return postorder[::-1]
+
+
+def _intersect(idom: dict, rank: dict, a: int, b: int) -> int:
+    """Nearest common dominator of a and b (walks both up the tree by reverse postorder rank)."""
+    while a != b:
+        while rank[a] > rank[b]:
+            a = idom[a]
+        while rank[b] > rank[a]:
+            b = idom[b]
+    return a
+
+
+def _dominators(snap: GraphSnapshot, order: list[int], rank: dict) -> dict[int, int]:
+    """Immediate dominator of every node in order (the root maps to itself)."""
+    out = snap.out["SUPPLIES_TO"]
+    # Predecessors in the reversed graph are a node's customers within the company's supply graph.
+    preds = {
+        v: [p for p in out.nbr[out.indptr[v]:out.indptr[v + 1]].tolist() if p in rank] for v in order[1:]
+    }
+    idom = {order[0]: order[0]}
+    changed = True
+    while changed:
+        changed = False
+        for v in order[1:]:
+            new = None
+            for p in preds[v]:
+                if p in idom:
+                    new = p if new is None else _intersect(idom, rank, p, new)
+            if idom.get(v) != new:
+                idom[v] = new
+                changed = True
+    return idom
+
+
+def _port_reach(snap: GraphSnapshot, order: list[int], only_port: dict[int, set]) -> tuple[list[int], np.ndarray]:
+    """For every port, which nodes still reach the root (order[0]) over SUPPLIES_TO when the port closes.
+
+    One bit per port, propagated upstream from the root in a single traversal; the bit of a port is
+    dropped at the suppliers shipping only through it. Masks are indexed by position in order, so
+    the work is bounded by the company's supply graph, not the whole snapshot. Returns (ports,
+    reached) where reached is a (len(order), words) uint64 mask with bit b set on the nodes that
+    still reach the root without ports[b].
+    """
+    nodes = np.asarray(order, dtype=np.int64)
+    sorter = np.argsort(nodes)
+
+    def local(v) -> np.ndarray:
+        return sorter[np.searchsorted(nodes, v, sorter=sorter)]
+
+    # Every upstream neighbour of a node in order is itself in order, so all edges map locally.
+    src, nbrs, _ = snap.inc["SUPPLIES_TO"].expand_pairs(nodes)
+    src, nbrs = local(src), local(nbrs)
+
+    ports = list(only_port)
+    words = max(1, (len(ports) + 63) // 64)
+    blocked = np.zeros((len(order), words), dtype=np.uint64)
+    for bit, port in enumerate(ports):
+        blocked[local(np.fromiter(only_port[port], dtype=np.int64)), bit // 64] |= np.uint64(1 << (bit % 64))
+    reached = np.zeros_like(blocked)
+    reached[0] = ~np.uint64(0)
+    current = reached.copy()
+    while True:
+        live = current.any(axis=1)
+        if not live.any():
+            break
+        edges = live[src]
+        nxt = np.zeros_like(reached)
+        if edges.any():
+            np.bitwise_or.at(nxt, nbrs[edges], current[src[edges]])
+        nxt &= ~(blocked | reached)
+        reached |= nxt
+        current = nxt
+    return ports, reached
+
+
+def analyze(snap: GraphSnapshot, company: int) -> _Entry:
+    """Critical suppliers and ports of one company (a node index)."""
+    order = _upstream_order(snap, company)
+    rank = {v: i for i, v in enumerate(order)}
+    idom = _dominators(snap, order, rank)
+    upstream = len(order) - 1
+    size = dict.fromkeys(order, 1)
+    for v in reversed(order[1:]):
+        size[idom[v]] += size[v]
+
+    inc = snap.inc["SUPPLIES_TO"]
+    sources = [v for v in order[1:] if inc.indptr[v] == inc.indptr[v + 1]]
+    single = set()
+    if sources:
+        # Nodes on every supply path are the sources' common dominator and its ancestors.
+        lca = sources[0]
+        for source in sources[1:]:
+            lca = _intersect(idom, rank, lca, source)
+        while lca != company:
+            single.add(lca)
+            lca = idom[lca]
+
+    critical = {v: size[v] for v in order[1:] if size[v] > 1 or v in single}
+
+    # Ports: closing one cuts the upstream suppliers shipping only through it.
+    ships = snap.out["SHIPS_VIA"]
+    only_port: dict[int, set] = {}
+    used_ports = set()
+    for v in order[1:]:
+        ports = {p for p in ships.nbr[ships.indptr[v]:ships.indptr[v + 1]].tolist() if snap.label_sets["Port"][p]}
+        used_ports |= ports
+        if len(ports) == 1:
+            only_port.setdefault(ports.pop(), set()).add(v)
+    if only_port:
+        ports, reached = _port_reach(snap, order, only_port)
+        bits = np.unpackbits(reached[1:].view(np.uint8), axis=1, bitorder="little")[:, :len(ports)]
+        cuts = upstream - bits.sum(axis=0)
+        source_bits = bits[[rank[v] - 1 for v in sources]].any(axis=0) if sources else None
+        for bit, port in enumerate(ports):
+            cut_all = source_bits is not None and not source_bits[bit]
+            if cuts[bit] > 1 or cut_all:
+                critical[port] = int(cuts[bit])
+                if cut_all:
+                    single.add(port)
+
+    nodes = np.array(sorted(critical, key=lambda v: (-critical[v], v)), dtype=np.int32)
+    return _Entry(
+        upstream=upstream,
+        nodes=nodes,
+        cut=np.array([critical[v] for v in nodes.tolist()], dtype=np.int32),
+        single=np.array([v in single for v in nodes.tolist()], dtype=bool),
+        members=np.array(sorted(set(order) | used_ports), dtype=np.int32),
+    )
+
+
+class DominatorIndex:
+    """Critical nodes per company, keyed by company node index in the aligned snapshot."""
+
+    def __init__(self, version, keys: list, entries: dict[int, _Entry]):
+        self.version = version
+        self.keys = keys
+        self.entries = entries
+
+    @classmethod
+    def build(cls, snap: GraphSnapshot) -> "DominatorIndex":
+        index = cls(snap.version, snap.keys, {})
+        index._compute(snap, np.flatnonzero(snap.label_sets["Company"]))
+        return index
+
+    def _compute(self, snap: GraphSnapshot, companies):
+        for c in companies:
+            self.entries[int(c)] = analyze(snap, int(c))
+
+    def lookup(self, snap: GraphSnapshot, company_id: str, limit: int | None = None):
+        """{company_id, upstream, nodes} for company_id, or None if there is no such company;
+        snap must be the snapshot the index is aligned to."""
+        c = snap.lookup("Company", company_id)
+        if c is None:
+            return None
+        entry = self.entries.get(c) or analyze(snap, c)
+        nodes = []
+        for v, cut, single in zip(entry.nodes.tolist()[:limit], entry.cut.tolist(), entry.single.tolist()):
+            if snap.ids[v] is None:
+                continue
+            node = snap.node_dict(v)
+            node.update(cut=cut, share=round(cut / entry.upstream, 6) if entry.upstream else 0.0, single_point=single)
+            nodes.append(node)
+        return {"company_id": company_id, "upstream": entry.upstream, "nodes": nodes}
+
+    # ----- Incremental refresh -----
+
+    def refresh(self, snap: GraphSnapshot, changed_ids=None) -> "DominatorIndex":
+        """Return an index aligned to snap. With changed_ids (node `id`s touched since the index
+        was built), only companies whose supply graph contains a changed node are recomputed;
+        otherwise everything is rebuilt."""
+        if changed_ids is None:
+            return DominatorIndex.build(snap)
+        key_to_new = {k: i for i, k in enumerate(snap.keys)}
+        node_map = np.fromiter((key_to_new.get(k, -1) for k in self.keys), dtype=np.int64, count=len(self.keys))
+        changed_ids = set(changed_ids)
+        changed = np.array([i for i, node_id in enumerate(snap.ids) if node_id in changed_ids], dtype=np.int64)
+        # New paths: companies downstream of a changed node (or of a shipper of a changed port).
+        shippers, _ = snap.inc["SHIPS_VIA"].expand(changed)
+        seeds = np.concatenate([changed, shippers])
+        downstream = np.flatnonzero(snap.bfs(seeds, [snap.out["SUPPLIES_TO"]], snap.num_nodes) >= 0)
+        dirty = set(downstream[snap.has_label(downstream, "Company")].tolist())
+
+        entries = {}
+        for c, entry in self.entries.items():
+            new_c = int(node_map[c])
+            if new_c < 0 or new_c in dirty:
+                continue
+            members = node_map[entry.members]
+            if (members < 0).any() or np.isin(members, changed).any():
+                continue
+            entries[new_c] = entry._replace(
+                nodes=node_map[entry.nodes].astype(np.int32), members=np.sort(members).astype(np.int32)
+            )
+        index = DominatorIndex(snap.version, snap.keys, entries)
+        companies = np.flatnonzero(snap.label_sets["Company"])
+        index._compute(snap, [c for c in companies if int(c) not in entries])
+        return index
+
+    # ----- Persistence -----
+
+    def save(self, path: Path):
+        """Write the index as a compressed .npz (CSR-style offsets per company)."""
+        companies = np.array(sorted(self.entries), dtype=np.int64)
+        arrays = {
+            "version": np.array(-1 if self.version is None else self.version),
+            "keys": np.array(self.keys, dtype=str),
+            "companies": companies,
+            "upstream": np.array([self.entries[c].upstream for c in companies], dtype=np.int64),
+        }
+        for part in ("nodes", "cut", "single", "members"):
+            values = [getattr(self.entries[c], part) for c in companies]
+            ptr = np.zeros(len(values) + 1, dtype=np.int64)
+            np.cumsum([v.size for v in values], out=ptr[1:])
+            arrays[f"{part}_ptr"] = ptr
+            arrays[part] = np.concatenate(values) if values else np.empty(0, dtype=np.int32)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "DominatorIndex":
+        data = np.load(path)
+        version = int(data["version"])
+        parts = {part: (data[f"{part}_ptr"], data[part]) for part in ("nodes", "cut", "single", "members")}
+        entries = {}
+        for i, (c, upstream) in enumerate(zip(data["companies"].tolist(), data["upstream"].tolist())):
+            entries[c] = _Entry(upstream, *(values[ptr[i]:ptr[i + 1]] for ptr, values in parts.values()))
+        return cls(None if version < 0 else version, data["keys"].tolist(), entries)
+
+
+_index = None
+_lock = threading.Lock()
+_builder = None  # background thread building or refreshing _index
+
+
+def _initial_index(snap: GraphSnapshot) -> DominatorIndex:
+    path = Path(settings.dominator_index_path) if settings.dominator_index_path else None
+    if path and path.exists():
+        saved = DominatorIndex.load(path)
+        if saved.version == snap.version:
+            # Same graph, possibly different node order: re-align without recomputing.
+            return saved.refresh(snap, changed_ids=())
+        logger.info("Dominator index at %s is for graph version %s, rebuilding", path, saved.version)
+    return DominatorIndex.build(snap)
+
+
+def _update(snap: GraphSnapshot):
+    global _index, _builder
+    try:
+        if _index is None:
+            index = _initial_index(snap)
+        else:
+            index = _index.refresh(snap, graph_version.changes_between(_index.version, snap.version))
+        with _lock:
+            _index = index
+    except Exception:
+        logger.exception("Dominator index update for graph version %s failed", snap.version)
+    finally:
+        with _lock:
+            _builder = None
+
+
+def get_index(snap: GraphSnapshot) -> DominatorIndex | None:
+    """Return the process-wide index if it is aligned to snap.
+
+    Otherwise start building (or refreshing) it on a background thread and return None; callers
+    analyze the requested company directly until it is ready.
+    """
+    global _builder
+    index = _index
+    if index is not None and index.keys is snap.keys:
+        return index
+    with _lock:
+        if _builder is None:
+            _builder = threading.Thread(target=_update, args=(snap,), name="dominator-index", daemon=True)
+            _builder.start()
+    return None
+
+
+def critical_nodes(company_id: str, limit: int | None = None):
+    snap = snapshot.get_snapshot()
+    # An empty index analyzes the company on demand.
+    index = get_index(snap) or DominatorIndex(snap.version, snap.keys, {})
+    return index.lookup(snap, company_id, limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the dominator (single point of failure) index.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--out", type=Path, default=Path(settings.dominator_index_path or "dominators.npz"))
+    args = parser.parse_args()
+    snap = snapshot.load_snapshot()
+    index = DominatorIndex.build(snap)
+    index.save(args.out)
+    print(f"Indexed graph version {snap.version}: {len(index.entries)} companies -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Viewport clipping and grid clustering for the map.
+
+Nodes outside the requested bounding box are dropped. Below `cluster_max_zoom`, the visible
+nodes are bucketed into square cells of `cluster_cell_px` screen pixels (Web Mercator, the
+projection Leaflet draws in); a cell holding more than one node is returned as a single
+"Cluster" node with a count, and edges are re-pointed at their clusters and merged. The
+response size therefore depends on the viewport, not on the size of the graph.
+"""
+import numpy as np
+
+from app.config import settings
+
+# The whole-network view shows the located entities and the relationships between them
+# (countries and the reverse DEPENDS_ON edges would only add clutter).
+NETWORK_LABELS = ("Company", "Supplier", "Factory", "Port")
+NETWORK_REL_TYPES = ("SUPPLIES_TO", "SHIPS_VIA")
+
+_MAX_MERCATOR_LAT = 85.05112878
+
+
+def _coords(nodes: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+    lat = np.array([n.get("lat") for n in nodes], dtype=float).reshape(-1)
+    lon = np.array([n.get("lon") for n in nodes], dtype=float).reshape(-1)
+    return lat, lon
+
+
+def crosses_antimeridian(viewport) -> bool:
+    return viewport.min_lon > viewport.max_lon
+
+
+def in_viewport(lat: np.ndarray, lon: np.ndarray, viewport) -> np.ndarray:
+    """Mask of points inside the viewport (points without coordinates are outside).
+
+    A viewport with min_lon > max_lon crosses the antimeridian and covers both edges of the map.
+    """
+    with np.errstate(invalid="ignore"):
+        if crosses_antimeridian(viewport):
+            lon_ok = (lon >= viewport.min_lon) | (lon <= viewport.max_lon)
+        else:
+            lon_ok = (lon >= viewport.min_lon) & (lon <= viewport.max_lon)
+        return (lat >= viewport.min_lat) & (lat <= viewport.max_lat) & lon_ok
+
+
+def _cells(lat: np.ndarray, lon: np.ndarray, zoom: int) -> np.ndarray:
+    """Grid cell id of each point at this zoom level."""
+    scale = 2.0 ** zoom * 256 / settings.cluster_cell_px
+    sin = np.sin(np.radians(np.clip(lat, -_MAX_MERCATOR_LAT, _MAX_MERCATOR_LAT)))
+    x = np.floor((lon + 180) / 360 * scale).astype(np.int64)
+    y = np.floor((0.5 - np.log((1 + sin) / (1 - sin)) / (4 * np.pi)) * scale).astype(np.int64)
+    return x * (int(scale) + 1) + y
+
+
+def bounds(nodes: list[dict]) -> list[float] | None:
+    """[min_lat, min_lon, max_lat, max_lon] of the nodes with coordinates, or None."""
+    lat, lon = _coords(nodes)
+    ok = ~(np.isnan(lat) | np.isnan(lon))
+    if not ok.any():
+        return None
+    return [float(lat[ok].min()), float(lon[ok].min()), float(lat[ok].max()), float(lon[ok].max())]
+
+
+def _layout(
+    viewport,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    visible: np.ndarray,
+    node_dict,
+    edge_src: np.ndarray,
+    edge_dst: np.ndarray,
+    edge_codes: np.ndarray,
+    type_names: list[str],
+) -> tuple[list[dict], list[dict]]:
+    """Group visible nodes into cells (or one group per node when zoomed in) and merge edges.
+
+    node_dict(i) builds the output dict of node i; edges are index arrays into the nodes with
+    integer type codes into type_names.
+    """
+    members = np.flatnonzero(visible)
+    if members.size == 0:
+        return [], []
+    if viewport.zoom < settings.cluster_max_zoom:
+        cells, first, inverse, counts = np.unique(
+            _cells(lat[members], lon[members], viewport.zoom),
+            return_index=True, return_inverse=True, return_counts=True,
+        )
+    else:
+        cells = first = inverse = np.arange(members.size)
+        counts = np.ones(members.size, dtype=np.int64)
+    inverse = inverse.reshape(-1)
+    group_of = np.full(lat.size, -1, dtype=np.int64)
+    group_of[members] = inverse
+
+    nodes = []
+    if (counts > 1).any():
+        mean_lat = np.bincount(inverse, weights=lat[members]) / counts
+        mean_lon = np.bincount(inverse, weights=lon[members]) / counts
+    for g, (i, cell, count) in enumerate(zip(members[first], cells, counts)):
+        if count == 1:
+            nodes.append(node_dict(int(i)))
+        else:
+            nodes.append({
+                "id": f"cluster:{viewport.zoom}:{cell}",
+                "name": f"{count} locations",
+                "type": "Cluster",
+                "tier": None,
+                "lat": float(mean_lat[g]),
+                "lon": float(mean_lon[g]),
+                "count": int(count),
+            })
+
+    if edge_src.size == 0:
+        return nodes, []
+    gs, gd = group_of[edge_src], group_of[edge_dst]
+    keep = (gs >= 0) & (gd >= 0) & (gs != gd)
+    num_groups, num_types = len(nodes), max(1, len(type_names))
+    keys, edge_counts = np.unique((gs[keep] * num_groups + gd[keep]) * num_types + edge_codes[keep], return_counts=True)
+    edges = []
+    for key, count in zip(keys.tolist(), edge_counts.tolist()):
+        pair, code = divmod(key, num_types)
+        src, dst = divmod(pair, num_groups)
+        edge = {"from_id": nodes[src]["id"], "to_id": nodes[dst]["id"], "type": type_names[code]}
+        if count > 1:
+            edge["count"] = count
+        edges.append(edge)
+    return nodes, edges
+
+
+def clip(nodes: list[dict], edges: list[dict], viewport) -> tuple[list[dict], list[dict]]:
+    """Restrict a (nodes, edges) result to the viewport, clustering dense cells at low zoom."""
+    lat, lon = _coords(nodes)
+    index = {n["id"]: i for i, n in enumerate(nodes)}
+    type_codes: dict[str, int] = {}
+    kept = [e for e in edges if e["from_id"] in index and e["to_id"] in index]
+    src = np.fromiter((index[e["from_id"]] for e in kept), dtype=np.int64, count=len(kept))
+    dst = np.fromiter((index[e["to_id"]] for e in kept), dtype=np.int64, count=len(kept))
+    codes = np.fromiter((type_codes.setdefault(e["type"], len(type_codes)) for e in kept), dtype=np.int64, count=len(kept))
+    return _layout(
+        viewport, lat, lon, in_viewport(lat, lon, viewport), nodes.__getitem__, src, dst, codes, list(type_codes)
+    )
+
+
+def apply_viewport(nodes: list[dict], edges: list[dict], viewport) -> tuple[list[dict], list[dict], dict]:
+    """clip() plus the extra response fields: bounds of the unclipped result, for fitting the map."""
+    extent = bounds(nodes)
+    nodes, edges = clip(nodes, edges, viewport)
+    return nodes, edges, {"bounds": extent}
+
+
+def network_from_snapshot(snap, viewport) -> tuple[list[dict], list[dict]]:
+    """Whole-network view over a GraphSnapshot."""
+    lat, lon = snap.coords[:, 0], snap.coords[:, 1]
+    labelled = np.zeros(snap.num_nodes, dtype=bool)
+    for label in NETWORK_LABELS:
+        labelled |= snap.label_sets[label]
+    has_id = np.fromiter((node_id is not None for node_id in snap.ids), dtype=bool, count=snap.num_nodes)
+    visible = labelled & has_id & in_viewport(lat, lon, viewport)
+    edge_ids = np.concatenate([snap.out[rel].eid for rel in NETWORK_REL_TYPES])
+    codes = np.concatenate([np.full(snap.out[rel].eid.size, c, dtype=np.int64) for c, rel in enumerate(NETWORK_REL_TYPES)])
+    return _layout(
+        viewport, lat, lon, visible, snap.node_dict,
+        snap.edge_src[edge_ids], snap.edge_dst[edge_ids], codes, list(NETWORK_REL_TYPES),
+    )
+
+
+def network_from_rows(node_rows: list[dict], edge_rows: list[dict], viewport) -> tuple[list[dict], list[dict]]:
+    """Whole-network view from Cypher rows: nodes keyed by `key`, edges as (src, dst, type) keys."""
+    index = {r["key"]: i for i, r in enumerate(node_rows)}
+    nodes = [{k: v for k, v in r.items() if k != "key"} for r in node_rows]
+    kept = [r for r in edge_rows if r["src"] in index and r["dst"] in index and r["type"] in NETWORK_REL_TYPES]
+    src = np.fromiter((index[r["src"]] for r in kept), dtype=np.int64, count=len(kept))
+    dst = np.fromiter((index[r["dst"]] for r in kept), dtype=np.int64, count=len(kept))
+    codes = np.fromiter((NETWORK_REL_TYPES.index(r["type"]) for r in kept), dtype=np.int64, count=len(kept))
+    lat, lon = _coords(nodes)
+    return _layout(
+        viewport, lat, lon, in_viewport(lat, lon, viewport), nodes.__getitem__, src, dst, codes, list(NETWORK_REL_TYPES)
+    )
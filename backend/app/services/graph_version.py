@@ -0,0 +1,114 @@
+"""Graph version marker: a single (:GraphMeta { id: 'graph' }) node whose `version` is bumped on every write.
+
+Readers check it at most once per `graph_version_check_seconds`, so cached results and the
+in-process snapshot can be dropped right after a reseed without a round-trip per request.
+
+Writes made through the batch API also leave a (:GraphChange) record per version listing the
+node ids they touched; changes_between() reads them so any process can refresh its indexes
+incrementally, whichever process (or CLI run) applied the batch.
+"""
+import threading
+import time
+
+from app.config import settings
+from app.database import get_async_driver, get_driver
+
+READ_VERSION_Q = "OPTIONAL MATCH (m:GraphMeta { id: 'graph' }) RETURN coalesce(m.version, 0) AS version"
+CHANGES_BETWEEN_Q = """
+MATCH (c:GraphChange) WHERE c.version > $old AND c.version <= $new
+RETURN c.version AS version, c.node_ids AS node_ids
+"""
+BUMP_VERSION_Q = """
+MERGE (m:GraphMeta { id: 'graph' })
+SET m.version = coalesce(m.version, 0) + 1, m.updated_at = datetime()
+RETURN m.version AS version
+"""
+
+_lock = threading.Lock()
+_version = None
+_checked_at = 0.0
+# graph version -> ids of the nodes touched by the write that produced it: a local cache of the
+# GraphChange records (see note_changes / changes_between)
+_changes: dict[int, set] = {}
+
+
+def _fresh() -> bool:
+    return _version is not None and time.monotonic() - _checked_at < settings.graph_version_check_seconds
+
+
+def _store(version: int) -> int:
+    global _version, _checked_at
+    with _lock:
+        _version = version
+        _checked_at = time.monotonic()
+    return version
+
+
+def get_version() -> int:
+    """Current graph version (0 if the marker node does not exist yet)."""
+    if _fresh():
+        return _version
+    with get_driver().session() as session:
+        return _store(session.run(READ_VERSION_Q).single()["version"])
+
+
+async def aget_version() -> int:
+    """Async get_version using the async driver."""
+    if _fresh():
+        return _version
+    async with get_async_driver().session() as session:
+        result = await session.run(READ_VERSION_Q)
+        return _store((await result.single())["version"])
+
+
+def bump_version(tx_or_session) -> int:
+    """Increment the marker inside the caller's transaction or session; returns the new version."""
+    version = tx_or_session.run(BUMP_VERSION_Q).single()["version"]
+    return _store(version)
+
+
+def note_version(version: int) -> int:
+    """Adopt a version the caller has just committed, so this process sees it without re-reading."""
+    return _store(version)
+
+
+def note_changes(version: int, node_ids):
+    """Cache the node ids touched by the write that produced `version` (as recorded in its
+    GraphChange), saving the writing process a round-trip. Only the last `change_log_entries`
+    versions are kept."""
+    with _lock:
+        _changes.setdefault(version, set()).update(node_ids)
+        _prune(version)
+
+
+def _prune(latest: int):
+    for old in [v for v in _changes if v <= latest - settings.change_log_entries]:
+        del _changes[old]
+
+
+def changes_between(old_version, new_version):
+    """Union of the node ids changed in (old_version, new_version], or None if any version in
+    between has no change record (pruned from the log, or written by a reseed or bulk load).
+
+    Versions not cached locally are read from the GraphChange log in Neo4j.
+    """
+    if old_version is None or new_version is None or new_version < old_version:
+        return None
+    wanted = range(old_version + 1, new_version + 1)
+    with _lock:
+        cached = {v: _changes[v] for v in wanted if v in _changes}
+    if len(cached) < len(wanted):
+        with get_driver().session() as session:
+            records = list(session.run(CHANGES_BETWEEN_Q, old=old_version, new=new_version))
+        for record in records:
+            cached.setdefault(record["version"], set(record["node_ids"] or ()))
+        if len(cached) < len(wanted):
+            return None
+        with _lock:
+            for version in wanted:
+                _changes.setdefault(version, cached[version])
+            _prune(new_version)
+    changed = set()
+    for version in wanted:
+        changed |= cached[version]
+    return changed
@@ -0,0 +1,80 @@
+"""In-process registry for long-running background jobs with progress polling.
+
+Jobs run on a small thread pool; callers poll get_job(job_id) for status, progress and the
+result. Only the most recent jobs are kept.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import settings
+
+_MAX_JOBS = 100
+
+
+class Job:
+    """One submitted job. `run(progress)` does the work and calls progress(done, total)."""
+
+    def __init__(self, kind: str, params: dict):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = "pending"
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def progress(self, done: int, total: int):
+        self.done, self.total = done, total
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "result": self.result if include_result else None,
+        }
+
+
+_jobs: "OrderedDict[str, Job]" = OrderedDict()
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=settings.job_workers, thread_name_prefix="job")
+
+
+def _execute(job: Job, run):
+    job.status = "running"
+    try:
+        job.result = run(job.progress)
+        job.status = "done"
+    except Exception as e:
+        job.error = str(e)
+        job.status = "failed"
+    finally:
+        job.finished_at = time.time()
+
+
+def submit(kind: str, params: dict, run) -> Job:
+    """Register a job and start run(progress) in the background."""
+    job = Job(kind, params)
+    with _lock:
+        _jobs[job.id] = job
+        while len(_jobs) > _MAX_JOBS:
+            _jobs.popitem(last=False)
+    _executor.submit(_execute, job, run)
+    return job
+
+
+def get_job(job_id: str) -> Job | None:
+    with _lock:
+        return _jobs.get(job_id)
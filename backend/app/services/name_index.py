@@ -0,0 +1,145 @@
+"""Sorted in-process name index for the Company/Supplier/Port dropdowns.
+
+Each label is kept as two sorted arrays: by (name, id) for keyset pagination, and by
+(lower(name), name, id) for case-insensitive prefix search. When the graph version changes, the
+index is patched from the GraphChange log (only the changed ids are re-read and merged in), or
+reloaded if the changes are not known. Concurrent refreshes of a label share one load (see
+singleflight.py), which runs off the event loop.
+"""
+import asyncio
+import heapq
+import threading
+from bisect import bisect_left, bisect_right
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.services import graph_version, queries
+from app.services.singleflight import flights
+
+_LOADERS = {
+    "Company": queries.list_companies,
+    "Supplier": queries.list_suppliers,
+    "Port": queries.list_ports,
+}
+
+
+def _key(row: dict) -> tuple[str, str]:
+    return row["name"] or "", row["id"] or ""
+
+
+def _search_key(row: dict) -> tuple[str, str, str]:
+    name, node_id = _key(row)
+    return name.lower(), name, node_id
+
+
+class NameIndex:
+    def __init__(self, rows: list[dict], version=None, search_rows: list[dict] | None = None):
+        """Index rows (in any order); with search_rows, rows and search_rows are already sorted."""
+        self.version = version
+        self.rows = rows if search_rows is not None else sorted(rows, key=_key)
+        self.keys = [_key(r) for r in self.rows]
+        self.search_rows = search_rows if search_rows is not None else sorted(self.rows, key=_search_key)
+        self.search_keys = [_search_key(r) for r in self.search_rows]
+        self.by_id = {r["id"]: r for r in self.rows}
+
+    def get(self, node_id: str) -> dict | None:
+        """The row for node_id, or None."""
+        return self.by_id.get(node_id)
+
+    def patched(self, changed_ids, rows: list[dict], version) -> "NameIndex":
+        """A new index without the rows of changed_ids, plus rows (their current state)."""
+        changed_ids = set(changed_ids)
+        return NameIndex(
+            list(heapq.merge((r for r in self.rows if r["id"] not in changed_ids), sorted(rows, key=_key), key=_key)),
+            version,
+            list(
+                heapq.merge(
+                    (r for r in self.search_rows if r["id"] not in changed_ids),
+                    sorted(rows, key=_search_key),
+                    key=_search_key,
+                )
+            ),
+        )
+
+    def page(self, after: tuple[str, str] | None, limit: int, q: str | None = None) -> tuple[list[dict], tuple | None]:
+        """Return (rows, next_after) for up to limit rows after the (name, id) keyset cursor.
+
+        With q, only names starting with q (case-insensitive) are returned, in the same order
+        as their lower-cased names.
+        """
+        if q:
+            prefix = q.lower()
+            start = bisect_left(self.search_keys, (prefix,))
+            if after is not None:
+                start = max(start, bisect_right(self.search_keys, (after[0].lower(), *after)))
+            rows = []
+            for i in range(start, min(start + limit, len(self.search_rows))):
+                if not self.search_keys[i][0].startswith(prefix):
+                    break
+                rows.append(self.search_rows[i])
+        else:
+            start = bisect_right(self.keys, after) if after is not None else 0
+            rows = self.rows[start:start + limit]
+        next_after = (rows[-1]["name"] or "", rows[-1]["id"] or "") if len(rows) == limit else None
+        return rows, next_after
+
+
+_indexes: dict[str, NameIndex] = {}
+_lock = threading.Lock()
+
+
+def _load(label: str, version) -> NameIndex:
+    """Bring the index for label to version: patched from the change log when possible."""
+    index = _indexes.get(label)
+    if index is not None and index.version == version:
+        return index
+    changed = graph_version.changes_between(index.version, version) if index is not None else None
+    if changed is None:
+        new = NameIndex(_LOADERS[label](), version)
+    else:
+        new = index.patched(changed, _LOADERS[label](sorted(changed)) if changed else [], version)
+    with _lock:
+        current = _indexes.get(label)
+        if current is None or current.version is None or current.version < version:
+            _indexes[label] = new
+    return new
+
+
+def get_index(label: str) -> NameIndex:
+    """Name index for label (Company, Supplier or Port), refreshed when the graph version changes."""
+    version = graph_version.get_version()
+    index = _indexes.get(label)
+    if index is not None and index.version == version:
+        return index
+    return flights.do(("name_index", label, version), lambda: _load(label, version))
+
+
+async def aget_index(label: str) -> NameIndex:
+    """Async get_index: the refresh runs in a worker thread, shared by concurrent callers."""
+    version = await graph_version.aget_version()
+    index = _indexes.get(label)
+    if index is not None and index.version == version:
+        return index
+    return await flights.ado(("name_index", label, version), lambda: asyncio.to_thread(_load, label, version))
+
+
+def parse_after(after: str | None) -> tuple[str, str] | None:
+    """Split an "<name>,<id>" cursor; names may contain commas, ids do not."""
+    if not after:
+        return None
+    name, sep, node_id = after.rpartition(",")
+    if not sep:
+        raise ValueError("after must be '<name>,<id>' as returned in next_after")
+    return name, node_id
+
+
+async def list_page(label: str, after: str | None, limit: int, q: str | None = None) -> dict:
+    """One page of {items, next_after} for the list endpoints."""
+    cursor = parse_after(after)
+    if settings.async_mode:
+        index = await aget_index(label)
+    else:
+        index = await run_in_threadpool(get_index, label)
+    rows, next_after = index.page(cursor, limit, q.strip() if q else None)
+    return {"items": rows, "next_after": ",".join(next_after) if next_after else None}
@@ -1,5 +1,13 @@
 """Cypher queries for supply chain and impact. Return dicts suitable for Pydantic models."""
+import logging
+
+from app import metrics
+from app.config import settings
 from app.database import get_driver
+from app.services import geo, reachability, snapshot
+from app.services.cache import cached
+
+logger = logging.getLogger(__name__)
 
 
 def _node_to_map_node(record) -> dict:
@@ -38,44 +46,98 @@ def _rel_to_map_edge(record) -> dict:
     }
 
 
-def list_companies() -> list[dict]:
-    """Return all companies for dropdowns."""
+def _only(var: str, ids) -> str:
+    return f"WHERE {var}.id IN $ids" if ids is not None else ""
+
+
+def list_companies(ids: list[str] | None = None) -> list[dict]:
+    """Return all companies for dropdowns (only those with the given ids, if any)."""
     driver = get_driver()
-    q = """
-    MATCH (c:Company)
+    q = f"""
+    MATCH (c:Company) {_only("c", ids)}
     RETURN c.id AS id, c.name AS name, c.lat AS lat, c.lon AS lon
     ORDER BY c.name
     """
     with driver.session() as session:
-        result = session.run(q)
-        return [dict(record) for record in result]
+        return [dict(record) for record in metrics.run(session, "list_companies", q, ids=ids)]
 
 
-def list_suppliers() -> list[dict]:
-    """Return all suppliers for impact target dropdown."""
+def list_suppliers(ids: list[str] | None = None) -> list[dict]:
+    """Return all suppliers for impact target dropdown (only those with the given ids, if any)."""
     driver = get_driver()
-    q = "MATCH (s:Supplier) RETURN s.id AS id, s.name AS name ORDER BY s.name"
+    q = f"MATCH (s:Supplier) {_only('s', ids)} RETURN s.id AS id, s.name AS name ORDER BY s.name"
     with driver.session() as session:
-        result = session.run(q)
-        return [dict(record) for record in result]
+        return [dict(record) for record in metrics.run(session, "list_suppliers", q, ids=ids)]
 
 
-def list_ports() -> list[dict]:
-    """Return all ports for impact target dropdown."""
+def list_ports(ids: list[str] | None = None) -> list[dict]:
+    """Return all ports for impact target dropdown (only those with the given ids, if any)."""
     driver = get_driver()
-    q = "MATCH (p:Port) RETURN p.id AS id, p.name AS name ORDER BY p.name"
+    q = f"MATCH (p:Port) {_only('p', ids)} RETURN p.id AS id, p.name AS name ORDER BY p.name"
     with driver.session() as session:
-        result = session.run(q)
-        return [dict(record) for record in result]
+        return [dict(record) for record in metrics.run(session, "list_ports", q, ids=ids)]
 
 
-def get_supply_chain(company_id: str, depth: int) -> tuple[list[dict], list[dict]]:
-    """Return (nodes, edges) for supply chain: company + upstream via SUPPLIES_TO up to depth.
-    Includes LOCATED_IN and SHIPS_VIA for map context.
-    """
-    driver = get_driver()
+def get_groups(nodes: list[dict], rel: str, group_label: str) -> dict[str, dict]:
+    """Map node id -> the group_label node it has a rel relationship to (the first by id), for
+    rollups of results that do not carry those relationships. One UNION branch per node label
+    so each lookup can use that label's id index."""
+    by_label: dict[str, list[str]] = {}
+    for node in nodes:
+        if node["type"] in geo.NETWORK_LABELS:
+            by_label.setdefault(node["type"], []).append(node["id"])
+    if not by_label:
+        return {}
+    q = "\nUNION ALL\n".join(
+        f"""
+        UNWIND $ids_{label} AS id
+        MATCH (:{label} {{ id: id }})-[:{rel}]->(g:{group_label})
+        WITH id, g ORDER BY g.id
+        WITH id, collect(g)[0] AS g
+        RETURN id, g AS node
+        """
+        for label in by_label
+    )
+    params = {f"ids_{label}": ids for label, ids in by_label.items()}
+    with get_driver().session() as session:
+        return {record["id"]: _node_to_map_node(record) for record in metrics.run(session, "rollup.groups", q, **params)}
+
+
+def _clamp_depth(depth: int) -> int:
+    return min(max(1, depth), 4)
+
+
+def _rows_to_nodes(result) -> list[dict]:
+    return [_node_to_map_node({"node": record["node"]}) for record in result if record.get("node")]
+
+
+def _rows_to_edges(result) -> list[dict]:
+    return [
+        {"from_id": r["from_id"] or "", "to_id": r["to_id"] or "", "type": r["type"]}
+        for r in result
+        if r.get("from_id") and r.get("to_id")
+    ]
+
+
+def _single_record_to_result(record) -> tuple[list[dict], list[dict]]:
+    """Build (nodes, edges) from the one row returned by a consolidated query, de-duplicated."""
+    if record is None:
+        return [], []
+    nodes = {}
+    for node in record["nodes"]:
+        if node is not None and node.get("id") is not None:
+            nodes.setdefault(node.element_id, _node_to_map_node({"node": node}))
+    edges = {}
+    for e in record["edges"]:
+        if e["from_id"] and e["to_id"]:
+            edges.setdefault((e["from_id"], e["to_id"], e["type"]), dict(e))
+    return list(nodes.values()), list(edges.values())
+
+
+def _supply_chain_split_queries(depth: int) -> tuple[str, str]:
+    """(nodes_q, edges_q) for the two-query supply chain form."""
     # Neo4j does not allow parameters in variable-length patterns; use literal.
-    d = min(max(1, depth), 4)
+    d = _clamp_depth(depth)
     nodes_q = f"""
     MATCH (c:Company {{ id: $company_id }})
     OPTIONAL MATCH path = (c)<-[:SUPPLIES_TO*1..{d}]-(upstream)
@@ -117,22 +179,114 @@ def get_supply_chain(company_id: str, depth: int) -> tuple[list[dict], list[dict
     MATCH (n)-[r:LOCATED_IN|SHIPS_VIA]->(other)
     RETURN DISTINCT startNode(r).id AS from_id, endNode(r).id AS to_id, type(r) AS type
     """
-    with driver.session() as session:
-        nodes_result = session.run(nodes_q, company_id=company_id)
-        nodes = [_node_to_map_node({"node": record["node"]}) for record in nodes_result if record.get("node")]
-
-        edges_result = session.run(edges_q, company_id=company_id)
-        edges = [
-            {"from_id": r["from_id"] or "", "to_id": r["to_id"] or "", "type": r["type"]}
-            for r in edges_result
-            if r.get("from_id") and r.get("to_id")
-        ]
+    return nodes_q, edges_q
+
+
+def _supply_chain_single_query(depth: int) -> str:
+    """Consolidated supply chain query: expands the upstream paths once, returns one row of nodes + edges."""
+    d = _clamp_depth(depth)
+    return f"""
+    MATCH (c:Company {{ id: $company_id }})
+    OPTIONAL MATCH path = (c)<-[:SUPPLIES_TO*1..{d}]-()
+    WITH c, collect(path) AS paths
+    CALL {{
+        WITH paths
+        UNWIND paths AS p
+        UNWIND nodes(p) AS n
+        RETURN collect(DISTINCT n) AS pathNodes
+    }}
+    CALL {{
+        WITH paths
+        UNWIND paths AS p
+        UNWIND relationships(p) AS r
+        RETURN collect(DISTINCT r) AS supplyRels
+    }}
+    WITH c, supplyRels, [n IN pathNodes WHERE n <> c] + [c] AS chainNodes
+    CALL {{
+        WITH chainNodes
+        UNWIND chainNodes AS n
+        OPTIONAL MATCH (n)-[r:LOCATED_IN|SHIPS_VIA]->(other)
+        RETURN collect(DISTINCT r) AS contextRels,
+               collect(DISTINCT CASE
+                   WHEN (type(r) = 'LOCATED_IN' AND other:Country) OR (type(r) = 'SHIPS_VIA' AND other:Port)
+                   THEN other END) AS contextNodes
+    }}
+    WITH chainNodes + contextNodes AS nodes,
+         supplyRels + CASE WHEN size(supplyRels) > 0 THEN contextRels ELSE [] END AS rels
+    RETURN nodes,
+           [r IN rels | {{ from_id: startNode(r).id, to_id: endNode(r).id, type: type(r) }}] AS edges
+    """
+
+
+def _supply_chain_distance_query() -> str:
+    """Supply chain from the materialized UPSTREAM_OF { dist } relationships (see tier_distance).
+
+    Upstream nodes are an indexed `dist <= $depth` filter instead of a path expansion; a
+    SUPPLIES_TO edge is kept when its target is the company or within depth - 1 tiers of it, so
+    edges are expanded backwards from those targets (`near`), whose suppliers are all within
+    depth tiers, with no per-edge filter. No row is returned when the table was built for another
+    graph version, so a stale table costs only the GraphMeta lookup.
+    """
+    return """
+    OPTIONAL MATCH (m:GraphMeta { id: 'graph' })
+    WITH m WHERE m.distance_version = coalesce(m.version, 0)
+    OPTIONAL MATCH (c:Company { id: $company_id })
+    CALL {
+        WITH c
+        OPTIONAL MATCH (c)<-[u:UPSTREAM_OF]-(n)
+        WHERE u.dist <= $depth
+        RETURN collect(n) AS upstream,
+               collect(CASE WHEN u.dist < $depth THEN n END) AS near,
+               collect(CASE WHEN n IS NOT NULL THEN { id: n.id, dist: u.dist } END) AS tiers
+    }
+    CALL {
+        WITH c, near
+        UNWIND CASE WHEN c IS NULL THEN [] ELSE near + [c] END AS v
+        MATCH (n)-[r:SUPPLIES_TO]->(v)
+        RETURN collect(DISTINCT r) AS supplyRels
+    }
+    WITH supplyRels, tiers, CASE WHEN c IS NULL THEN [] ELSE upstream + [c] END AS chainNodes
+    CALL {
+        WITH chainNodes
+        UNWIND chainNodes AS n
+        OPTIONAL MATCH (n)-[r:LOCATED_IN|SHIPS_VIA]->(other)
+        RETURN collect(DISTINCT r) AS contextRels,
+               collect(DISTINCT CASE
+                   WHEN (type(r) = 'LOCATED_IN' AND other:Country) OR (type(r) = 'SHIPS_VIA' AND other:Port)
+                   THEN other END) AS contextNodes
+    }
+    WITH tiers, chainNodes + contextNodes AS nodes,
+         supplyRels + CASE WHEN size(supplyRels) > 0 THEN contextRels ELSE [] END AS rels
+    RETURN nodes, tiers,
+           [r IN rels | { from_id: startNode(r).id, to_id: endNode(r).id, type: type(r) }] AS edges
+    """
+
+
+_stale_warned = False
+
+
+def _distance_record_to_result(record, company_id: str):
+    """(nodes, edges) with `company_tier` from a distance-mode record, or None if the table is
+    stale (the query returns no record then)."""
+    global _stale_warned
+    if record is None:
+        if not _stale_warned:
+            logger.warning("Tier distance table is stale, using path expansion until tier_distance is rebuilt")
+            _stale_warned = True
+        return None
+    _stale_warned = False
+    nodes, edges = _single_record_to_result(record)
+    company_tier = {t["id"]: t["dist"] for t in record["tiers"]}
+    for node in nodes:
+        if node["id"] == company_id and node["type"] == "Company":
+            node["company_tier"] = 0
+        elif node["id"] in company_tier:
+            node["company_tier"] = company_tier[node["id"]]
     return nodes, edges
 
 
-def get_impact(scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
-    """Return (nodes, edges) for impact: supplier_failure or port_closure."""
-    driver = get_driver()
+def _impact_split_queries(scenario: str):
+    """(nodes_q, edges_q) for the two-query impact form, or None for an unknown scenario."""
     if scenario == "supplier_failure":
         # Downstream: who this supplier feeds (companies + suppliers)
         nodes_q = """
@@ -190,16 +344,300 @@ def get_impact(scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
         RETURN DISTINCT startNode(r).id AS from_id, endNode(r).id AS to_id, type(r) AS type
         """
     else:
-        return [], []
+        return None
+    return nodes_q, edges_q
+
+
+def _impact_single_query(scenario: str):
+    """Consolidated impact query returning one row of nodes + edges, or None for an unknown scenario."""
+    if scenario == "supplier_failure":
+        return """
+        MATCH (s:Supplier { id: $target_id })
+        OPTIONAL MATCH path = (s)-[:SUPPLIES_TO*1..4]->()
+        WITH s, collect(path) AS paths
+        CALL {
+            WITH paths
+            UNWIND paths AS p
+            UNWIND nodes(p) AS n
+            RETURN collect(DISTINCT n) AS pathNodes
+        }
+        CALL {
+            WITH paths
+            UNWIND paths AS p
+            UNWIND relationships(p) AS r
+            RETURN collect(DISTINCT r) AS rels
+        }
+        RETURN pathNodes + [s] AS nodes,
+               [r IN rels | { from_id: startNode(r).id, to_id: endNode(r).id, type: type(r) }] AS edges
+        """
+    if scenario == "port_closure":
+        # Paths are expanded once from every origin (1..2 SHIPS_VIA hops); edges are only
+        # taken from paths starting at a direct shipper, as in the two-query form.
+        return """
+        MATCH (p:Port { id: $target_id })
+        OPTIONAL MATCH (origin)-[:SHIPS_VIA*1..2]->(p)
+        WHERE origin:Supplier OR origin:Factory
+        WITH p, collect(DISTINCT origin) AS origins
+        CALL {
+            WITH p
+            OPTIONAL MATCH ()-[sv:SHIPS_VIA]->(p)
+            RETURN collect(DISTINCT sv) AS shipRels
+        }
+        WITH p, origins, shipRels,
+             [sv IN shipRels WHERE startNode(sv):Supplier OR startNode(sv):Factory | startNode(sv)] AS direct
+        CALL {
+            WITH origins
+            UNWIND origins AS o
+            MATCH path = (o)-[:SUPPLIES_TO|DEPENDS_ON*0..4]->()
+            RETURN collect(path) AS paths
+        }
+        CALL {
+            WITH paths
+            UNWIND paths AS path
+            UNWIND nodes(path) AS n
+            RETURN collect(DISTINCT n) AS pathNodes
+        }
+        CALL {
+            WITH paths, direct
+            UNWIND paths AS path
+            WITH path WHERE nodes(path)[0] IN direct
+            UNWIND relationships(path) AS r
+            RETURN collect(DISTINCT r) AS rels
+        }
+        RETURN [p] + origins + pathNodes AS nodes,
+               [r IN rels + shipRels | { from_id: startNode(r).id, to_id: endNode(r).id, type: type(r) }] AS edges
+        """
+    return None
+
+
+def get_supply_chain(company_id: str, depth: int) -> tuple[list[dict], list[dict]]:
+    """Return (nodes, edges) for supply chain: company + upstream via SUPPLIES_TO up to depth.
+    Includes LOCATED_IN and SHIPS_VIA for map context. Results are cached per graph version.
+    """
+    key = ("supply_chain", company_id, _clamp_depth(depth))
+    return cached(key, lambda: _query_supply_chain(company_id, depth))
+
+
+def get_portfolio(company_ids: list[str], depth: int) -> tuple[list[dict], list[dict]]:
+    """Return the merged supply chains of several companies, nodes tagged with `sources`.
+
+    Always answered from the snapshot, which runs every company in one bitmask traversal; see
+    GraphSnapshot.portfolio. Results are cached per graph version and set of companies, which are
+    traversed (and listed in `sources`) in id order whatever order they were requested in.
+    """
+    ids = sorted(set(company_ids))
+    key = ("portfolio", tuple(ids), _clamp_depth(depth))
+    return cached(key, lambda: snapshot.portfolio(ids, depth))
+
+
+def get_impact(scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+    """Return (nodes, edges) for impact: supplier_failure or port_closure. Results are cached per graph version."""
+    return cached(("impact", scenario, target_id), lambda: _query_impact(scenario, target_id))
+
+
+def get_weighted_impact(scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+    """get_impact with a volume-weighted `exposure` score (0..1) on every node.
+
+    Always answered from the snapshot, which holds SUPPLIES_TO as a sparse share matrix; see
+    GraphSnapshot.exposure. Results are cached per graph version.
+    """
+    return cached(("weighted_impact", scenario, target_id), lambda: snapshot.weighted_impact(scenario, target_id))
+
+
+def get_compound_impact(targets: list[tuple[str, str]]) -> tuple[list[dict], list[dict]]:
+    """Return the combined impact of several (kind, id) targets, nodes tagged with `sources`.
 
+    Always answered from the snapshot (loaded on first use), which runs every target in one
+    bitmask traversal; see GraphSnapshot.compound_impact. Results are cached per graph version and
+    set of targets, which are traversed (and listed in `sources`) in sorted order.
+    """
+    targets = sorted(set(targets))
+    key = ("compound_impact", tuple(targets))
+    return cached(key, lambda: snapshot.compound_impact(targets))
+
+
+def _query_supply_chain(company_id: str, depth: int) -> tuple[list[dict], list[dict]]:
+    if settings.query_backend == "snapshot":
+        return snapshot.get_supply_chain(company_id, depth)
+    driver = get_driver()
+    with driver.session() as session:
+        if settings.query_mode == "distance":
+            records = metrics.run(
+                session, "supply_chain.distance", _supply_chain_distance_query(),
+                company_id=company_id, depth=_clamp_depth(depth),
+            )
+            result = _distance_record_to_result(records[0] if records else None, company_id)
+            if result is not None:
+                return result
+        if settings.query_mode == "single":
+            records = metrics.run(session, "supply_chain.single", _supply_chain_single_query(depth), company_id=company_id)
+            return _single_record_to_result(records[0] if records else None)
+        nodes_q, edges_q = _supply_chain_split_queries(depth)
+        nodes = _rows_to_nodes(metrics.run(session, "supply_chain.nodes", nodes_q, company_id=company_id))
+        edges = _rows_to_edges(metrics.run(session, "supply_chain.edges", edges_q, company_id=company_id))
+    return nodes, edges
+
+
+def _query_impact(scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+    if settings.reachability_index:
+        return reachability.get_impact(scenario, target_id)
+    if settings.query_backend == "snapshot":
+        return snapshot.get_impact(scenario, target_id)
+    driver = get_driver()
+    if settings.query_mode == "single":
+        q = _impact_single_query(scenario)
+        if q is None:
+            return [], []
+        with driver.session() as session:
+            records = metrics.run(session, f"impact.{scenario}.single", q, target_id=target_id)
+        return _single_record_to_result(records[0] if records else None)
+
+    queries = _impact_split_queries(scenario)
+    if queries is None:
+        return [], []
+    nodes_q, edges_q = queries
     with driver.session() as session:
-        nodes_result = session.run(nodes_q, target_id=target_id)
-        nodes = [_node_to_map_node({"node": record["node"]}) for record in nodes_result if record.get("node")]
-
-        edges_result = session.run(edges_q, target_id=target_id)
-        edges = [
-            {"from_id": r["from_id"] or "", "to_id": r["to_id"] or "", "type": r["type"]}
-            for r in edges_result
-            if r.get("from_id") and r.get("to_id")
-        ]
+        nodes = _rows_to_nodes(metrics.run(session, f"impact.{scenario}.nodes", nodes_q, target_id=target_id))
+        edges = _rows_to_edges(metrics.run(session, f"impact.{scenario}.edges", edges_q, target_id=target_id))
     return nodes, edges
+
+
+def _expand_query(direction: str) -> str:
+    """One hop from the frontier nodes plus the new nodes' LOCATED_IN/SHIPS_VIA context.
+
+    Frontier ids are matched through one UNION branch per label so each lookup uses that
+    label's id constraint index.
+    """
+    hop = "(n)<-[r:SUPPLIES_TO]-(m)" if direction == "upstream" else "(n)-[r:SUPPLIES_TO|DEPENDS_ON]->(m)"
+    lookup = "\n        UNION\n        ".join(
+        f"WITH fid MATCH (n:{label} {{ id: fid }}) RETURN n" for label in snapshot.EXPAND_LABELS
+    )
+    return f"""
+    UNWIND $frontier AS fid
+    CALL {{
+        {lookup}
+    }}
+    MATCH {hop}
+    WITH collect(DISTINCT r) AS hopRels, collect(DISTINCT m) AS reached
+    WITH hopRels, [m IN reached WHERE m.id IS NOT NULL AND NOT m.id IN $known] AS fresh
+    CALL {{
+        WITH fresh
+        UNWIND fresh AS m
+        MATCH (m)-[c:LOCATED_IN|SHIPS_VIA]->(ctx)
+        WHERE (type(c) = 'LOCATED_IN' AND ctx:Country) OR (type(c) = 'SHIPS_VIA' AND ctx:Port)
+        RETURN collect(DISTINCT c) AS contextRels,
+               [x IN collect(DISTINCT ctx) WHERE NOT x.id IN $known] AS contextNodes
+    }}
+    RETURN fresh + contextNodes AS nodes,
+           [r IN hopRels + contextRels | {{ from_id: startNode(r).id, to_id: endNode(r).id, type: type(r) }}] AS edges,
+           [m IN fresh | m.id] AS frontier
+    """
+
+
+def expand(frontier: list[str], known: list[str], direction: str) -> tuple[list[dict], list[dict], list[str]]:
+    """Return (nodes, edges, next frontier) for one hop from the frontier node ids.
+
+    upstream follows SUPPLIES_TO backwards (the next supplier tier), downstream follows
+    SUPPLIES_TO/DEPENDS_ON forwards (impact). Nodes already in known (or the frontier) are not
+    returned again, but every hop edge into the frontier is, so applying expand to the nodes at
+    distance d of a depth-d supply chain yields exactly the depth d+1 additions.
+    """
+    if settings.query_backend == "snapshot":
+        return snapshot.expand(frontier, known, direction)
+    with get_driver().session() as session:
+        records = metrics.run(
+            session, f"expand.{direction}", _expand_query(direction), frontier=frontier, known=[*known, *frontier]
+        )
+    record = records[0] if records else None
+    nodes, edges = _single_record_to_result(record)
+    return nodes, edges, record["frontier"] if record else []
+
+
+def _network_queries(crosses_antimeridian: bool = False) -> tuple[str, str]:
+    """Nodes inside the viewport and the relationships leaving them, one UNION branch per label
+    so each range predicate can use that label's (lat, lon) coords index.
+
+    A viewport crossing the antimeridian (min_lon > max_lon) matches either side of it."""
+    if crosses_antimeridian:
+        lon = "({v}.lon >= $min_lon OR {v}.lon <= $max_lon)"
+    else:
+        lon = "{v}.lon >= $min_lon AND {v}.lon <= $max_lon"
+    bbox = "{v}.lat >= $min_lat AND {v}.lat <= $max_lat AND " + lon
+    nodes_q = "\nUNION ALL\n".join(
+        f"""
+        MATCH (n:{label}) WHERE {bbox.format(v="n")}
+        RETURN elementId(n) AS key, n.id AS id, n.name AS name, '{label}' AS type, n.tier AS tier, n.lat AS lat, n.lon AS lon
+        """
+        for label in geo.NETWORK_LABELS
+    )
+    rel_types = "|".join(geo.NETWORK_REL_TYPES)
+    edges_q = "\nUNION ALL\n".join(
+        f"""
+        MATCH (a:{label})-[r:{rel_types}]->(b) WHERE {bbox.format(v="a")} AND {bbox.format(v="b")}
+        RETURN elementId(a) AS src, elementId(b) AS dst, type(r) AS type
+        """
+        for label in geo.NETWORK_LABELS
+    )
+    return nodes_q, edges_q
+
+
+def _viewport_params(viewport) -> dict:
+    return {
+        "min_lat": viewport.min_lat,
+        "max_lat": viewport.max_lat,
+        "min_lon": viewport.min_lon,
+        "max_lon": viewport.max_lon,
+    }
+
+
+def get_network(viewport) -> tuple[list[dict], list[dict]]:
+    """Return the whole network inside the viewport, clustered by geo.NETWORK_* rules."""
+    if settings.query_backend == "snapshot":
+        return geo.network_from_snapshot(snapshot.get_snapshot(), viewport)
+    nodes_q, edges_q = _network_queries(geo.crosses_antimeridian(viewport))
+    params = _viewport_params(viewport)
+    with get_driver().session() as session:
+        node_rows = [dict(record) for record in metrics.run(session, "network.nodes", nodes_q, **params) if record["id"] is not None]
+        edge_rows = [dict(record) for record in metrics.run(session, "network.edges", edges_q, **params)]
+    return geo.network_from_rows(node_rows, edge_rows, viewport)
+
+
+def iter_supply_chain(company_id: str, depth: int):
+    """Yield ("node", dict) then ("edge", dict) items for the supply chain as rows arrive from Neo4j.
+
+    Always uses the split form so each cursor is consumed row by row; bypasses the result cache.
+    """
+    if settings.query_backend == "snapshot":
+        yield from _iter_result(snapshot.get_supply_chain(company_id, depth))
+        return
+    nodes_q, edges_q = _supply_chain_split_queries(depth)
+    yield from _iter_split("supply_chain", nodes_q, edges_q, company_id=company_id)
+
+
+def iter_impact(scenario: str, target_id: str):
+    """Streaming counterpart of get_impact; see iter_supply_chain."""
+    if settings.query_backend == "snapshot":
+        yield from _iter_result(snapshot.get_impact(scenario, target_id))
+        return
+    queries = _impact_split_queries(scenario)
+    if queries is None:
+        return
+    yield from _iter_split(f"impact.{scenario}", *queries, target_id=target_id)
+
+
+def _iter_result(result: tuple[list[dict], list[dict]]):
+    nodes, edges = result
+    for n in nodes:
+        yield "node", n
+    for e in edges:
+        yield "edge", e
+
+
+def _iter_split(name: str, nodes_q: str, edges_q: str, **params):
+    with get_driver().session() as session:
+        for record in metrics.stream(session, f"{name}.nodes", nodes_q, **params):
+            if record.get("node"):
+                yield "node", _node_to_map_node({"node": record["node"]})
+        for r in metrics.stream(session, f"{name}.edges", edges_q, **params):
+            if r.get("from_id") and r.get("to_id"):
+                yield "edge", {"from_id": r["from_id"], "to_id": r["to_id"], "type": r["type"]}
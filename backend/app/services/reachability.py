@@ -0,0 +1,258 @@
+"""Materialized reachability index for impact analysis.
+
+For every Supplier (supplier_failure) and Port (port_closure) the index stores the impacted
+node and edge indices of the snapshot as sorted int32 arrays, so get_impact becomes a lookup.
+Build it offline after ingest and save it next to the API:
+
+    python -m app.services.reachability build --out reachability.npz
+
+When the graph version changes the index is re-aligned to the new snapshot and only targets
+whose 4-hop neighbourhood touches a changed node are recomputed (a full rebuild if the
+changed nodes are not known). Builds and refreshes run on a background thread; impact
+requests are answered by snapshot traversal until the index for the current version is ready.
+"""
+import argparse
+import logging
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from app.config import settings
+from app.services import graph_version, snapshot
+from app.services.snapshot import IMPACT_TARGET_LABELS, MAX_IMPACT_DEPTH, GraphSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class _Alignment(NamedTuple):
+    """The node keys and edges an index's integer ids refer to."""
+
+    version: object
+    keys: list
+    edge_src: np.ndarray
+    edge_dst: np.ndarray
+    edge_type: list
+
+
+def _align(snap: GraphSnapshot) -> _Alignment:
+    return _Alignment(snap.version, snap.keys, snap.edge_src, snap.edge_dst, snap.edge_type)
+
+
+def _sorted32(values: np.ndarray) -> np.ndarray:
+    return np.unique(values).astype(np.int32)
+
+
+class ReachabilityIndex:
+    """Per-target impacted node/edge sets, keyed by scenario and target node index."""
+
+    def __init__(self, alignment: _Alignment, entries: dict[str, dict[int, tuple[np.ndarray, np.ndarray]]]):
+        self.alignment = alignment
+        self.entries = entries
+
+    @property
+    def version(self):
+        return self.alignment.version
+
+    @classmethod
+    def build(cls, snap: GraphSnapshot) -> "ReachabilityIndex":
+        index = cls(_align(snap), {scenario: {} for scenario in IMPACT_TARGET_LABELS})
+        for scenario, label in IMPACT_TARGET_LABELS.items():
+            index._compute(snap, scenario, np.flatnonzero(snap.label_sets[label]))
+        return index
+
+    def _compute(self, snap: GraphSnapshot, scenario: str, targets):
+        table = self.entries[scenario]
+        for t in targets:
+            node_idx, edge_idx = snap.impact_indices(scenario, int(t))
+            table[int(t)] = (_sorted32(node_idx), _sorted32(edge_idx))
+
+    def lookup(self, snap: GraphSnapshot, scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+        """Impact result for target_id; snap must be the snapshot the index is aligned to."""
+        label = IMPACT_TARGET_LABELS.get(scenario)
+        target = snap.lookup(label, target_id) if label else None
+        if target is None:
+            return [], []
+        entry = self.entries[scenario].get(target)
+        if entry is None:
+            return snap.impact(scenario, target_id)
+        return snap.to_result(*entry)
+
+    # ----- Incremental refresh -----
+
+    def refresh(self, snap: GraphSnapshot, changed_ids=None) -> "ReachabilityIndex":
+        """Return an index aligned to snap. With changed_ids (node `id`s touched since the index
+        was built), only affected targets are recomputed; otherwise everything is rebuilt."""
+        if changed_ids is None:
+            return ReachabilityIndex.build(snap)
+        old = self.alignment
+        key_to_new = {k: i for i, k in enumerate(snap.keys)}
+        node_map = np.fromiter((key_to_new.get(k, -1) for k in old.keys), dtype=np.int64, count=len(old.keys))
+        new_edges = {
+            (snap.keys[s], snap.keys[d], t): e
+            for e, (s, d, t) in enumerate(zip(snap.edge_src, snap.edge_dst, snap.edge_type))
+        }
+        edge_map = np.fromiter(
+            (new_edges.get((old.keys[s], old.keys[d], t), -1) for s, d, t in zip(old.edge_src, old.edge_dst, old.edge_type)),
+            dtype=np.int64,
+            count=len(old.edge_type),
+        )
+
+        changed_ids = set(changed_ids)
+        changed_new = np.array([i for i, node_id in enumerate(snap.ids) if node_id in changed_ids], dtype=np.int64)
+        changed_old = np.flatnonzero(np.isin(node_map, changed_new))
+        dirty = self._affected_targets(snap, changed_new)
+
+        entries = {scenario: {} for scenario in IMPACT_TARGET_LABELS}
+        for scenario, table in self.entries.items():
+            for target, (node_idx, edge_idx) in table.items():
+                new_target = int(node_map[target])
+                if new_target < 0 or new_target in dirty[scenario] or np.isin(node_idx, changed_old).any():
+                    dirty[scenario].add(new_target)
+                    continue
+                nodes, edges = node_map[node_idx], edge_map[edge_idx]
+                if (nodes < 0).any() or (edges < 0).any():
+                    dirty[scenario].add(new_target)
+                    continue
+                entries[scenario][new_target] = (_sorted32(nodes), _sorted32(edges))
+
+        index = ReachabilityIndex(_align(snap), entries)
+        for scenario, label in IMPACT_TARGET_LABELS.items():
+            targets = np.flatnonzero(snap.label_sets[label])
+            missing = [t for t in targets if int(t) not in entries[scenario]]
+            index._compute(snap, scenario, missing)
+        return index
+
+    @staticmethod
+    def _affected_targets(snap: GraphSnapshot, changed: np.ndarray) -> dict[str, set[int]]:
+        """Targets whose impact could include a changed node, computed on the new snapshot."""
+        if changed.size == 0:
+            return {scenario: set() for scenario in IMPACT_TARGET_LABELS}
+        suppliers = np.flatnonzero(snap.bfs(changed, [snap.inc["SUPPLIES_TO"]], MAX_IMPACT_DEPTH) >= 0)
+        origins = np.flatnonzero(
+            snap.bfs(changed, [snap.inc["SUPPLIES_TO"], snap.inc["DEPENDS_ON"]], MAX_IMPACT_DEPTH) >= 0
+        )
+        ports = np.flatnonzero(snap.bfs(origins, [snap.out["SHIPS_VIA"]], 2) >= 0)
+        return {
+            "supplier_failure": {int(i) for i in suppliers[snap.has_label(suppliers, "Supplier")]},
+            "port_closure": {int(i) for i in ports[snap.has_label(ports, "Port")]},
+        }
+
+    # ----- Persistence -----
+
+    def save(self, path: Path):
+        """Write the index as a compressed .npz (CSR-style offsets + sorted int32 values)."""
+        arrays = {
+            "version": np.array(-1 if self.version is None else self.version),
+            "keys": np.array(self.alignment.keys, dtype=str),
+            "edge_src": self.alignment.edge_src,
+            "edge_dst": self.alignment.edge_dst,
+            "edge_type": np.array(self.alignment.edge_type, dtype=str),
+        }
+        for scenario, table in self.entries.items():
+            targets = np.array(sorted(table), dtype=np.int64)
+            for part, pos in (("nodes", 0), ("edges", 1)):
+                values = [table[t][pos] for t in targets]
+                ptr = np.zeros(len(values) + 1, dtype=np.int64)
+                np.cumsum([v.size for v in values], out=ptr[1:])
+                arrays[f"{scenario}_{part}_ptr"] = ptr
+                arrays[f"{scenario}_{part}"] = np.concatenate(values) if values else np.empty(0, dtype=np.int32)
+            arrays[f"{scenario}_targets"] = targets
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "ReachabilityIndex":
+        data = np.load(path)
+        version = int(data["version"])
+        alignment = _Alignment(
+            None if version < 0 else version,
+            data["keys"].tolist(),
+            data["edge_src"],
+            data["edge_dst"],
+            data["edge_type"].tolist(),
+        )
+        entries = {}
+        for scenario in IMPACT_TARGET_LABELS:
+            targets = data[f"{scenario}_targets"]
+            n_ptr, nodes = data[f"{scenario}_nodes_ptr"], data[f"{scenario}_nodes"]
+            e_ptr, edges = data[f"{scenario}_edges_ptr"], data[f"{scenario}_edges"]
+            entries[scenario] = {
+                int(t): (nodes[n_ptr[i]:n_ptr[i + 1]], edges[e_ptr[i]:e_ptr[i + 1]])
+                for i, t in enumerate(targets)
+            }
+        return cls(alignment, entries)
+
+
+_index = None
+_lock = threading.Lock()
+_builder = None  # background thread building or refreshing _index
+
+
+def _initial_index(snap: GraphSnapshot) -> ReachabilityIndex:
+    path = Path(settings.reachability_index_path) if settings.reachability_index_path else None
+    if path and path.exists():
+        saved = ReachabilityIndex.load(path)
+        if saved.version == snap.version:
+            # Same graph, possibly different node order: re-align without recomputing.
+            return saved.refresh(snap, changed_ids=())
+        logger.info("Reachability index at %s is for graph version %s, rebuilding", path, saved.version)
+    return ReachabilityIndex.build(snap)
+
+
+def _update(snap: GraphSnapshot):
+    global _index, _builder
+    try:
+        if _index is None:
+            index = _initial_index(snap)
+        else:
+            # Writes that did not record their changes (e.g. a reseed) force a full rebuild.
+            index = _index.refresh(snap, graph_version.changes_between(_index.version, snap.version))
+        with _lock:
+            _index = index
+    except Exception:
+        logger.exception("Reachability index update for graph version %s failed", snap.version)
+    finally:
+        with _lock:
+            _builder = None
+
+
+def get_index(snap: GraphSnapshot) -> ReachabilityIndex | None:
+    """Return the process-wide index if it is aligned to snap.
+
+    Otherwise start building (or incrementally refreshing) it on a background thread and return
+    None; callers answer from the snapshot until it is ready, so no request waits on a build.
+    """
+    global _builder
+    index = _index
+    if index is not None and index.alignment.keys is snap.keys:
+        return index
+    with _lock:
+        if _builder is None:
+            _builder = threading.Thread(target=_update, args=(snap,), name="reachability-index", daemon=True)
+            _builder.start()
+    return None
+
+
+def get_impact(scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+    snap = snapshot.get_snapshot()
+    index = get_index(snap)
+    if index is None:
+        return snap.impact(scenario, target_id)
+    return index.lookup(snap, scenario, target_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the reachability index from the current graph.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--out", type=Path, default=Path(settings.reachability_index_path or "reachability.npz"))
+    args = parser.parse_args()
+    snap = snapshot.load_snapshot()
+    index = ReachabilityIndex.build(snap)
+    index.save(args.out)
+    sizes = {scenario: len(table) for scenario, table in index.entries.items()}
+    print(f"Indexed graph version {snap.version}: {sizes} -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
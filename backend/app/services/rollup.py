@@ -0,0 +1,107 @@
+"""Country and port rollups of graph results for overview maps.
+
+Each node of a result is assigned to a group: the Country it is LOCATED_IN (rollup "country")
+or the Port it ships through (rollup "port"; the first by id if it uses several). Grouped nodes
+are replaced by one node per group, carrying the member count and the number of suppliers per
+tier (their tier for the requested company where known); edges are re-pointed at the groups and
+merged with a count. Nodes without a group (e.g. companies in a port rollup) are kept as they are.
+
+Group membership comes from the result's own LOCATED_IN / SHIPS_VIA edges. Nodes the result
+gives no such edge for (e.g. in impact results) are looked up in the in-process snapshot with the
+snapshot query backend, which already has it loaded, and otherwise with one Cypher query.
+"""
+from collections import Counter
+
+from app.config import settings
+from app.services import queries, snapshot
+
+ROLLUP_GROUPS = {"country": ("LOCATED_IN", "Country"), "port": ("SHIPS_VIA", "Port")}
+
+
+def _edge_group_ids(nodes: list[dict], edges: list[dict], by: str) -> list[str | None]:
+    """Groups from the result's own edges, in one pass over them."""
+    rel, label = ROLLUP_GROUPS[by]
+    group_ids = {n["id"] for n in nodes if n["type"] == label}
+    first: dict[str, str] = {}
+    for edge in edges:
+        if edge["type"] == rel and edge["to_id"] in group_ids:
+            current = first.get(edge["from_id"])
+            if current is None or edge["to_id"] < current:
+                first[edge["from_id"]] = edge["to_id"]
+    return [n["id"] if n["type"] == label else first.get(n["id"]) for n in nodes]
+
+
+def _snapshot_group_id(snap, node: dict, by: str) -> str | None:
+    rel, label = ROLLUP_GROUPS[by]
+    i = snap.lookup(node["type"], node["id"])
+    if i is None:
+        return None
+    csr = snap.out[rel]
+    nbrs = csr.nbr[csr.indptr[i]:csr.indptr[i + 1]]
+    ids = [snap.ids[j] for j in nbrs if snap.label_sets[label][j] and snap.ids[j] is not None]
+    return min(ids) if ids else None
+
+
+def rollup(nodes: list[dict], edges: list[dict], by: str, snap=None) -> tuple[list[dict], list[dict]]:
+    """Collapse a (nodes, edges) result into country or port groups (see module docstring)."""
+    if snap is None and settings.query_backend == "snapshot":
+        snap = snapshot.get_snapshot()
+    rel, label = ROLLUP_GROUPS[by]
+    groups = _edge_group_ids(nodes, edges, by)
+    in_result = {n["id"]: n for n in nodes if n["type"] == label}
+    missing = [n for n, g in zip(nodes, groups) if g is None]
+    if missing and snap is not None:
+        groups = [g if g is not None else _snapshot_group_id(snap, n, by) for n, g in zip(nodes, groups)]
+    elif missing:
+        looked_up = queries.get_groups(missing, rel, label)
+        for group_node in looked_up.values():
+            in_result.setdefault(group_node["id"], group_node)
+        looked_up_ids = {node_id: group_node["id"] for node_id, group_node in looked_up.items()}
+        groups = [g if g is not None else looked_up_ids.get(n["id"]) for n, g in zip(nodes, groups)]
+
+    target: dict[str, str] = {}
+    members: dict[str, Counter] = {}
+    tiers: dict[str, Counter] = {}
+    out_nodes = []
+    for node, group in zip(nodes, groups):
+        if group is None:
+            target[node["id"]] = node["id"]
+            out_nodes.append(node)
+            continue
+        target[node["id"]] = group
+        if group not in members:
+            members[group] = Counter()
+            tiers[group] = Counter()
+            out_nodes.append(group)
+        if node["id"] != group:
+            members[group][node["type"]] += 1
+            tier = node.get("company_tier", node.get("tier"))
+            if node["type"] == "Supplier" and tier is not None:
+                tiers[group][str(tier)] += 1
+
+    for k, item in enumerate(out_nodes):
+        if not isinstance(item, str):
+            continue
+        if item in in_result:
+            group_node = dict(in_result[item])
+        elif snap is not None and snap.lookup(label, item) is not None:
+            group_node = snap.node_dict(snap.lookup(label, item))
+        else:
+            group_node = {"id": item, "name": item, "type": label, "tier": None}
+        group_node["count"] = sum(members[item].values())
+        group_node["tier_counts"] = dict(sorted(tiers[item].items()))
+        out_nodes[k] = group_node
+
+    merged: Counter = Counter()
+    for edge in edges:
+        src, dst = target.get(edge["from_id"]), target.get(edge["to_id"])
+        if src is None or dst is None or src == dst:
+            continue
+        merged[(src, dst, edge["type"])] += edge.get("count", 1)
+    out_edges = []
+    for (src, dst, rel_type), count in merged.items():
+        edge = {"from_id": src, "to_id": dst, "type": rel_type}
+        if count > 1:
+            edge["count"] = count
+        out_edges.append(edge)
+    return out_nodes, out_edges
@@ -0,0 +1,638 @@
+"""In-process graph snapshot for supply-chain and impact traversals.
+
+Loads the whole graph once into CSR adjacency arrays (node ids interned to ints)
+and answers get_supply_chain / get_impact with BFS instead of Cypher path expansion.
+Results match the Cypher queries in queries.py (as sets; order is not significant).
+"""
+import threading
+from functools import cached_property
+from typing import NamedTuple
+
+import numpy as np
+from scipy import sparse
+
+from app import metrics
+from app.database import get_driver
+from app.services import graph_version
+
+NODE_LABELS = ("Company", "Supplier", "Factory", "Port", "Country")
+REL_TYPES = ("SUPPLIES_TO", "DEPENDS_ON", "SHIPS_VIA", "LOCATED_IN")
+MAX_IMPACT_DEPTH = 4
+IMPACT_TARGET_LABELS = {"supplier_failure": "Supplier", "port_closure": "Port"}
+# Labels a frontier id of the expand API may refer to.
+EXPAND_LABELS = ("Company", "Supplier", "Factory")
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+class _CSR:
+    """Compressed adjacency for one relationship type and direction.
+
+    Neighbours of node i are nbr[indptr[i]:indptr[i + 1]]; eid holds the matching edge index.
+    """
+
+    def __init__(self, num_nodes: int, src: np.ndarray, dst: np.ndarray, edge_ids: np.ndarray):
+        order = np.argsort(src, kind="stable")
+        self.nbr = dst[order]
+        self.eid = edge_ids[order]
+        counts = np.bincount(src, minlength=num_nodes)
+        self.indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.indptr[1:])
+
+    def expand(self, frontier: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return (neighbours, edge ids) of all nodes in frontier, vectorized."""
+        _, nbrs, eids = self.expand_pairs(frontier)
+        return nbrs, eids
+
+    def expand_pairs(self, frontier: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Like expand, but also return the frontier node each neighbour was reached from."""
+        if frontier.size == 0:
+            return _EMPTY, _EMPTY, _EMPTY
+        starts = self.indptr[frontier]
+        counts = self.indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return _EMPTY, _EMPTY, _EMPTY
+        # Positions starts[k] .. starts[k] + counts[k] for every frontier node, concatenated.
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        pos = offsets + np.arange(total)
+        return np.repeat(frontier, counts), self.nbr[pos], self.eid[pos]
+
+
+def _propagate_masks(seeds: np.ndarray, adjacency: list[_CSR], max_hops: int) -> list[np.ndarray]:
+    """Multi-source BFS over bitmasks: one bit per source, all sources in a single traversal.
+
+    seeds is an (num_nodes, words) uint64 array with each source's bit set on its seed nodes.
+    Returns layers[h] = the bits that first reach each node at hop h (layers[0] == seeds), so a
+    bit is set in layers[h][v] exactly when v is at hop distance h from that source's seeds.
+    Only newly reached bits are forwarded, so each (node, source) pair is expanded once.
+    """
+    reached = seeds.copy()
+    layers = [seeds]
+    current = seeds
+    for _ in range(max_hops):
+        frontier = np.flatnonzero(current.any(axis=1))
+        if frontier.size == 0:
+            break
+        nxt = np.zeros_like(seeds)
+        for csr in adjacency:
+            src, nbrs, _ = csr.expand_pairs(frontier)
+            if nbrs.size:
+                np.bitwise_or.at(nxt, nbrs, current[src])
+        nxt &= ~reached
+        reached |= nxt
+        layers.append(nxt)
+        current = nxt
+    return layers
+
+
+def _union(layers: list[np.ndarray], hops: range) -> np.ndarray:
+    out = np.zeros_like(layers[0])
+    for h in hops:
+        if h < len(layers):
+            out |= layers[h]
+    return out
+
+
+class _Rows(NamedTuple):
+    """Sparse bitmasks: masks[k] belongs to node (or edge) idx[k]; idx is sorted and unique.
+
+    Used instead of (num_nodes, words) arrays where only the visited part of the graph has bits.
+    """
+
+    idx: np.ndarray
+    masks: np.ndarray
+
+
+def _rows(idx: np.ndarray, masks: np.ndarray, words: int) -> _Rows:
+    """Group (idx, masks) pairs by idx, OR-ing the masks of repeated indices; drops empty masks."""
+    if idx.size == 0:
+        return _Rows(_EMPTY, np.zeros((0, words), dtype=np.uint64))
+    unique, inverse = np.unique(idx, return_inverse=True)
+    out = np.zeros((unique.size, words), dtype=np.uint64)
+    np.bitwise_or.at(out, inverse, masks)
+    keep = out.any(axis=1)
+    return _Rows(unique[keep], out[keep])
+
+
+def _one_hot(idx: list[int], bits: list[int], words: int) -> _Rows:
+    """Rows with bit bits[k] set on node idx[k]."""
+    masks = np.zeros((len(idx), words), dtype=np.uint64)
+    for k, bit in enumerate(bits):
+        masks[k, bit // 64] |= np.uint64(1 << (bit % 64))
+    return _rows(np.asarray(idx, dtype=np.int64), masks, words)
+
+
+def _merge(parts: list[_Rows], words: int) -> _Rows:
+    if not parts:
+        return _rows(_EMPTY, np.zeros((0, words), dtype=np.uint64), words)
+    return _rows(np.concatenate([p.idx for p in parts]), np.concatenate([p.masks for p in parts]), words)
+
+
+def _masks_of(rows: _Rows, idx: np.ndarray) -> np.ndarray:
+    """Masks of the given indices (zero where an index has no row)."""
+    out = np.zeros((idx.size, rows.masks.shape[1]), dtype=np.uint64)
+    if rows.idx.size and idx.size:
+        pos = np.minimum(np.searchsorted(rows.idx, idx), rows.idx.size - 1)
+        hit = rows.idx[pos] == idx
+        out[hit] = rows.masks[pos[hit]]
+    return out
+
+
+def _select(rows: _Rows, keep: np.ndarray) -> _Rows:
+    return _Rows(rows.idx[keep], rows.masks[keep])
+
+
+def _propagate_rows(seeds: _Rows, adjacency: list[_CSR], max_hops: int) -> list[_Rows]:
+    """_propagate_masks over sparse rows: the work and memory follow the visited frontier."""
+    words = seeds.masks.shape[1]
+    reached = seeds
+    layers = [seeds]
+    current = seeds
+    for _ in range(max_hops):
+        if current.idx.size == 0:
+            break
+        parts = []
+        for csr in adjacency:
+            src, nbrs, _ = csr.expand_pairs(current.idx)
+            parts.append(_Rows(nbrs, current.masks[np.searchsorted(current.idx, src)]))
+        nxt = _merge(parts, words)
+        nxt = _Rows(nxt.idx, nxt.masks & ~_masks_of(reached, nxt.idx))
+        nxt = _select(nxt, nxt.masks.any(axis=1))
+        reached = _merge([reached, nxt], words)
+        layers.append(nxt)
+        current = nxt
+    return layers
+
+
+def _union_rows(layers: list[_Rows], hops: range) -> _Rows:
+    return _merge([layers[h] for h in hops if h < len(layers)], layers[0].masks.shape[1])
+
+
+class GraphSnapshot:
+    """Immutable in-memory copy of the supply chain graph."""
+
+    def __init__(self, node_rows: list[dict], edge_rows: list[dict], version=None):
+        """Build from node rows (key, labels, id, name, tier, lat, lon) and edge rows (src, dst, type,
+        optional volume).
+
+        `key` is any unique node handle (Neo4j elementId when loaded from the database).
+        """
+        self.version = version
+        self.keys = [r["key"] for r in node_rows]
+        index = {k: i for i, k in enumerate(self.keys)}
+        self.labels = [list(r.get("labels") or []) for r in node_rows]
+        self.ids = [r.get("id") for r in node_rows]
+        self.names = [r.get("name") for r in node_rows]
+        self.tiers = [r.get("tier") for r in node_rows]
+        self.lats = [r.get("lat") for r in node_rows]
+        self.lons = [r.get("lon") for r in node_rows]
+        self.coords = np.array([[r.get("lat"), r.get("lon")] for r in node_rows], dtype=float).reshape(-1, 2)
+        self.by_label_id: dict[tuple[str, str], int] = {}
+        for i, (labels, node_id) in enumerate(zip(self.labels, self.ids)):
+            for label in labels:
+                self.by_label_id.setdefault((label, node_id), i)
+        self.label_sets = {label: np.zeros(len(self.keys), dtype=bool) for label in NODE_LABELS}
+        for i, labels in enumerate(self.labels):
+            for label in labels:
+                if label in self.label_sets:
+                    self.label_sets[label][i] = True
+
+        n = len(self.keys)
+        kept = [r for r in edge_rows if r["src"] in index and r["dst"] in index]
+        self.edge_src = np.fromiter((index[r["src"]] for r in kept), dtype=np.int64, count=len(kept))
+        self.edge_dst = np.fromiter((index[r["dst"]] for r in kept), dtype=np.int64, count=len(kept))
+        self.edge_type = [r["type"] for r in kept]
+        self.edge_volume = np.array([r.get("volume") for r in kept], dtype=float).reshape(-1)
+        types = np.array(self.edge_type, dtype=object)
+        self.out: dict[str, _CSR] = {}
+        self.inc: dict[str, _CSR] = {}
+        for rel in REL_TYPES:
+            mask = types == rel if len(kept) else np.zeros(0, dtype=bool)
+            ids = np.flatnonzero(mask)
+            src, dst = self.edge_src[ids], self.edge_dst[ids]
+            self.out[rel] = _CSR(n, src, dst, ids)
+            self.inc[rel] = _CSR(n, dst, src, ids)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.keys)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edge_type)
+
+    @cached_property
+    def supply_shares(self) -> sparse.csr_matrix:
+        """Sparse matrix S with S[v, u] = share of v's incoming SUPPLIES_TO volume supplied by u.
+
+        Edges without a volume count as 1, so a node whose suppliers carry no volumes splits
+        its supply equally between them. Parallel edges add up.
+        """
+        ids = self.out["SUPPLIES_TO"].eid
+        volume = self.edge_volume[ids]
+        volume = np.where(np.isnan(volume), 1.0, np.maximum(volume, 0.0))
+        src, dst = self.edge_src[ids], self.edge_dst[ids]
+        total = np.bincount(dst, weights=volume, minlength=self.num_nodes)
+        share = np.divide(volume, total[dst], out=np.zeros_like(volume), where=total[dst] > 0)
+        return sparse.csr_matrix((share, (dst, src)), shape=(self.num_nodes, self.num_nodes))
+
+    def lookup(self, label: str, node_id: str):
+        return self.by_label_id.get((label, node_id))
+
+    def bfs(self, seeds, adjacency: list[_CSR], max_hops: int) -> np.ndarray:
+        """Hop distance from the nearest seed for every node (-1 = not reached within max_hops)."""
+        dist = np.full(self.num_nodes, -1, dtype=np.int64)
+        frontier = np.unique(np.asarray(list(seeds), dtype=np.int64))
+        dist[frontier] = 0
+        for hop in range(1, max_hops + 1):
+            if frontier.size == 0:
+                break
+            reached = [csr.expand(frontier)[0] for csr in adjacency]
+            nxt = np.unique(np.concatenate(reached)) if reached else _EMPTY
+            nxt = nxt[dist[nxt] < 0]
+            dist[nxt] = hop
+            frontier = nxt
+        return dist
+
+    def edges_from(self, nodes: np.ndarray, adjacency: list[_CSR]) -> np.ndarray:
+        """Edge indices of all relationships leaving `nodes` through the given adjacency."""
+        found = [csr.expand(nodes)[1] for csr in adjacency]
+        return np.unique(np.concatenate(found)) if found else _EMPTY
+
+    def has_label(self, nodes: np.ndarray, *labels: str) -> np.ndarray:
+        mask = np.zeros(nodes.size, dtype=bool)
+        for label in labels:
+            mask |= self.label_sets[label][nodes]
+        return mask
+
+    def node_dict(self, i: int) -> dict:
+        labels = self.labels[i]
+        return {
+            "id": self.ids[i] or "",
+            "name": self.names[i] or "",
+            "type": labels[0] if labels else "Unknown",
+            "tier": self.tiers[i],
+            "lat": self.lats[i],
+            "lon": self.lons[i],
+        }
+
+    def to_result(self, node_idx, edge_idx) -> tuple[list[dict], list[dict]]:
+        """Turn node and edge indices into (nodes, edges) dicts with the Cypher path's filtering."""
+        nodes = [self.node_dict(i) for i in dict.fromkeys(int(i) for i in node_idx) if self.ids[i] is not None]
+        edges = {}
+        for e in edge_idx:
+            from_id = self.ids[self.edge_src[e]]
+            to_id = self.ids[self.edge_dst[e]]
+            if from_id and to_id:
+                key = (from_id, to_id, self.edge_type[e])
+                edges.setdefault(key, {"from_id": from_id, "to_id": to_id, "type": self.edge_type[e]})
+        return nodes, list(edges.values())
+
+    # ----- Traversals mirroring queries.py -----
+
+    def supply_chain(self, company_id: str, depth: int) -> tuple[list[dict], list[dict]]:
+        c = self.lookup("Company", company_id)
+        if c is None:
+            return [], []
+        d = min(max(1, depth), 4)
+        dist = self.bfs([c], [self.inc["SUPPLIES_TO"]], d)
+        chain = np.flatnonzero(dist >= 0)
+        upstream = chain[chain != c]
+        # A SUPPLIES_TO edge lies on a path of length <= d iff its target is within d - 1 hops.
+        supply_edges = self.edges_from(np.flatnonzero((dist >= 0) & (dist < d)), [self.inc["SUPPLIES_TO"]])
+
+        countries, _ = self.out["LOCATED_IN"].expand(chain)
+        ports, _ = self.out["SHIPS_VIA"].expand(chain)
+        context_nodes = np.concatenate([
+            countries[self.has_label(countries, "Country")],
+            ports[self.has_label(ports, "Port")],
+        ])
+        # The Cypher edges query only adds LOCATED_IN/SHIPS_VIA when the company has upstream suppliers.
+        context_edges = _EMPTY
+        if upstream.size:
+            context_edges = self.edges_from(chain, [self.out["LOCATED_IN"], self.out["SHIPS_VIA"]])
+
+        node_idx = np.concatenate([upstream, [c], context_nodes])
+        nodes, edges = self.to_result(node_idx, np.concatenate([supply_edges, context_edges]))
+        company_tier = {self.ids[i]: int(dist[i]) for i in chain}
+        for node in nodes:
+            if node["id"] in company_tier:
+                node["company_tier"] = company_tier[node["id"]]
+        return nodes, edges
+
+    def portfolio(self, company_ids: list[str], depth: int) -> tuple[list[dict], list[dict]]:
+        """Merged supply chains of several companies, in one traversal.
+
+        Every company gets one bit and the upstream BFS runs once over bitmasks, so suppliers shared
+        between companies are expanded once. Masks are kept only for visited nodes and edges. The result is the union of the individual
+        supply_chain() results, each node tagged with the ids of the companies it belongs to
+        (`sources`).
+        """
+        d = min(max(1, depth), 4)
+        words = max(1, (len(company_ids) + 63) // 64)
+        found = [(self.lookup("Company", company_id), bit) for bit, company_id in enumerate(company_ids)]
+        found = [(c, bit) for c, bit in found if c is not None]
+        seeds = _one_hot([c for c, _ in found], [bit for _, bit in found], words)
+        supplies = [self.inc["SUPPLIES_TO"]]
+        layers = _propagate_rows(seeds, supplies, d)
+        chain = _union_rows(layers, range(d + 1))
+        # See supply_chain(): edges leave nodes within d - 1 hops.
+        edge_parts = [self._edge_rows(_union_rows(layers, range(d)), supplies)]
+
+        node_parts = [chain]
+        for rel, label in (("LOCATED_IN", "Country"), ("SHIPS_VIA", "Port")):
+            src, nbrs, _ = self.out[rel].expand_pairs(chain.idx)
+            hit = self.label_sets[label][nbrs]
+            node_parts.append(_Rows(nbrs[hit], chain.masks[np.searchsorted(chain.idx, src[hit])]))
+        # Context edges only for companies with upstream suppliers (as in supply_chain()).
+        with_upstream = np.bitwise_or.reduce(_union_rows(layers, range(1, d + 1)).masks, axis=0)
+        context = _Rows(chain.idx, chain.masks & with_upstream)
+        edge_parts.append(self._edge_rows(_select(context, context.masks.any(axis=1)), [self.out["LOCATED_IN"], self.out["SHIPS_VIA"]]))
+
+        return self._tagged_result(_merge(node_parts, words), _merge(edge_parts, words), company_ids)
+
+    def tier_distances(self, max_hops: int = 4, batch: int = 256):
+        """Yield (upstream, company, dist) index arrays: the SUPPLIES_TO hop distance from every
+        node to each company it reaches within max_hops.
+
+        Companies are traversed `batch` at a time, one bit each, so every node is expanded once
+        per batch rather than once per company.
+        """
+        companies = np.flatnonzero(self.label_sets["Company"])
+        supplies = [self.inc["SUPPLIES_TO"]]
+        for start in range(0, companies.size, batch):
+            chunk = companies[start:start + batch]
+            bits = np.arange(chunk.size)
+            seeds = np.zeros((self.num_nodes, (chunk.size + 63) // 64), dtype=np.uint64)
+            np.bitwise_or.at(seeds, (chunk, bits // 64), np.left_shift(np.uint64(1), (bits % 64).astype(np.uint64)))
+            layers = _propagate_masks(seeds, supplies, max_hops)
+            for hop in range(1, len(layers)):
+                nodes = np.flatnonzero(layers[hop].any(axis=1))
+                if nodes.size == 0:
+                    continue
+                hit = np.unpackbits(layers[hop][nodes].view(np.uint8), axis=1, bitorder="little")[:, :chunk.size]
+                rows, cols = np.nonzero(hit)
+                yield nodes[rows], chunk[cols], np.full(rows.size, hop, dtype=np.int64)
+
+    def impact(self, scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+        label = IMPACT_TARGET_LABELS.get(scenario)
+        target = self.lookup(label, target_id) if label else None
+        if target is None:
+            return [], []
+        return self.to_result(*self.impact_indices(scenario, target))
+
+    def impact_indices(self, scenario: str, target: int) -> tuple[np.ndarray, np.ndarray]:
+        """(node indices, edge indices) of the impact of `target` (a node index) under scenario."""
+        if scenario == "supplier_failure":
+            dist = self.bfs([target], [self.out["SUPPLIES_TO"]], MAX_IMPACT_DEPTH)
+            node_idx = np.flatnonzero(dist >= 0)
+            edge_idx = self.edges_from(
+                np.flatnonzero((dist >= 0) & (dist < MAX_IMPACT_DEPTH)), [self.out["SUPPLIES_TO"]]
+            )
+            return node_idx, edge_idx
+
+        # port_closure
+        flow = [self.out["SUPPLIES_TO"], self.out["DEPENDS_ON"]]
+        # Nodes: origins shipping via the port within 1..2 SHIPS_VIA hops, and their downstream.
+        ship_dist = self.bfs([target], [self.inc["SHIPS_VIA"]], 2)
+        reached = np.flatnonzero(ship_dist > 0)
+        origins = reached[self.has_label(reached, "Supplier", "Factory")]
+        downstream = np.flatnonzero(self.bfs(origins, flow, MAX_IMPACT_DEPTH) >= 0) if origins.size else _EMPTY
+
+        # Edges: only direct shippers are expanded, plus every SHIPS_VIA into the port.
+        direct, ship_edges = self.inc["SHIPS_VIA"].expand(np.array([target]))
+        direct = np.unique(direct[self.has_label(direct, "Supplier", "Factory")])
+        flow_edges = _EMPTY
+        if direct.size:
+            edge_dist = self.bfs(direct, flow, MAX_IMPACT_DEPTH)
+            flow_edges = self.edges_from(np.flatnonzero((edge_dist >= 0) & (edge_dist < MAX_IMPACT_DEPTH)), flow)
+
+        node_idx = np.concatenate([[target], origins, downstream])
+        return node_idx, np.concatenate([flow_edges, ship_edges])
+
+    def exposure(self, scenario: str, target: int) -> np.ndarray:
+        """Share of supply lost at every node (0..1) when `target` (a node index) fails.
+
+        The failed supplier loses everything; for a closed port, each supplier or factory shipping
+        via it loses the port's share of its SHIPS_VIA routes. Losses then flow downstream: a node
+        loses the sum over its suppliers of (their share of its SUPPLIES_TO volume) x (their loss),
+        i.e. x = sum of S^h x0 for h = 0..MAX_IMPACT_DEPTH with S = supply_shares, computed as
+        sparse matrix-vector products. Losses arriving along several paths add up, capped at 1.
+        """
+        seeds = np.zeros(self.num_nodes)
+        seeds[target] = 1.0
+        if scenario == "port_closure":
+            shippers, _ = self.inc["SHIPS_VIA"].expand(np.array([target]))
+            shippers = shippers[self.has_label(shippers, "Supplier", "Factory")]
+            routes = np.diff(self.out["SHIPS_VIA"].indptr)
+            np.add.at(seeds, shippers, 1.0 / routes[shippers])
+        shares = self.supply_shares
+        total = seeds.copy()
+        current = seeds
+        for _ in range(MAX_IMPACT_DEPTH):
+            current = shares @ current
+            if not current.any():
+                break
+            total += current
+        return np.minimum(total, 1.0)
+
+    def weighted_impact(self, scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+        """impact() with each node's `exposure` score (see exposure())."""
+        label = IMPACT_TARGET_LABELS.get(scenario)
+        target = self.lookup(label, target_id) if label else None
+        if target is None:
+            return [], []
+        node_idx, edge_idx = self.impact_indices(scenario, target)
+        order = [i for i in dict.fromkeys(int(i) for i in node_idx) if self.ids[i] is not None]
+        nodes, edges = self.to_result(order, edge_idx)
+        scores = self.exposure(scenario, target)
+        for i, node in zip(order, nodes):
+            node["exposure"] = round(float(scores[i]), 6)
+        return nodes, edges
+
+    def compound_impact(self, targets: list[tuple[str, str]]) -> tuple[list[dict], list[dict]]:
+        """Combined impact of several (kind, id) targets at once; kind is supplier, port or country.
+
+        Every target gets one bit; suppliers seed the supplier_failure traversal and ports the
+        port_closure one, and a country seeds both with all the suppliers and ports LOCATED_IN it.
+        The traversals run once over bitmasks kept only for visited nodes and edges, so shared
+        downstream subgraphs are visited once.
+        The result is the union of the individual impacts, each node tagged with the target ids
+        (`sources`) that reach it.
+        """
+        words = max(1, (len(targets) + 63) // 64)
+        seeds = {part: ([], []) for part in ("supplier", "port", "node", "edge")}
+
+        def add(part, idx, bit):
+            seeds[part][0].extend(int(i) for i in np.atleast_1d(idx))
+            seeds[part][1].extend([bit] * np.atleast_1d(idx).size)
+
+        source_ids = []
+        for kind, target_id in targets:
+            bit = len(source_ids)
+            source_ids.append(target_id)
+            if kind == "supplier":
+                i = self.lookup("Supplier", target_id)
+                if i is not None:
+                    add("supplier", i, bit)
+            elif kind == "port":
+                i = self.lookup("Port", target_id)
+                if i is not None:
+                    add("port", i, bit)
+            elif kind == "country":
+                c = self.lookup("Country", target_id)
+                if c is None:
+                    continue
+                members, eids = self.inc["LOCATED_IN"].expand(np.array([c]))
+                for label in ("Supplier", "Port"):
+                    hit = self.label_sets[label][members]
+                    add(label.lower(), members[hit], bit)
+                    add("edge", eids[hit], bit)
+                add("node", c, bit)
+        supplier_seeds, port_seeds, node_seeds, edge_seeds = (_one_hot(*seeds[part], words) for part in seeds)
+
+        node_parts = [node_seeds]
+        edge_parts = [edge_seeds]
+        # supplier_failure: downstream SUPPLIES_TO; edges leave nodes within MAX_IMPACT_DEPTH - 1 hops.
+        if supplier_seeds.idx.size:
+            supplies = [self.out["SUPPLIES_TO"]]
+            layers = _propagate_rows(supplier_seeds, supplies, MAX_IMPACT_DEPTH)
+            node_parts.append(_union_rows(layers, range(MAX_IMPACT_DEPTH + 1)))
+            edge_parts.append(self._edge_rows(_union_rows(layers, range(MAX_IMPACT_DEPTH)), supplies))
+        # port_closure: see impact_indices.
+        if port_seeds.idx.size:
+            flow = [self.out["SUPPLIES_TO"], self.out["DEPENDS_ON"]]
+            ship = _propagate_rows(port_seeds, [self.inc["SHIPS_VIA"]], 2)
+            origins = _union_rows(ship, range(1, 3))
+            origins = _select(origins, self.has_label(origins.idx, "Supplier", "Factory"))
+            direct = _union_rows(ship, range(1, 2))
+            direct = _select(direct, self.has_label(direct.idx, "Supplier", "Factory"))
+            downstream = _union_rows(_propagate_rows(origins, flow, MAX_IMPACT_DEPTH), range(MAX_IMPACT_DEPTH + 1))
+            node_parts += [port_seeds, origins, downstream]
+            edge_layers = _propagate_rows(direct, flow, MAX_IMPACT_DEPTH)
+            edge_parts.append(self._edge_rows(_union_rows(edge_layers, range(MAX_IMPACT_DEPTH)), flow))
+            edge_parts.append(self._edge_rows(port_seeds, [self.inc["SHIPS_VIA"]]))
+
+        return self._tagged_result(_merge(node_parts, words), _merge(edge_parts, words), source_ids)
+
+    def _tagged_result(self, node_rows: _Rows, edge_rows: _Rows, source_ids: list[str]):
+        """(nodes, edges) of every node/edge row; nodes list the ids of their bits in `sources`."""
+        keep = np.array([self.ids[i] is not None for i in node_rows.idx.tolist()], dtype=bool)
+        node_rows = _select(node_rows, keep) if node_rows.idx.size else node_rows
+        bits = np.unpackbits(node_rows.masks.view(np.uint8), axis=1, bitorder="little")
+        nodes = []
+        for i, row in zip(node_rows.idx, bits):
+            node = self.node_dict(int(i))
+            node["sources"] = [source_ids[b] for b in np.flatnonzero(row[:len(source_ids)])]
+            nodes.append(node)
+        _, edges = self.to_result(_EMPTY, edge_rows.idx)
+        return nodes, edges
+
+    def _edge_rows(self, node_rows: _Rows, adjacency: list[_CSR]) -> _Rows:
+        """Per-edge masks: each edge leaving a node through adjacency inherits that node's bits."""
+        parts = []
+        for csr in adjacency:
+            src, _, eids = csr.expand_pairs(node_rows.idx)
+            parts.append(_Rows(eids, node_rows.masks[np.searchsorted(node_rows.idx, src)]))
+        return _merge(parts, node_rows.masks.shape[1])
+
+    def expand(self, frontier_ids, known_ids, direction: str) -> tuple[list[dict], list[dict], list[str]]:
+        """One hop from the frontier: upstream over incoming SUPPLIES_TO, downstream over outgoing
+        SUPPLIES_TO/DEPENDS_ON. Returns (nodes, edges, next frontier ids); see queries.expand."""
+        seeds = np.array(
+            sorted({
+                i for node_id in frontier_ids for label in EXPAND_LABELS
+                if (i := self.lookup(label, node_id)) is not None
+            }),
+            dtype=np.int64,
+        )
+        if direction == "upstream":
+            adjacency = [self.inc["SUPPLIES_TO"]]
+        else:
+            adjacency = [self.out["SUPPLIES_TO"], self.out["DEPENDS_ON"]]
+        known = set(known_ids) | set(frontier_ids)
+        hops = [csr.expand(seeds) for csr in adjacency]
+        reached = np.unique(np.concatenate([nbrs for nbrs, _ in hops]))
+        hop_edges = np.concatenate([eids for _, eids in hops])
+        fresh = np.array([i for i in reached if self.ids[i] is not None and self.ids[i] not in known], dtype=np.int64)
+
+        context_nodes, context_edges = [], []
+        for rel, label in (("LOCATED_IN", "Country"), ("SHIPS_VIA", "Port")):
+            nbrs, eids = self.out[rel].expand(fresh)
+            is_context = self.label_sets[label][nbrs]
+            context_nodes.append(nbrs[is_context])
+            context_edges.append(eids[is_context])
+        context = np.unique(np.concatenate(context_nodes))
+        context = context[[self.ids[i] not in known for i in context]] if context.size else context
+
+        nodes, edges = self.to_result(np.concatenate([fresh, context]), np.concatenate([hop_edges, *context_edges]))
+        return nodes, edges, [self.ids[i] for i in fresh]
+
+
+def load_snapshot(driver=None) -> GraphSnapshot:
+    """Read all supply chain nodes and relationships from Neo4j into a GraphSnapshot."""
+    driver = driver or get_driver()
+    nodes_q = """
+    MATCH (n)
+    WHERE n:Company OR n:Supplier OR n:Factory OR n:Port OR n:Country
+    RETURN elementId(n) AS key, labels(n) AS labels, n.id AS id, n.name AS name,
+           n.tier AS tier, n.lat AS lat, n.lon AS lon
+    """
+    edges_q = """
+    MATCH (a)-[r:SUPPLIES_TO|DEPENDS_ON|SHIPS_VIA|LOCATED_IN]->(b)
+    RETURN elementId(a) AS src, elementId(b) AS dst, type(r) AS type, r.volume AS volume
+    """
+    with driver.session() as session:
+        version = session.run(graph_version.READ_VERSION_Q).single()["version"]
+        node_rows = [dict(record) for record in metrics.run(session, "snapshot.nodes", nodes_q)]
+        edge_rows = [dict(record) for record in metrics.run(session, "snapshot.edges", edges_q)]
+    return GraphSnapshot(node_rows, edge_rows, version=version)
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def get_snapshot() -> GraphSnapshot:
+    """Return the process-wide snapshot, loading it on first use and reloading when the graph version changes."""
+    global _snapshot
+    version = graph_version.get_version()
+    if _snapshot is None or _snapshot.version != version:
+        with _lock:
+            if _snapshot is None or _snapshot.version != version:
+                _snapshot = load_snapshot()
+    return _snapshot
+
+
+def refresh_snapshot() -> GraphSnapshot:
+    """Reload the snapshot from Neo4j (e.g. after reseeding)."""
+    global _snapshot
+    fresh = load_snapshot()
+    with _lock:
+        _snapshot = fresh
+    return fresh
+
+
+def get_supply_chain(company_id: str, depth: int) -> tuple[list[dict], list[dict]]:
+    return get_snapshot().supply_chain(company_id, depth)
+
+
+def get_impact(scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+    return get_snapshot().impact(scenario, target_id)
+
+
+def weighted_impact(scenario: str, target_id: str) -> tuple[list[dict], list[dict]]:
+    return get_snapshot().weighted_impact(scenario, target_id)
+
+
+def expand(frontier_ids, known_ids, direction: str) -> tuple[list[dict], list[dict], list[str]]:
+    return get_snapshot().expand(frontier_ids, known_ids, direction)
+
+
+def compound_impact(targets: list[tuple[str, str]]) -> tuple[list[dict], list[dict]]:
+    return get_snapshot().compound_impact(targets)
+
+
+def portfolio(company_ids: list[str], depth: int) -> tuple[list[dict], list[dict]]:
+    return get_snapshot().portfolio(company_ids, depth)
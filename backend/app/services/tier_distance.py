@@ -0,0 +1,95 @@
+"""Materialized per-company tier distances: (n)-[:UPSTREAM_OF { dist }]->(c:Company).
+
+`dist` is the shortest SUPPLIES_TO hop count from n to company c (tier 1 = direct supplier), up
+to the supply-chain depth limit. A supplier can sit at a different tier for each company it
+reaches, unlike the single stored `Supplier.tier`. With NEO4J_QUERY_MODE=distance, supply-chain
+lookups filter these relationships on `dist <= depth` instead of expanding
+`SUPPLIES_TO*1..depth` paths (see queries._supply_chain_distance_query).
+
+The table is rebuilt by a batch job over the snapshot's exported adjacency, one multi-source
+BFS per batch of companies:
+
+    python -m app.services.tier_distance build
+
+The job stamps GraphMeta.distance_version with the graph version it was computed for; after any
+later write the table is stale and distance-mode queries fall back to path expansion until the
+job is run again.
+"""
+import argparse
+import logging
+
+from app.config import settings
+from app.database import get_driver
+from app.services import snapshot
+from app.services.snapshot import GraphSnapshot
+from app.services.writes import run_chunks
+
+logger = logging.getLogger(__name__)
+
+MAX_DISTANCE = 4
+
+# Distance mode ignores the table from here until it is stamped again.
+UNSTAMP_Q = "MATCH (m:GraphMeta { id: 'graph' }) REMOVE m.distance_version"
+DELETE_Q = """
+MATCH ()-[r:UPSTREAM_OF]->()
+WITH r LIMIT $limit
+DELETE r
+RETURN count(*) AS n
+"""
+CREATE_Q = """
+UNWIND $rows AS row
+MATCH (n) WHERE elementId(n) = row.src
+MATCH (c:Company) WHERE elementId(c) = row.dst
+CREATE (n)-[:UPSTREAM_OF { dist: row.dist }]->(c)
+RETURN count(*) AS n
+"""
+# Only stamp the table if nothing was written to the graph while it was being rebuilt.
+STAMP_Q = """
+MERGE (m:GraphMeta { id: 'graph' })
+WITH m WHERE coalesce(m.version, 0) = $version
+SET m.distance_version = $version
+RETURN m.distance_version AS version
+"""
+
+
+def distance_rows(snap: GraphSnapshot, max_distance: int = MAX_DISTANCE):
+    """Yield lists of {src, dst, dist} rows (snapshot keys, i.e. Neo4j elementIds) per company batch."""
+    for upstream, company, dist in snap.tier_distances(max_distance):
+        yield [
+            {"src": snap.keys[u], "dst": snap.keys[c], "dist": int(d)}
+            for u, c, d in zip(upstream.tolist(), company.tolist(), dist.tolist())
+        ]
+
+
+def build(snap: GraphSnapshot | None = None, driver=None) -> dict:
+    """Replace every UPSTREAM_OF relationship with distances computed from snap (loaded if None).
+
+    Returns {"version", "relationships", "stamped"}; stamped is False if the graph changed while
+    the job ran, in which case distance-mode queries keep using path expansion.
+    """
+    driver = driver or get_driver()
+    snap = snap or snapshot.load_snapshot(driver)
+    written = 0
+    with driver.session() as session:
+        session.execute_write(lambda tx: tx.run(UNSTAMP_Q).consume())
+        while session.execute_write(lambda tx: tx.run(DELETE_Q, limit=settings.write_chunk_size).single()["n"]):
+            pass
+        for rows in distance_rows(snap):
+            written += run_chunks(session, CREATE_Q, rows)
+        stamped = session.execute_write(lambda tx: tx.run(STAMP_Q, version=snap.version).single()) is not None
+    if not stamped:
+        logger.warning("Graph changed while tier distances were built for version %s; rerun the job", snap.version)
+    return {"version": snap.version, "relationships": written, "stamped": stamped}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the per-company UPSTREAM_OF tier distance table.")
+    parser.add_argument("command", choices=["build"])
+    parser.parse_args()
+    result = build()
+    status = "" if result["stamped"] else " (graph changed meanwhile; not marked current)"
+    print(f"Wrote {result['relationships']} UPSTREAM_OF relationships for graph version {result['version']}{status}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Incremental graph writes: batches of node/relationship upserts and deletes.
+
+Rows are grouped by label (or relationship type and endpoint labels) and sent as
+`UNWIND $rows ... MERGE` in chunks of `write_chunk_size`, each in its own managed write
+transaction (retried by the driver on transient errors). MERGE and SET make every statement
+idempotent, so a batch that failed part-way can simply be sent again.
+
+Every applied batch bumps the GraphMeta version and writes a (:GraphChange) record in the same
+transaction, listing the ids of the nodes it touched; the reachability and dominator indexes use
+those ids to recompute only what is near them. Apply a batch from the command line with:
+
+    python -m app.services.writes apply batch.json
+"""
+import argparse
+import json
+from pathlib import Path
+
+from app.config import settings
+from app.database import get_driver
+from app.models.schemas import GraphBatch
+from app.services import graph_version
+
+_NODE_LABELS = {"Company", "Supplier", "Factory", "Port", "Country"}
+_REL_TYPES = {"SUPPLIES_TO", "DEPENDS_ON", "SHIPS_VIA", "LOCATED_IN"}
+
+RECORD_CHANGE_Q = """
+CREATE (c:GraphChange {
+  version: $version, at: datetime(), node_ids: $node_ids, complete: $complete,
+  nodes_upserted: $nodes_upserted, relationships_upserted: $relationships_upserted,
+  relationships_deleted: $relationships_deleted, nodes_deleted: $nodes_deleted
+})
+RETURN toString(c.at) AS at
+"""
+PRUNE_CHANGES_Q = "MATCH (c:GraphChange) WHERE c.version <= $oldest DELETE c"
+LIST_CHANGES_Q = """
+MATCH (c:GraphChange) WHERE c.version > $since
+RETURN c { .*, at: toString(c.at) } AS change
+ORDER BY c.version
+LIMIT $limit
+"""
+
+
+def _check(name: str, allowed) -> str:
+    # Labels and relationship types cannot be query parameters, so only known names are interpolated.
+    if name not in allowed:
+        raise ValueError(f"unknown label or relationship type: {name!r}")
+    return name
+
+
+def _props(props: dict) -> dict:
+    # The id is the MERGE key; changing it would silently turn the node into another one.
+    return {k: v for k, v in props.items() if k != "id"}
+
+
+def _chunked(rows: list, size: int):
+    for start in range(0, len(rows), max(1, size)):
+        yield rows[start:start + size]
+
+
+def iter_chunks(session, query: str, rows: list):
+    """Run query once per chunk of rows, each in a managed write transaction; yields the rows
+    affected by each chunk as soon as it has committed."""
+    for chunk in _chunked(rows, settings.write_chunk_size):
+        yield session.execute_write(lambda tx, c=chunk: tx.run(query, rows=c).single()["n"])
+
+
+def run_chunks(session, query: str, rows: list) -> int:
+    """Run query once per chunk of rows (see iter_chunks); returns rows affected."""
+    return sum(iter_chunks(session, query, rows))
+
+
+def _group(items, key) -> dict:
+    groups: dict = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return groups
+
+
+def _statements(batch: GraphBatch):
+    """Yield (counter, query, rows) in application order."""
+    for label, nodes in _group(batch.upsert_nodes, lambda n: n.label).items():
+        query = f"""
+        UNWIND $rows AS row
+        MERGE (n:{_check(label, _NODE_LABELS)} {{ id: row.id }})
+        SET n += row.props
+        RETURN count(*) AS n
+        """
+        yield "nodes_upserted", query, [{"id": n.id, "props": _props(n.props)} for n in nodes]
+
+    rel_key = lambda r: (r.type, r.from_label, r.to_label)  # noqa: E731
+    for (rel_type, from_label, to_label), rels in _group(batch.upsert_relationships, rel_key).items():
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (a:{_check(from_label, _NODE_LABELS)} {{ id: row.from_id }})
+        MATCH (b:{_check(to_label, _NODE_LABELS)} {{ id: row.to_id }})
+        MERGE (a)-[r:{_check(rel_type, _REL_TYPES)}]->(b)
+        SET r += row.props
+        RETURN count(*) AS n
+        """
+        rows = [{"from_id": r.from_id, "to_id": r.to_id, "props": r.props} for r in rels]
+        yield "relationships_upserted", query, rows
+
+    for (rel_type, from_label, to_label), rels in _group(batch.delete_relationships, rel_key).items():
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (a:{_check(from_label, _NODE_LABELS)} {{ id: row.from_id }})
+        MATCH (b:{_check(to_label, _NODE_LABELS)} {{ id: row.to_id }})
+        MATCH (a)-[r:{_check(rel_type, _REL_TYPES)}]->(b)
+        DELETE r
+        RETURN count(*) AS n
+        """
+        yield "relationships_deleted", query, [{"from_id": r.from_id, "to_id": r.to_id} for r in rels]
+
+    for label, nodes in _group(batch.delete_nodes, lambda n: n.label).items():
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (n:{_check(label, _NODE_LABELS)} {{ id: row.id }})
+        DETACH DELETE n
+        RETURN count(*) AS n
+        """
+        yield "nodes_deleted", query, [{"id": n.id} for n in nodes]
+
+
+def touched_ids(batch: GraphBatch, session=None) -> list[str]:
+    """Ids of every node a batch may change, including both endpoints of each relationship.
+
+    With a session, the current neighbours of deleted nodes are included too, since deleting a
+    node also removes their relationships to it.
+    """
+    ids = {n.id for n in batch.upsert_nodes} | {n.id for n in batch.delete_nodes}
+    for rel in (*batch.upsert_relationships, *batch.delete_relationships):
+        ids.update((rel.from_id, rel.to_id))
+    if session is not None:
+        for label, nodes in _group(batch.delete_nodes, lambda n: n.label).items():
+            query = f"""
+            UNWIND $ids AS id
+            MATCH (:{_check(label, _NODE_LABELS)} {{ id: id }})--(m)
+            RETURN collect(DISTINCT m.id) AS ids
+            """
+            ids.update(i for i in session.run(query, ids=[n.id for n in nodes]).single()["ids"] if i is not None)
+    return sorted(ids)
+
+
+def _record_change(tx, change: dict) -> dict:
+    version = tx.run(graph_version.BUMP_VERSION_Q).single()["version"]
+    at = tx.run(RECORD_CHANGE_Q, version=version, **change).single()["at"]
+    tx.run(PRUNE_CHANGES_Q, oldest=version - settings.change_log_entries).consume()
+    return {"version": version, "at": at, **change}
+
+
+def apply_batch(batch: GraphBatch, driver=None) -> dict:
+    """Apply a batch and return its change record (see GraphChange).
+
+    Chunks commit independently: if one fails, the earlier ones stay applied, a change record
+    with complete=False is still written (so caches drop what did change) and the error is raised.
+    """
+    driver = driver or get_driver()
+    counts = dict.fromkeys(("nodes_upserted", "relationships_upserted", "relationships_deleted", "nodes_deleted"), 0)
+    complete = False
+    with driver.session() as session:
+        node_ids = touched_ids(batch, session)
+        try:
+            for counter, query, rows in _statements(batch):
+                # Counted per chunk, so chunks committed before a failure still get a change record.
+                for n in iter_chunks(session, query, rows):
+                    counts[counter] += n
+            complete = True
+        finally:
+            if complete or any(counts.values()):
+                change = {**counts, "node_ids": node_ids, "complete": complete}
+                change = session.execute_write(_record_change, change)
+                graph_version.note_version(change["version"])
+                graph_version.note_changes(change["version"], node_ids)
+    return change
+
+
+def list_changes(since: int = 0, limit: int = 100, driver=None) -> list[dict]:
+    """Change records with version > since, oldest first."""
+    driver = driver or get_driver()
+    with driver.session() as session:
+        return [record["change"] for record in session.run(LIST_CHANGES_Q, since=since, limit=limit)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a batch of graph upserts and deletes.")
+    parser.add_argument("command", choices=["apply"])
+    parser.add_argument("batch", type=Path, help="JSON file shaped like the POST /api/graph/batch body")
+    args = parser.parse_args()
+    batch = GraphBatch.model_validate(json.loads(args.batch.read_text(encoding="utf-8")))
+    change = apply_batch(batch)
+    print(
+        f"Graph version {change['version']}: {change['nodes_upserted']} nodes and "
+        f"{change['relationships_upserted']} relationships upserted, {change['relationships_deleted']} "
+        f"relationships and {change['nodes_deleted']} nodes deleted."
+    )
+
+
+if __name__ == "__main__":
+    main()
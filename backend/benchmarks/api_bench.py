@@ -0,0 +1,119 @@
+"""End-to-end HTTP benchmark for /api/supply-chain and /api/impact.
+
+Drives a running API (uvicorn) with concurrent requests per scenario and writes
+p50/p95/p99 latency, throughput and response size to a JSON file, so results can be
+compared between releases. Load a generated graph first (data/generate_graph.py), and
+start the API with NEO4J_CACHE_ENABLED=false to measure uncached traversals.
+
+    python -m benchmarks.api_bench --url http://localhost:8000 --requests 200 --concurrency 8 \
+        --out bench_results.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+
+def _request(url: str, body: dict | None = None) -> tuple[float, int, int]:
+    """Return (latency ms, status, response bytes)."""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as res:
+            payload = res.read()
+            status = res.status
+    except urllib.error.HTTPError as e:
+        payload, status = e.read(), e.code
+    return (time.perf_counter() - t0) * 1000, status, len(payload)
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def run_scenario(name: str, url: str, bodies: list[dict], requests: int, concurrency: int) -> dict:
+    """Send `requests` POSTs (cycling through bodies) with `concurrency` workers and summarize."""
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: _request(url, bodies[i % len(bodies)]), range(requests)))
+    wall = time.perf_counter() - t0
+    latencies = sorted(r[0] for r in results)
+    sizes = [r[2] for r in results]
+    summary = {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(1 for r in results if r[1] >= 400),
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "throughput_rps": round(requests / wall, 1) if wall > 0 else 0.0,
+        "mean_response_bytes": round(sum(sizes) / len(sizes)) if sizes else 0,
+    }
+    print(
+        f"{name:<26} p50={summary['p50_ms']:8.1f}  p95={summary['p95_ms']:8.1f}  p99={summary['p99_ms']:8.1f} ms  "
+        f"{summary['throughput_rps']:7.1f} req/s  {summary['mean_response_bytes']:>9} B  errors={summary['errors']}"
+    )
+    return summary
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--targets", type=int, default=20, help="distinct companies/suppliers/ports to sample")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    def sample(path: str) -> list[str]:
+        with urllib.request.urlopen(f"{args.url}{path}?limit=1000") as res:
+            ids = [row["id"] for row in json.load(res)["items"]]
+        return rng.sample(ids, min(args.targets, len(ids)))
+
+    companies, suppliers, ports = sample("/api/companies"), sample("/api/suppliers"), sample("/api/ports")
+    scenarios = []
+    for depth in args.depths:
+        bodies = [{"company_id": c, "depth": depth} for c in companies]
+        scenarios.append(run_scenario(f"supply_chain depth={depth}", f"{args.url}/api/supply-chain", bodies, args.requests, args.concurrency))
+    for scenario, targets in (("supplier_failure", suppliers), ("port_closure", ports)):
+        bodies = [{"scenario": scenario, "target_id": t} for t in targets]
+        scenarios.append(run_scenario(scenario, f"{args.url}/api/impact", bodies, args.requests, args.concurrency))
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "url": args.url,
+        "seed": args.seed,
+        "scenarios": scenarios,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare the split (nodes_q + edges_q) and single-round-trip Cypher forms.
+
+Reports total db hits (from PROFILE) and wall-clock latency for each form.
+Load a generated graph first (from project root), then run from backend/ with Neo4j up:
+
+    python data/generate_graph.py --suppliers 20000 --load --clear
+    python -m benchmarks.query_forms --company gen_company_0 --depth 4
+"""
+import argparse
+import statistics
+import time
+
+from app.database import close_driver, get_driver
+from app.services.queries import (
+    _impact_single_query,
+    _impact_split_queries,
+    _supply_chain_single_query,
+    _supply_chain_split_queries,
+)
+
+
+def _db_hits(plan) -> int:
+    if not plan:
+        return 0
+    return plan.get("dbHits", 0) + sum(_db_hits(child) for child in plan.get("children", []))
+
+
+def _profile(session, queries: list[str], params: dict) -> int:
+    return sum(_db_hits(session.run("PROFILE " + q, params).consume().profile) for q in queries)
+
+
+def _latency_ms(session, queries: list[str], params: dict, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        for q in queries:
+            list(session.run(q, params))
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def compare(label: str, split: list[str], single: list[str], params: dict, runs: int):
+    with get_driver().session() as session:
+        for form, queries in (("split", split), ("single", single)):
+            hits = _profile(session, queries, params)
+            samples = _latency_ms(session, queries, params, runs)
+            print(
+                f"{label:<28} {form:<7} db_hits={hits:>10}  "
+                f"median={statistics.median(samples):8.2f} ms  max={max(samples):8.2f} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--company", default="gen_company_0")
+    parser.add_argument("--supplier", default="gen_sup_0")
+    parser.add_argument("--port", default="gen_port_0")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        compare(
+            f"supply_chain d={args.depth}",
+            list(_supply_chain_split_queries(args.depth)),
+            [_supply_chain_single_query(args.depth)],
+            {"company_id": args.company},
+            args.runs,
+        )
+        for scenario, target in (("supplier_failure", args.supplier), ("port_closure", args.port)):
+            compare(
+                scenario,
+                list(_impact_split_queries(scenario)),
+                [_impact_single_query(scenario)],
+                {"target_id": target},
+                args.runs,
+            )
+    finally:
+        close_driver()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Per-node cost of the graph response serialization paths (no database needed).
+
+    python -m benchmarks.serialization --nodes 20000
+
+Compares the old path (MapNode/MapEdge construction + FastAPI response_model
+re-validation and JSON encoding) with direct orjson encoding of the service dicts.
+"""
+import argparse
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.schemas import MapEdge, MapNode, SupplyChainResponse
+
+
+def _graph(n: int) -> tuple[list[dict], list[dict]]:
+    nodes = [
+        {"id": f"sup_{i}", "name": f"Supplier {i}", "type": "Supplier", "tier": i % 4 + 1, "lat": 10.0 + i % 50, "lon": 20.0 + i % 90}
+        for i in range(n)
+    ]
+    edges = [{"from_id": f"sup_{i}", "to_id": f"sup_{i // 2}", "type": "SUPPLIES_TO"} for i in range(1, n)]
+    return nodes, edges
+
+
+def _pydantic_double_validation(nodes, edges) -> bytes:
+    # What the routes did before: build models, then FastAPI validates against response_model and encodes.
+    body = SupplyChainResponse(nodes=[MapNode(**n) for n in nodes], edges=[MapEdge(**e) for e in edges])
+    validated = TypeAdapter(SupplyChainResponse).validate_python(body.model_dump())
+    return orjson.dumps(jsonable_encoder(validated))
+
+
+_adapter = TypeAdapter(SupplyChainResponse)
+
+
+def _type_adapter(nodes, edges) -> bytes:
+    return _adapter.dump_json(_adapter.validate_python({"nodes": nodes, "edges": edges}))
+
+
+def _orjson(nodes, edges) -> bytes:
+    return orjson.dumps({"nodes": nodes, "edges": edges})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    nodes, edges = _graph(args.nodes)
+    items = len(nodes) + len(edges)
+    for name, fn in (
+        ("pydantic + response_model", _pydantic_double_validation),
+        ("TypeAdapter (validate once)", _type_adapter),
+        ("orjson dicts", _orjson),
+    ):
+        best = min(_time(fn, nodes, edges) for _ in range(args.runs))
+        print(f"{name:<30} {best * 1000:9.1f} ms total  {best / items * 1e6:7.2f} us/item")
+
+
+def _time(fn, nodes, edges) -> float:
+    t0 = time.perf_counter()
+    fn(nodes, edges)
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Incremental reachability index refresh must match a full rebuild.
+
+Run from backend/:
+
+    python -m pytest -q tests
+"""
+import numpy as np
+
+from app.services import reachability
+from app.services.reachability import ReachabilityIndex
+from app.services.snapshot import GraphSnapshot
+
+NODES = [
+    ("cn", "Country"), ("us", "Country"),
+    ("p1", "Port"), ("p2", "Port"),
+    ("c1", "Company"), ("c2", "Company"),
+    ("s1", "Supplier"), ("s2", "Supplier"), ("s3", "Supplier"), ("s4", "Supplier"), ("s5", "Supplier"),
+    ("f1", "Factory"), ("f2", "Factory"),
+]
+EDGES = [
+    ("s1", "s2", "SUPPLIES_TO"), ("s2", "c1", "SUPPLIES_TO"), ("s3", "c1", "SUPPLIES_TO"),
+    ("s4", "s3", "SUPPLIES_TO"), ("s5", "c2", "SUPPLIES_TO"),
+    ("f1", "s2", "DEPENDS_ON"), ("f2", "s5", "DEPENDS_ON"),
+    ("s1", "p1", "SHIPS_VIA"), ("s4", "p1", "SHIPS_VIA"), ("s5", "p2", "SHIPS_VIA"), ("f2", "p2", "SHIPS_VIA"),
+    ("s1", "cn", "LOCATED_IN"), ("s5", "us", "LOCATED_IN"), ("c1", "us", "LOCATED_IN"),
+]
+
+
+def _snapshot(edges, version) -> GraphSnapshot:
+    nodes = [{"key": node_id, "labels": [label], "id": node_id, "name": node_id} for node_id, label in NODES]
+    return GraphSnapshot(nodes, [{"src": s, "dst": d, "type": t} for s, d, t in edges], version=version)
+
+
+def _assert_same(a: ReachabilityIndex, b: ReachabilityIndex):
+    assert a.entries.keys() == b.entries.keys()
+    for scenario in a.entries:
+        assert a.entries[scenario].keys() == b.entries[scenario].keys()
+        for target, (nodes, edges) in a.entries[scenario].items():
+            expected_nodes, expected_edges = b.entries[scenario][target]
+            np.testing.assert_array_equal(nodes, expected_nodes)
+            np.testing.assert_array_equal(edges, expected_edges)
+
+
+def test_refresh_after_added_edge_matches_build():
+    old = _snapshot(EDGES, version=1)
+    new = _snapshot(EDGES + [("s4", "c2", "SUPPLIES_TO")], version=2)
+    refreshed = ReachabilityIndex.build(old).refresh(new, changed_ids={"s4", "c2"})
+    _assert_same(refreshed, ReachabilityIndex.build(new))
+
+
+def test_refresh_after_removed_edge_matches_build():
+    old = _snapshot(EDGES, version=1)
+    new = _snapshot([e for e in EDGES if e != ("s2", "c1", "SUPPLIES_TO")], version=2)
+    refreshed = ReachabilityIndex.build(old).refresh(new, changed_ids={"s2", "c1"})
+    _assert_same(refreshed, ReachabilityIndex.build(new))
+
+
+def _ids(result):
+    nodes, edges = result
+    return {n["id"] for n in nodes}, {(e["from_id"], e["to_id"], e["type"]) for e in edges}
+
+
+def test_get_impact_falls_back_to_snapshot_until_index_is_ready(monkeypatch):
+    snap = _snapshot(EDGES, version=1)
+    monkeypatch.setattr(reachability, "_index", None)
+    monkeypatch.setattr(reachability.snapshot, "get_snapshot", lambda: snap)
+    assert _ids(reachability.get_impact("port_closure", "p1")) == _ids(snap.impact("port_closure", "p1"))
+    builder = reachability._builder
+    if builder is not None:
+        builder.join()
+    index = reachability.get_index(snap)
+    assert index is not None and index.alignment.keys is snap.keys
+    assert _ids(reachability.get_impact("port_closure", "p1")) == _ids(snap.impact("port_closure", "p1"))
@@ -0,0 +1,99 @@
+"""A batch that fails part-way must still record the chunks that committed.
+
+Run from backend/:
+
+    python -m pytest -q tests
+"""
+import pytest
+
+from app.config import settings
+from app.models.schemas import GraphBatch
+from app.services import graph_version, writes
+
+
+class _Result:
+    def __init__(self, record=None):
+        self.record = record
+
+    def single(self):
+        return self.record
+
+    def consume(self):
+        pass
+
+
+class _Session:
+    """Commits each managed transaction's rows into `written`; the Nth node chunk raises."""
+
+    def __init__(self, fail_on_chunk):
+        self.fail_on_chunk = fail_on_chunk
+        self.chunks = 0
+        self.written = []
+        self.changes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        if query == graph_version.BUMP_VERSION_Q:
+            return _Result({"version": 7})
+        if query == writes.RECORD_CHANGE_Q:
+            self.changes.append(params)
+            return _Result({"at": "2026-01-01T00:00:00Z"})
+        if query == writes.PRUNE_CHANGES_Q:
+            return _Result()
+        self.chunks += 1
+        if self.chunks == self.fail_on_chunk:
+            raise RuntimeError("connection lost")
+        self.written.extend(row["id"] for row in params["rows"])
+        return _Result({"n": len(params["rows"])})
+
+    def execute_write(self, work, *args):
+        return work(self, *args)
+
+
+class _Driver:
+    def __init__(self, session):
+        self._session = session
+
+    def session(self):
+        return self._session
+
+
+def _batch(n):
+    return GraphBatch(upsert_nodes=[{"label": "Supplier", "id": f"s{i}", "props": {"name": f"S{i}"}} for i in range(n)])
+
+
+def test_partial_batch_records_committed_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "write_chunk_size", 2)
+    noted = []
+    monkeypatch.setattr(graph_version, "note_version", noted.append)
+    monkeypatch.setattr(graph_version, "note_changes", lambda version, ids: None)
+    session = _Session(fail_on_chunk=3)
+
+    with pytest.raises(RuntimeError):
+        writes.apply_batch(_batch(6), driver=_Driver(session))
+
+    assert session.written == ["s0", "s1", "s2", "s3"]
+    assert len(session.changes) == 1
+    change = session.changes[0]
+    assert change["nodes_upserted"] == 4
+    assert change["complete"] is False
+    assert change["node_ids"] == sorted(f"s{i}" for i in range(6))
+    assert noted == [7]
+
+
+def test_complete_batch(monkeypatch):
+    monkeypatch.setattr(settings, "write_chunk_size", 2)
+    monkeypatch.setattr(graph_version, "note_version", lambda version: version)
+    monkeypatch.setattr(graph_version, "note_changes", lambda version, ids: None)
+    session = _Session(fail_on_chunk=None)
+
+    change = writes.apply_batch(_batch(5), driver=_Driver(session))
+
+    assert change["version"] == 7
+    assert change["nodes_upserted"] == 5
+    assert change["complete"] is True
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Batched loader for large supply chain graphs.
+Sends rows as `UNWIND $rows AS row MERGE ...` in chunks, one managed write transaction per chunk.
+
+Input directory layout (CSV with a header row, or JSONL with one object per line):
+  nodes_<Label>.csv|jsonl      columns: id, name, and any other properties (tier, lat, lon, code, ...)
+  rels_<TYPE>.csv|jsonl        columns: from_id, to_id, from_label, to_label, and optional properties
+
+Run from project root with Neo4j up:
+  python data/bulk_load.py path/to/dir --chunk-size 5000 --workers 4
+Uses NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD from .env or environment.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+from neo4j import GraphDatabase
+
+load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+
+NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "supplymap-dev")
+
+NODE_LABELS = ("Company", "Supplier", "Factory", "Port", "Country")
+REL_TYPES = ("SUPPLIES_TO", "DEPENDS_ON", "SHIPS_VIA", "LOCATED_IN")
+DEFAULT_CHUNK_SIZE = 5000
+
+# CSV cells are strings; these properties are converted when read.
+_NUMERIC = {"lat": float, "lon": float, "tier": int, "volume": float}
+_REL_KEYS = ("from_id", "to_id", "from_label", "to_label")
+
+
+def chunked(rows, size: int):
+    """Yield lists of at most size rows."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _convert(row: dict) -> dict:
+    out = {}
+    for key, value in row.items():
+        if value == "" or value is None:
+            continue
+        out[key] = _NUMERIC[key](value) if key in _NUMERIC and isinstance(value, str) else value
+    return out
+
+
+def read_rows(path: Path):
+    """Yield dict rows from a .csv or .jsonl file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix == ".csv":
+            for row in csv.DictReader(f):
+                yield _convert(row)
+        else:
+            for line in f:
+                if line.strip():
+                    yield _convert(json.loads(line))
+
+
+def _check_label(label: str, allowed) -> str:
+    # Labels and relationship types cannot be query parameters, so only known names are interpolated.
+    if label not in allowed:
+        raise ValueError(f"unknown label or relationship type: {label!r}")
+    return label
+
+
+def _write_chunk(session, query: str, chunk: list) -> int:
+    return session.execute_write(lambda tx: tx.run(query, rows=chunk).single()["n"])
+
+
+def _write_chunks(driver, query: str, rows, chunk_size: int) -> int:
+    with driver.session() as session:
+        return sum(_write_chunk(session, query, chunk) for chunk in chunked(rows, chunk_size))
+
+
+def load_nodes(driver, label: str, rows, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """MERGE nodes by id and set all other row properties. Returns the number of nodes written."""
+    _check_label(label, NODE_LABELS)
+    query = f"UNWIND $rows AS row MERGE (n:{label} {{ id: row.id }}) SET n += row RETURN count(*) AS n"
+    return _write_chunks(driver, query, rows, chunk_size)
+
+
+def _relationship_query(rel_type: str, from_label: str, to_label: str) -> str:
+    return f"""
+    UNWIND $rows AS row
+    MATCH (a:{from_label} {{ id: row.from_id }})
+    MATCH (b:{to_label} {{ id: row.to_id }})
+    MERGE (a)-[r:{rel_type}]->(b)
+    SET r += row.props
+    RETURN count(*) AS n
+    """
+
+
+def load_relationships(driver, rel_type: str, rows, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """MERGE relationships between existing nodes. Rows carry from_id, to_id, from_label, to_label
+    and optional properties; rows are buffered per endpoint label pair and each buffer is written
+    as soon as it holds chunk_size rows. Returns the number of relationships written (rows whose
+    endpoints do not exist are skipped)."""
+    _check_label(rel_type, REL_TYPES)
+    buffers: dict[tuple[str, str], list[dict]] = {}
+    count = 0
+    with driver.session() as session:
+        for row in rows:
+            key = (_check_label(row["from_label"], NODE_LABELS), _check_label(row["to_label"], NODE_LABELS))
+            props = {k: v for k, v in row.items() if k not in _REL_KEYS}
+            buffer = buffers.setdefault(key, [])
+            buffer.append({"from_id": row["from_id"], "to_id": row["to_id"], "props": props})
+            if len(buffer) >= chunk_size:
+                count += _write_chunk(session, _relationship_query(rel_type, *key), buffer)
+                buffers[key] = []
+        for key, buffer in buffers.items():
+            if buffer:
+                count += _write_chunk(session, _relationship_query(rel_type, *key), buffer)
+    return count
+
+
+def bump_graph_version(driver) -> int:
+    """Increment the GraphMeta version marker so API caches and snapshots drop stale results."""
+    with driver.session() as session:
+        record = session.execute_write(
+            lambda tx: tx.run(
+                """
+                MERGE (m:GraphMeta { id: 'graph' })
+                SET m.version = coalesce(m.version, 0) + 1, m.updated_at = datetime()
+                RETURN m.version AS version
+                """
+            ).single()
+        )
+    return record["version"]
+
+
+def _timed(name: str, fn, *args) -> int:
+    t0 = time.perf_counter()
+    count = fn(*args)
+    elapsed = time.perf_counter() - t0
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"  {name:<12} {count:>10} rows  {elapsed:8.2f} s  {rate:10.0f} rows/s")
+    return count
+
+
+def load_graph(driver, nodes: dict, rels: dict, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1) -> int:
+    """Load {label: rows} nodes, then {rel_type: rows} relationships, one worker per label/type.
+
+    Relationships are loaded after all nodes, since their MATCH needs both endpoints.
+    Returns the total number of nodes and relationships written.
+    """
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        node_jobs = [pool.submit(_timed, label, load_nodes, driver, label, rows, chunk_size) for label, rows in nodes.items()]
+        total = sum(job.result() for job in node_jobs)
+        rel_jobs = [pool.submit(_timed, rel, load_relationships, driver, rel, rows, chunk_size) for rel, rows in rels.items()]
+        total += sum(job.result() for job in rel_jobs)
+    elapsed = time.perf_counter() - t0
+    print(f"  {'total':<12} {total:>10} rows  {elapsed:8.2f} s  {total / elapsed if elapsed > 0 else 0:10.0f} rows/s")
+    return total
+
+
+def read_input_dir(path: Path) -> tuple[dict, dict]:
+    """Collect nodes_<Label> and rels_<TYPE> files from a directory (rows are read lazily)."""
+    nodes, rels = {}, {}
+    for f in sorted(path.iterdir()):
+        if f.suffix not in (".csv", ".jsonl"):
+            continue
+        kind, _, name = f.stem.partition("_")
+        if kind == "nodes":
+            nodes[_check_label(name, NODE_LABELS)] = read_rows(f)
+        elif kind == "rels":
+            rels[_check_label(name, REL_TYPES)] = read_rows(f)
+    return nodes, rels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load nodes and relationships from CSV/JSONL files.")
+    parser.add_argument("input_dir", type=Path, help="directory with nodes_<Label> and rels_<TYPE> files")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="parallel workers (one label or type each)")
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        driver.verify_connectivity()
+    except Exception as e:
+        print("Neo4j connection failed. Is the DB running? (e.g. docker compose up -d)", file=sys.stderr)
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    try:
+        nodes, rels = read_input_dir(args.input_dir)
+        print(f"Loading {args.input_dir} (chunk size {args.chunk_size}, {args.workers} worker(s))...")
+        load_graph(driver, nodes, rels, args.chunk_size, args.workers)
+        print(f"Graph version {bump_graph_version(driver)}.")
+        print("Done.")
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic tiered supply chain graph of any size.
+Writes nodes_<Label>.jsonl / rels_<TYPE>.jsonl files for bulk_load.py, or loads them directly.
+
+Run from project root:
+  python data/generate_graph.py --suppliers 50000 --out data/generated
+  python data/generate_graph.py --suppliers 50000 --load --clear
+The same --seed always produces the same graph.
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+from pathlib import Path
+
+from bulk_load import (
+    DEFAULT_CHUNK_SIZE,
+    NEO4J_PASSWORD,
+    NEO4J_URI,
+    NEO4J_USER,
+    bump_graph_version,
+    load_graph,
+)
+
+
+def _tier_sizes(suppliers: int, tiers: int, growth: float) -> list[int]:
+    """Split suppliers across tiers so each tier is `growth` times larger than the one below it."""
+    weights = [growth ** t for t in range(tiers)]
+    sizes = [max(1, int(suppliers * w / sum(weights))) for w in weights]
+    sizes[-1] += suppliers - sum(sizes)
+    return sizes
+
+
+def _weighted_picker(rng: random.Random, ids: list[str], skew: float):
+    """Return a function picking k distinct ids, biased towards the start of ids when skew > 0 (hub suppliers)."""
+    # Cumulative once, so each pick is a bisect rather than a pass over the whole tier.
+    cum_weights = list(itertools.accumulate((i + 1) ** -skew for i in range(len(ids))))
+
+    def pick(k: int) -> list[str]:
+        k = min(k, len(ids))
+        if skew == 0:
+            return rng.sample(ids, k)
+        chosen: dict[str, None] = {}  # insertion-ordered, so the result does not depend on PYTHONHASHSEED
+        while len(chosen) < k:
+            chosen.update(dict.fromkeys(rng.choices(ids, cum_weights=cum_weights, k=k - len(chosen))))
+        return list(chosen)
+
+    return pick
+
+
+def generate(
+    companies: int = 20,
+    suppliers: int = 5000,
+    tiers: int = 4,
+    fan_out: int = 2,
+    hub_skew: float = 0.0,
+    tier_growth: float = 2.0,
+    countries: int = 30,
+    ports: int = 50,
+    port_density: float = 0.6,
+    factories: int = 100,
+    seed: int = 42,
+) -> tuple[dict, dict]:
+    """Return ({label: rows}, {rel_type: rows}) in the shape bulk_load.load_graph expects.
+
+    fan_out:      customers per supplier in the tier below (companies for tier 1).
+    hub_skew:     0 picks customers uniformly; higher values concentrate fan-in on a few hubs.
+    tier_growth:  size ratio between consecutive tiers.
+    port_density: share of suppliers that ship via a port.
+    """
+    rng = random.Random(seed)
+
+    def point():
+        return {"lat": round(rng.uniform(-50, 65), 4), "lon": round(rng.uniform(-170, 175), 4)}
+
+    country_rows = [{"id": f"gen_country_{i}", "name": f"Country {i}", "code": f"C{i:03d}", **point()} for i in range(countries)]
+    country_ids = [c["id"] for c in country_rows]
+    port_rows = [{"id": f"gen_port_{i}", "name": f"Port {i}", "code": f"P{i:04d}", **point()} for i in range(ports)]
+    company_rows = [{"id": f"gen_company_{i}", "name": f"Company {i}", **point()} for i in range(companies)]
+    factory_rows = [{"id": f"gen_factory_{i}", "name": f"Factory {i}", **point()} for i in range(factories)]
+
+    supplier_rows = []
+    by_tier: dict[int, list[str]] = {}
+    next_id = 0
+    for tier, size in enumerate(_tier_sizes(suppliers, tiers, tier_growth), start=1):
+        by_tier[tier] = []
+        for _ in range(size):
+            sid = f"gen_sup_{next_id}"
+            by_tier[tier].append(sid)
+            supplier_rows.append({"id": sid, "name": f"Supplier {next_id}", "tier": tier, **point()})
+            next_id += 1
+
+    def rel(from_id, from_label, to_id, to_label, **props):
+        return {"from_id": from_id, "to_id": to_id, "from_label": from_label, "to_label": to_label, **props}
+
+    supplies_to, depends_on = [], []
+    for tier, ids in by_tier.items():
+        customer_label = "Company" if tier == 1 else "Supplier"
+        customers = [c["id"] for c in company_rows] if tier == 1 else by_tier[tier - 1]
+        if not customers:
+            continue
+        pick = _weighted_picker(rng, customers, hub_skew)
+        for sid in ids:
+            for customer in pick(fan_out):
+                supplies_to.append(rel(sid, "Supplier", customer, customer_label, product="general", volume=rng.randint(1, 100)))
+                depends_on.append(rel(customer, customer_label, sid, "Supplier"))
+
+    ships_via = []
+    if port_rows:
+        port_ids = [p["id"] for p in port_rows]
+        for row in supplier_rows:
+            if rng.random() < port_density:
+                ships_via.append(rel(row["id"], "Supplier", rng.choice(port_ids), "Port"))
+        for row in factory_rows:
+            ships_via.append(rel(row["id"], "Factory", rng.choice(port_ids), "Port"))
+
+    located_in = []
+    if country_ids:
+        for label, rows in (("Port", port_rows), ("Company", company_rows), ("Supplier", supplier_rows), ("Factory", factory_rows)):
+            for row in rows:
+                located_in.append(rel(row["id"], label, rng.choice(country_ids), "Country"))
+
+    nodes = {
+        "Country": country_rows,
+        "Port": port_rows,
+        "Company": company_rows,
+        "Supplier": supplier_rows,
+        "Factory": factory_rows,
+    }
+    rels = {
+        "LOCATED_IN": located_in,
+        "SUPPLIES_TO": supplies_to,
+        "DEPENDS_ON": depends_on,
+        "SHIPS_VIA": ships_via,
+    }
+    return nodes, rels
+
+
+def write_jsonl(out_dir: Path, nodes: dict, rels: dict):
+    """Write one JSONL file per label and relationship type."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for prefix, groups in (("nodes", nodes), ("rels", rels)):
+        for name, rows in groups.items():
+            with open(out_dir / f"{prefix}_{name}.jsonl", "w", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic tiered supply chain graph.")
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--suppliers", type=int, default=5000)
+    parser.add_argument("--tiers", type=int, default=4)
+    parser.add_argument("--fan-out", type=int, default=2, help="customers per supplier")
+    parser.add_argument("--hub-skew", type=float, default=0.0, help="0 = uniform fan-in; >0 concentrates it on hubs")
+    parser.add_argument("--tier-growth", type=float, default=2.0, help="size ratio between consecutive tiers")
+    parser.add_argument("--countries", type=int, default=30)
+    parser.add_argument("--ports", type=int, default=50)
+    parser.add_argument("--port-density", type=float, default=0.6, help="share of suppliers shipping via a port")
+    parser.add_argument("--factories", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, help="write JSONL files to this directory")
+    parser.add_argument("--load", action="store_true", help="load into Neo4j")
+    parser.add_argument("--clear", action="store_true", help="with --load: delete the existing graph first")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    if not args.out and not args.load:
+        parser.error("give --out DIR and/or --load")
+
+    nodes, rels = generate(
+        companies=args.companies,
+        suppliers=args.suppliers,
+        tiers=args.tiers,
+        fan_out=args.fan_out,
+        hub_skew=args.hub_skew,
+        tier_growth=args.tier_growth,
+        countries=args.countries,
+        ports=args.ports,
+        port_density=args.port_density,
+        factories=args.factories,
+        seed=args.seed,
+    )
+    print(f"Generated {sum(map(len, nodes.values()))} nodes, {sum(map(len, rels.values()))} relationships.")
+    if args.out:
+        write_jsonl(args.out, nodes, rels)
+        print(f"Wrote {args.out}")
+    if args.load:
+        from neo4j import GraphDatabase
+
+        from seed_mock_data import clear_graph, run_schema
+
+        driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        try:
+            driver.verify_connectivity()
+        except Exception as e:
+            print("Neo4j connection failed. Is the DB running? (e.g. docker compose up -d)", file=sys.stderr)
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        try:
+            run_schema(driver)
+            if args.clear:
+                clear_graph(driver)
+            load_graph(driver, nodes, rels, args.chunk_size, args.workers)
+            print(f"Graph version {bump_graph_version(driver)}.")
+        finally:
+            driver.close()
+
+
+if __name__ == "__main__":
+    main()
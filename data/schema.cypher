@@ -38,3 +38,15 @@ FOR (n:Port) ON (n.lat, n.lon);
 
 CREATE INDEX country_code IF NOT EXISTS
 FOR (n:Country) ON (n.code);
+
+// Per-company tier distances written by `python -m app.services.tier_distance build`
+CREATE INDEX upstream_of_dist IF NOT EXISTS
+FOR ()-[r:UPSTREAM_OF]-() ON (r.dist);
+
+// ----- Graph version marker (bumped by every ingest; read by the API cache) -----
+CREATE CONSTRAINT graph_meta_id IF NOT EXISTS
+FOR (n:GraphMeta) REQUIRE n.id IS UNIQUE;
+
+// ----- Change log written by the graph batch API (one node per applied batch) -----
+CREATE CONSTRAINT graph_change_version IF NOT EXISTS
+FOR (n:GraphChange) REQUIRE n.version IS UNIQUE;
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Columnar graph snapshots: export every label and relationship type to Parquet (or Arrow IPC)
+files, and restore them with batched UNWIND writes or as `neo4j-admin database import` CSVs.
+
+Snapshot directory layout (same names as bulk_load.py inputs, one row per node/relationship):
+  nodes_<Label>.parquet|arrow  columns: id and every property stored on that label
+  rels_<TYPE>.parquet|arrow    columns: from_id, to_id, from_label, to_label and the properties
+  manifest.json                format, graph version, row counts and `consistent` (false if the
+                               graph version changed while the export ran)
+
+Rows are streamed from Neo4j and written in record batches, so memory stays flat however large
+the graph is. Column types come from the stored values (valueType); a property holding mixed
+INTEGER/FLOAT values is written as float, any other mix as string. Derived data (GraphMeta,
+GraphChange, UPSTREAM_OF) is not exported: the version is bumped on restore and tier distances
+are rebuilt by the backend job.
+
+Run from project root:
+  python data/snapshot_io.py export path/to/snapshot [--format arrow] [--workers 4]
+  python data/snapshot_io.py restore path/to/snapshot [--clear] [--chunk-size 5000 --workers 4]
+  python data/snapshot_io.py admin-csv path/to/snapshot path/to/import
+The admin-csv output holds CSVs with neo4j-admin headers and an import.sh running
+`neo4j-admin database import full` (offline; apply schema.cypher once the database is started).
+Uses NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD from .env or environment.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from neo4j import GraphDatabase
+
+from bulk_load import (
+    DEFAULT_CHUNK_SIZE,
+    NEO4J_PASSWORD,
+    NEO4J_URI,
+    NEO4J_USER,
+    NODE_LABELS,
+    REL_TYPES,
+    _check_label,
+    _timed,
+    bump_graph_version,
+    chunked,
+    load_graph,
+)
+
+DEFAULT_BATCH_SIZE = 50_000
+READ_VERSION_Q = "OPTIONAL MATCH (m:GraphMeta { id: 'graph' }) RETURN coalesce(m.version, 0) AS version"
+# Relationships first, so no single DETACH DELETE has to drop a hub's relationships at once.
+DELETE_RELS_Q = """
+MATCH ()-[r]->()
+WITH r LIMIT $limit
+DELETE r
+RETURN count(*) AS n
+"""
+DELETE_NODES_Q = """
+MATCH (n) WHERE NOT n:GraphMeta
+WITH n LIMIT $limit
+DETACH DELETE n
+RETURN count(*) AS n
+"""
+SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow"}
+_REL_COLUMNS = ("from_id", "to_id", "from_label", "to_label")
+
+# Neo4j valueType() names (without NOT NULL) -> Arrow types.
+_ARROW_TYPES = {
+    "INTEGER": pa.int64(),
+    "FLOAT": pa.float64(),
+    "STRING": pa.string(),
+    "BOOLEAN": pa.bool_(),
+    "LIST<INTEGER>": pa.list_(pa.int64()),
+    "LIST<FLOAT>": pa.list_(pa.float64()),
+    "LIST<STRING>": pa.list_(pa.string()),
+    "LIST<BOOLEAN>": pa.list_(pa.bool_()),
+}
+# Arrow types -> neo4j-admin header type suffixes.
+_ADMIN_TYPES = {
+    pa.int64(): ":long",
+    pa.float64(): ":double",
+    pa.bool_(): ":boolean",
+    pa.string(): "",
+    pa.list_(pa.int64()): ":long[]",
+    pa.list_(pa.float64()): ":double[]",
+    pa.list_(pa.string()): ":string[]",
+    pa.list_(pa.bool_()): ":boolean[]",
+}
+_ARRAY_DELIMITER = ";"
+
+
+# ----- Export -----
+
+
+def _arrow_type(value_types: list[str]) -> pa.DataType:
+    names = {t.replace(" NOT NULL", "") for t in value_types} - {"NULL"}
+    if names == {"INTEGER", "FLOAT"}:
+        names = {"FLOAT"}
+    if len(names) == 1 and (name := names.pop()) in _ARROW_TYPES:
+        return _ARROW_TYPES[name]
+    return pa.string()
+
+
+def _property_schema(session, pattern: str, var: str, leading=()) -> pa.Schema:
+    """Arrow schema of every property key found on the matched nodes or relationships."""
+    query = f"MATCH {pattern} UNWIND keys({var}) AS key RETURN key, collect(DISTINCT valueType({var}[key])) AS types"
+    types = {record["key"]: record["types"] for record in session.run(query)}
+    fields = [pa.field(name, pa.string()) for name in leading]
+    fields += [pa.field(key, _arrow_type(types[key])) for key in sorted(types) if key not in leading]
+    return pa.schema(fields)
+
+
+def _open_writer(path: Path, schema: pa.Schema, fmt: str):
+    if fmt == "parquet":
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    return pa.ipc.new_file(str(path), schema)
+
+
+def write_batches(path: Path, schema: pa.Schema, rows, fmt: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Write dict rows to one Parquet/Arrow file, batch_size rows per record batch. Returns the row count."""
+    # Temporal and mixed-type properties are exported as strings.
+    as_text = [f.name for f in schema if f.type == pa.string()]
+    count = 0
+    writer = _open_writer(path, schema, fmt)
+    try:
+        for chunk in chunked(rows, batch_size):
+            for row in chunk:
+                for key in as_text:
+                    value = row.get(key)
+                    if value is not None and not isinstance(value, str):
+                        row[key] = str(value)
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    finally:
+        writer.close()
+    return count
+
+
+def export_nodes(driver, label: str, out_dir: Path, fmt: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Stream all nodes of label into nodes_<Label>.<fmt>. Returns the number of rows written."""
+    _check_label(label, NODE_LABELS)
+    with driver.session() as session:
+        schema = _property_schema(session, f"(n:{label})", "n", leading=("id",))
+        records = session.run(f"MATCH (n:{label}) RETURN properties(n) AS props")
+        rows = (record["props"] for record in records)
+        return write_batches(out_dir / f"nodes_{label}{SUFFIXES[fmt]}", schema, rows, fmt, batch_size)
+
+
+def export_relationships(driver, rel_type: str, out_dir: Path, fmt: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Stream all relationships of rel_type into rels_<TYPE>.<fmt>. Returns the number of rows written."""
+    _check_label(rel_type, REL_TYPES)
+    query = f"""
+    MATCH (a)-[r:{rel_type}]->(b)
+    WHERE any(l IN labels(a) WHERE l IN $labels) AND any(l IN labels(b) WHERE l IN $labels)
+    RETURN a.id AS from_id, b.id AS to_id,
+           [l IN labels(a) WHERE l IN $labels][0] AS from_label,
+           [l IN labels(b) WHERE l IN $labels][0] AS to_label,
+           properties(r) AS props
+    """
+    with driver.session() as session:
+        schema = _property_schema(session, f"()-[r:{rel_type}]->()", "r", leading=_REL_COLUMNS)
+        records = session.run(query, labels=list(NODE_LABELS))
+        rows = ({**record["props"], **{k: record[k] for k in _REL_COLUMNS}} for record in records)
+        return write_batches(out_dir / f"rels_{rel_type}{SUFFIXES[fmt]}", schema, rows, fmt, batch_size)
+
+
+def _graph_version(driver) -> int:
+    with driver.session() as session:
+        return session.run(READ_VERSION_Q).single()["version"]
+
+
+def export_graph(driver, out_dir: Path, fmt: str = "parquet", batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1) -> dict:
+    """Export every label and relationship type (one worker each) and write manifest.json.
+
+    Labels and types are read in separate transactions, so a write landing meanwhile can leave
+    the files out of step with each other; the version is read again afterwards and the manifest
+    marked `consistent: false` (with `graph_version_end`) if it moved.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    version = _graph_version(driver)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        node_jobs = {
+            label: pool.submit(_timed, label, export_nodes, driver, label, out_dir, fmt, batch_size)
+            for label in NODE_LABELS
+        }
+        rel_jobs = {
+            rel: pool.submit(_timed, rel, export_relationships, driver, rel, out_dir, fmt, batch_size)
+            for rel in REL_TYPES
+        }
+        manifest = {
+            "format": fmt,
+            "graph_version": version,
+            "exported_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "nodes": {label: job.result() for label, job in node_jobs.items()},
+            "relationships": {rel: job.result() for rel, job in rel_jobs.items()},
+        }
+    end_version = _graph_version(driver)
+    manifest["consistent"] = end_version == version
+    if not manifest["consistent"]:
+        manifest["graph_version_end"] = end_version
+        print(f"  warning: graph changed during export (version {version} -> {end_version})", file=sys.stderr)
+    total = sum(manifest["nodes"].values()) + sum(manifest["relationships"].values())
+    elapsed = time.perf_counter() - t0
+    print(f"  {'total':<12} {total:>10} rows  {elapsed:8.2f} s  {total / elapsed if elapsed > 0 else 0:10.0f} rows/s")
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return manifest
+
+
+def clear_graph(driver, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Delete all nodes and relationships except the GraphMeta marker, chunk_size per transaction."""
+    deleted = 0
+    with driver.session() as session:
+        for query in (DELETE_RELS_Q, DELETE_NODES_Q):
+            while n := session.execute_write(lambda tx, q=query: tx.run(q, limit=chunk_size).single()["n"]):
+                deleted += n
+    return deleted
+
+
+# ----- Reading snapshots -----
+
+
+def read_batches(path: Path, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Yield record batches from a .parquet or .arrow file without loading it whole."""
+    if path.suffix == ".parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+        return
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def read_rows(path: Path, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Yield dict rows from a snapshot file; null columns are dropped, as empty CSV cells are in bulk_load."""
+    for batch in read_batches(path, batch_size):
+        for row in batch.to_pylist():
+            yield {key: value for key, value in row.items() if value is not None}
+
+
+def _snapshot_files(path: Path):
+    """(kind, label or type, file) for every nodes_/rels_ file in a snapshot directory."""
+    for f in sorted(path.iterdir()):
+        if f.suffix not in SUFFIXES.values():
+            continue
+        kind, _, name = f.stem.partition("_")
+        if kind == "nodes":
+            yield kind, _check_label(name, NODE_LABELS), f
+        elif kind == "rels":
+            yield kind, _check_label(name, REL_TYPES), f
+
+
+def _manifest_total(path: Path) -> int | None:
+    """Number of nodes and relationships the snapshot's manifest.json lists, or None without one."""
+    manifest_path = path / "manifest.json"
+    if not manifest_path.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    return sum(manifest["nodes"].values()) + sum(manifest["relationships"].values())
+
+
+def read_snapshot_dir(path: Path) -> tuple[dict, dict]:
+    """Collect nodes_<Label> and rels_<TYPE> files as bulk_load.load_graph input (rows are read lazily)."""
+    nodes, rels = {}, {}
+    for kind, name, f in _snapshot_files(path):
+        (nodes if kind == "nodes" else rels)[name] = read_rows(f)
+    return nodes, rels
+
+
+# ----- neo4j-admin import CSVs -----
+
+
+def _admin_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return _ARRAY_DELIMITER.join(_admin_cell(v) for v in value)
+    return value
+
+
+def _admin_header(schema: pa.Schema, skip=()) -> list[str]:
+    return [f"{f.name}{_ADMIN_TYPES.get(f.type, '')}" for f in schema if f.name not in skip]
+
+
+def _admin_nodes(label: str, src: Path, out_dir: Path) -> list[str]:
+    schema = _file_schema(src)
+    props = [f.name for f in schema if f.name != "id"]
+    name = f"nodes_{label}.csv"
+    with open(out_dir / name, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([f"id:ID({label})", *_admin_header(schema, skip=("id",))])
+        for batch in read_batches(src):
+            for row in batch.to_pylist():
+                writer.writerow([row["id"], *(_admin_cell(row[p]) for p in props)])
+    return [f"--nodes={label}={name}"]
+
+
+def _admin_relationships(rel_type: str, src: Path, out_dir: Path) -> list[str]:
+    # Node ids are only unique per label, so each (from_label, to_label) pair gets its own file
+    # whose START_ID/END_ID columns refer to that label's id space.
+    schema = _file_schema(src)
+    props = [f.name for f in schema if f.name not in _REL_COLUMNS]
+    header = _admin_header(schema, skip=_REL_COLUMNS)
+    files, writers = {}, {}
+    try:
+        for batch in read_batches(src):
+            for row in batch.to_pylist():
+                key = (row["from_label"], row["to_label"])
+                if key not in writers:
+                    name = f"rels_{rel_type}__{key[0]}__{key[1]}.csv"
+                    files[key] = (name, open(out_dir / name, "w", newline="", encoding="utf-8"))
+                    writers[key] = csv.writer(files[key][1])
+                    writers[key].writerow([f":START_ID({key[0]})", f":END_ID({key[1]})", *header])
+                writers[key].writerow([row["from_id"], row["to_id"], *(_admin_cell(row[p]) for p in props)])
+    finally:
+        for _, f in files.values():
+            f.close()
+    return [f"--relationships={rel_type}={name}" for name, _ in files.values()]
+
+
+def _file_schema(path: Path) -> pa.Schema:
+    if path.suffix == ".parquet":
+        return pq.read_schema(path)
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def write_admin_import(snapshot_dir: Path, out_dir: Path, database: str = "neo4j") -> Path:
+    """Convert a snapshot to neo4j-admin import CSVs plus an import.sh; returns the script path."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    args = []
+    for kind, name, f in _snapshot_files(snapshot_dir):
+        args += _admin_nodes(name, f, out_dir) if kind == "nodes" else _admin_relationships(name, f, out_dir)
+    script = out_dir / "import.sh"
+    lines = [
+        "#!/bin/sh",
+        "# Offline bulk import into an empty (or overwritten) database; stop Neo4j first.",
+        'cd "$(dirname "$0")"',
+        f"neo4j-admin database import full {database} --overwrite-destination \\",
+        *(f"  {arg} \\" for arg in args),
+        f"  --array-delimiter='{_ARRAY_DELIMITER}'",
+    ]
+    script.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    script.chmod(0o755)
+    return script
+
+
+# ----- CLI -----
+
+
+def _connect():
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        driver.verify_connectivity()
+    except Exception as e:
+        print("Neo4j connection failed. Is the DB running? (e.g. docker compose up -d)", file=sys.stderr)
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    return driver
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and restore columnar (Parquet/Arrow) graph snapshots.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="stream every label and relationship type to files")
+    export.add_argument("out_dir", type=Path)
+    export.add_argument("--format", choices=sorted(SUFFIXES), default="parquet")
+    export.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per record batch")
+    export.add_argument("--workers", type=int, default=1, help="parallel workers (one label or type each)")
+    restore = sub.add_parser("restore", help="load a snapshot with batched UNWIND writes")
+    restore.add_argument("snapshot_dir", type=Path)
+    restore.add_argument("--clear", action="store_true", help="delete the existing graph first")
+    restore.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    restore.add_argument("--workers", type=int, default=1)
+    admin = sub.add_parser("admin-csv", help="write neo4j-admin database import CSVs and import.sh")
+    admin.add_argument("snapshot_dir", type=Path)
+    admin.add_argument("out_dir", type=Path)
+    admin.add_argument("--database", default="neo4j")
+    args = parser.parse_args()
+
+    if args.command == "admin-csv":
+        script = write_admin_import(args.snapshot_dir, args.out_dir, args.database)
+        print(f"Wrote {args.out_dir}; run {script} with Neo4j stopped, then apply data/schema.cypher.")
+        return
+
+    driver = _connect()
+    try:
+        if args.command == "export":
+            print(f"Exporting to {args.out_dir} ({args.format}, {args.workers} worker(s))...")
+            manifest = export_graph(driver, args.out_dir, args.format, args.batch_size, args.workers)
+            if not manifest["consistent"]:
+                print("Graph was written to during the export; the snapshot may be inconsistent.", file=sys.stderr)
+                sys.exit(1)
+            print(f"Graph version {manifest['graph_version']} exported.")
+        else:
+            from seed_mock_data import run_schema
+
+            run_schema(driver)
+            if args.clear:
+                clear_graph(driver, args.chunk_size)
+            nodes, rels = read_snapshot_dir(args.snapshot_dir)
+            print(f"Restoring {args.snapshot_dir} (chunk size {args.chunk_size}, {args.workers} worker(s))...")
+            written = load_graph(driver, nodes, rels, args.chunk_size, args.workers)
+            print(f"Graph version {bump_graph_version(driver)}.")
+            expected = _manifest_total(args.snapshot_dir)
+            if expected is not None and written < expected:
+                print(
+                    f"Only {written} of {expected} rows were written (relationships whose endpoints are "
+                    "missing are skipped); the restore is partial.",
+                    file=sys.stderr,
+                )
+                sys.exit(1)
+        print("Done.")
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
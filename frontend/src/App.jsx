@@ -1,9 +1,12 @@
-import { useState, useEffect, useCallback } from "react";
-import { getCompanies, getSuppliers, getPorts, getSupplyChain, getImpact } from "./api/client";
+import { useState, useEffect, useCallback, useRef } from "react";
+import { getCompanies, getSuppliers, getPorts, getSupplyChain, getImpact, getNetwork } from "./api/client";
 import Controls from "./components/Controls";
 import SupplyMap from "./components/SupplyMap";
 import styles from "./App.module.css";
 
+const COMPANY_PAGE_SIZE = 200;
+const TARGET_PAGE_SIZE = 50;
+
 export default function App() {
   const [companies, setCompanies] = useState([]);
   const [suppliers, setSuppliers] = useState([]);
@@ -11,44 +14,80 @@ export default function App() {
   const [companyId, setCompanyId] = useState("");
   const [depth, setDepth] = useState(4);
   const [scenario, setScenario] = useState("");
+  const [weighted, setWeighted] = useState(false);
+  const [rollup, setRollup] = useState("");
   const [targetId, setTargetId] = useState("");
+  const [targetQuery, setTargetQuery] = useState("");
   const [nodes, setNodes] = useState([]);
   const [edges, setEdges] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [selectedNodeId, setSelectedNodeId] = useState(null);
+  // The submitted query (null = whole network) and the current map view; results are fetched
+  // for the visible viewport only and re-fetched as the map moves.
+  const [query, setQuery] = useState(null);
+  const [viewport, setViewport] = useState(null);
+  const [fit, setFit] = useState({ key: 0, bounds: null });
+  const requestSeq = useRef(0);
 
   useEffect(() => {
-    Promise.all([getCompanies(), getSuppliers(), getPorts()])
-      .then(([c, s, p]) => {
-        setCompanies(c);
-        setSuppliers(s);
-        setPorts(p);
-      })
+    getCompanies({ limit: COMPANY_PAGE_SIZE })
+      .then((page) => setCompanies(page.items))
       .catch((err) => setError(err.message));
   }, []);
 
-  const load = useCallback(async () => {
+  // Target dropdowns only hold one page of prefix matches for what has been typed so far.
+  useEffect(() => {
+    if (!scenario) return undefined;
+    const fetchPage = scenario === "supplier_failure" ? getSuppliers : getPorts;
+    const setItems = scenario === "supplier_failure" ? setSuppliers : setPorts;
+    const timer = setTimeout(() => {
+      fetchPage({ q: targetQuery, limit: TARGET_PAGE_SIZE })
+        .then((page) => setItems(page.items))
+        .catch((err) => setError(err.message));
+    }, 200);
+    return () => clearTimeout(timer);
+  }, [scenario, targetQuery]);
+
+  const fetchView = useCallback(async (q, view, refit) => {
+    if (!view) return;
+    const seq = ++requestSeq.current;
     setError(null);
     setLoading(true);
     try {
-      if (scenario && targetId) {
-        const res = await getImpact(scenario, targetId);
-        setNodes(res.nodes);
-        setEdges(res.edges);
-      } else if (companyId) {
-        const res = await getSupplyChain(companyId, depth);
-        setNodes(res.nodes);
-        setEdges(res.edges);
-      }
+      let res;
+      if (q?.scenario) res = await getImpact(q.scenario, q.targetId, view, q.weighted, q.rollup);
+      else if (q?.companyId) res = await getSupplyChain(q.companyId, q.depth, view, q.rollup);
+      else res = await getNetwork(view);
+      if (seq !== requestSeq.current) return;
+      setNodes(res.nodes);
+      setEdges(res.edges);
+      if (refit && res.bounds) setFit((f) => ({ key: f.key + 1, bounds: res.bounds }));
     } catch (err) {
+      if (seq !== requestSeq.current) return;
       setError(err.message);
       setNodes([]);
       setEdges([]);
     } finally {
-      setLoading(false);
+      if (seq === requestSeq.current) setLoading(false);
     }
-  }, [companyId, depth, scenario, targetId]);
+  }, []);
+
+  const load = useCallback(() => {
+    let q = null;
+    if (scenario && targetId) q = { scenario, targetId, weighted, rollup: rollup || null };
+    else if (companyId) q = { companyId, depth, rollup: rollup || null };
+    if (!q) return;
+    setQuery(q);
+    fetchView(q, viewport, true);
+  }, [companyId, depth, scenario, targetId, weighted, rollup, viewport, fetchView]);
+
+  // Re-fetch the current query (or the whole network) for the new viewport after a pan/zoom.
+  const queryRef = useRef(query);
+  queryRef.current = query;
+  useEffect(() => {
+    fetchView(queryRef.current, viewport, false);
+  }, [viewport, fetchView]);
 
   const exportJson = useCallback(() => {
     const blob = new Blob([JSON.stringify({ nodes, edges }, null, 2)], { type: "application/json" });
@@ -84,12 +123,18 @@ export default function App() {
         companyId={companyId}
         depth={depth}
         scenario={scenario}
+        weighted={weighted}
+        rollup={rollup}
         targetId={targetId}
+        targetQuery={targetQuery}
         loading={loading}
         onCompanyChange={setCompanyId}
         onDepthChange={setDepth}
         onScenarioChange={setScenario}
+        onWeightedChange={setWeighted}
+        onRollupChange={setRollup}
         onTargetChange={setTargetId}
+        onTargetQueryChange={setTargetQuery}
         onLoad={load}
       />
       {error && (
@@ -101,7 +146,7 @@ export default function App() {
         <span>
           {nodes.length > 0 ? (
             <span className={styles.stateMessage}>
-              Showing {nodes.length} nodes · {edges.length} connections
+              {query ? "Showing" : "Whole network:"} {nodes.length} nodes · {edges.length} connections in view
             </span>
           ) : (
             <span className={styles.stateHint}>
@@ -124,8 +169,11 @@ export default function App() {
         <SupplyMap
           nodes={nodes}
           edges={edges}
+          bounds={fit.bounds}
+          fitKey={fit.key}
           selectedNodeId={selectedNodeId}
           onNodeSelect={setSelectedNodeId}
+          onViewportChange={setViewport}
         />
       </main>
     </div>
@@ -1,8 +1,8 @@
 const API_BASE = import.meta.env.VITE_API_URL || "";
 
-async function fetchJson(path, options = {}) {
+async function fetchJson(path, { headers, ...options } = {}) {
   const res = await fetch(`${API_BASE}${path}`, {
-    headers: { "Content-Type": "application/json", ...options.headers },
+    headers: { "Content-Type": "application/json", ...headers },
     ...options,
   });
   if (!res.ok) {
@@ -12,28 +12,166 @@ async function fetchJson(path, options = {}) {
   return res.json();
 }
 
-export async function getCompanies() {
-  return fetchJson("/api/companies");
+function pageQuery({ q, after, limit } = {}) {
+  const params = new URLSearchParams();
+  if (q) params.set("q", q);
+  if (after) params.set("after", after);
+  if (limit) params.set("limit", String(limit));
+  const qs = params.toString();
+  return qs ? `?${qs}` : "";
 }
 
-export async function getSuppliers() {
-  return fetchJson("/api/suppliers");
+/** List endpoints return { items, next_after }; pass next_after back as `after` for the next page. */
+export async function getCompanies(page) {
+  return fetchJson(`/api/companies${pageQuery(page)}`);
 }
 
-export async function getPorts() {
-  return fetchJson("/api/ports");
+export async function getSuppliers(page) {
+  return fetchJson(`/api/suppliers${pageQuery(page)}`);
 }
 
-export async function getSupplyChain(companyId, depth = 4) {
-  return fetchJson("/api/supply-chain", {
+export async function getPorts(page) {
+  return fetchJson(`/api/ports${pageQuery(page)}`);
+}
+
+const COLUMNAR = "application/vnd.supplymap.columnar+json";
+
+// Last payload and ETag per graph request, so an unchanged result is answered with a bodiless 304.
+const etagCache = new Map();
+const ETAG_CACHE_SIZE = 32;
+
+async function fetchGraph(path, body) {
+  const key = `${path} ${body}`;
+  const cached = etagCache.get(key);
+  const res = await fetch(`${API_BASE}${path}`, {
     method: "POST",
-    body: JSON.stringify({ company_id: companyId, depth }),
+    headers: {
+      "Content-Type": "application/json",
+      Accept: COLUMNAR,
+      ...(cached ? { "If-None-Match": cached.etag } : {}),
+    },
+    body,
   });
+  if (res.status === 304 && cached) return cached.payload;
+  if (!res.ok) {
+    const text = await res.text();
+    throw new Error(text || `HTTP ${res.status}`);
+  }
+  const payload = await res.json();
+  const etag = res.headers.get("ETag");
+  etagCache.delete(key);
+  if (etag) {
+    etagCache.set(key, { etag, payload });
+    if (etagCache.size > ETAG_CACHE_SIZE) etagCache.delete(etagCache.keys().next().value);
+  }
+  return payload;
+}
+
+/** Expand a columnar-v1 payload into { nodes, edges } row objects. */
+export function fromColumnar(payload) {
+  const { nodes: n, edges: e, node_types: nodeTypes, edge_types: edgeTypes } = payload;
+  const nodes = n.id.map((id, i) => ({
+    id,
+    name: n.name[i],
+    type: nodeTypes[n.type[i]],
+    tier: n.tier[i],
+    company_tier: n.company_tier?.[i] ?? undefined,
+    lat: n.lat[i],
+    lon: n.lon[i],
+    count: n.count?.[i] ?? undefined,
+    sources: n.sources?.[i] ?? undefined,
+    exposure: n.exposure?.[i] ?? undefined,
+    tier_counts: n.tier_counts?.[i] ?? undefined,
+  }));
+  const edges = [];
+  for (let i = 0; i < e.type.length; i++) {
+    const from = e.from[i];
+    const to = e.to[i];
+    if (from < 0 || to < 0) continue;
+    edges.push({ from_id: n.id[from], to_id: n.id[to], type: edgeTypes[e.type[i]], count: e.count?.[i] ?? undefined });
+  }
+  return { nodes, edges, bounds: payload.bounds ?? null };
+}
+
+/**
+ * With a viewport ({ min_lat, min_lon, max_lat, max_lon, zoom }), only nodes inside it are
+ * returned, clustered at low zoom, plus `bounds` of the whole result. With rollup ("country" or
+ * "port"), nodes are grouped into one node per Country/Port carrying `count` and `tier_counts`.
+ */
+export async function getSupplyChain(companyId, depth = 4, viewport = null, rollup = null) {
+  const payload = await fetchGraph("/api/supply-chain", JSON.stringify({ company_id: companyId, depth, rollup, viewport }));
+  return fromColumnar(payload);
 }
 
-export async function getImpact(scenario, targetId) {
-  return fetchJson("/api/impact", {
+/**
+ * Merged supply chains of several companies; each node's `sources` lists the companies it supplies.
+ */
+export async function getPortfolio(companyIds, depth, viewport = null) {
+  const payload = await fetchGraph("/api/supply-chain/portfolio", JSON.stringify({ company_ids: companyIds, depth, viewport }));
+  return fromColumnar(payload);
+}
+
+/**
+ * With weighted, each node carries `exposure`: the share of its supply lost (0..1). Rollup works
+ * as for getSupplyChain.
+ */
+export async function getImpact(scenario, targetId, viewport = null, weighted = false, rollup = null) {
+  const payload = await fetchGraph("/api/impact", JSON.stringify({ scenario, target_id: targetId, weighted, rollup, viewport }));
+  return fromColumnar(payload);
+}
+
+/**
+ * Combined impact of several targets, e.g. [{ kind: "port", id }, { kind: "country", id }].
+ * Each node's `sources` lists the target ids that reach it.
+ */
+export async function getCompoundImpact(targets, viewport = null) {
+  const payload = await fetchGraph("/api/impact/compound", JSON.stringify({ targets, viewport }));
+  return fromColumnar(payload);
+}
+
+/**
+ * Next hop from the frontier node ids, without the ids already known. Returns
+ * { nodes, edges, frontier }; pass frontier back in to grow the chain another tier.
+ * direction: "upstream" (suppliers) or "downstream" (impact).
+ */
+export async function expandGraph(frontier, known = [], direction = "upstream") {
+  const payload = await fetchGraph("/api/expand", JSON.stringify({ frontier, known, direction }));
+  return { ...fromColumnar(payload), frontier: payload.frontier };
+}
+
+/** Whole network inside the viewport (clustered at low zoom). */
+export async function getNetwork(viewport) {
+  const params = new URLSearchParams(Object.entries(viewport).map(([k, v]) => [k, String(v)]));
+  const payload = await fetchJson(`/api/network?${params}`, { headers: { Accept: COLUMNAR } });
+  return fromColumnar(payload);
+}
+
+/**
+ * Stream a supply chain (or impact, when scenario is set) as NDJSON.
+ * Calls onItem({ node }) / onItem({ edge }) for each line as it arrives.
+ */
+export async function streamGraph({ companyId, depth = 4, scenario, targetId }, onItem) {
+  const [path, body] = scenario
+    ? ["/api/impact", { scenario, target_id: targetId }]
+    : ["/api/supply-chain", { company_id: companyId, depth }];
+  const res = await fetch(`${API_BASE}${path}?stream=true`, {
     method: "POST",
-    body: JSON.stringify({ scenario, target_id: targetId }),
+    headers: { "Content-Type": "application/json", Accept: "application/x-ndjson" },
+    body: JSON.stringify(body),
   });
+  if (!res.ok) {
+    const text = await res.text();
+    throw new Error(text || `HTTP ${res.status}`);
+  }
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.filter(Boolean).forEach((line) => onItem(JSON.parse(line)));
+  }
+  if (buffer.trim()) onItem(JSON.parse(buffer));
 }
@@ -8,12 +8,18 @@ export default function Controls({
   companyId,
   depth,
   scenario,
+  weighted,
+  rollup,
   targetId,
+  targetQuery,
   loading,
   onCompanyChange,
   onDepthChange,
   onScenarioChange,
+  onWeightedChange,
+  onRollupChange,
   onTargetChange,
+  onTargetQueryChange,
   onLoad,
 }) {
   const [showImpact, setShowImpact] = useState(false);
@@ -58,6 +64,19 @@ export default function Controls({
           ))}
         </select>
       </div>
+      <div className={styles.row}>
+        <label className={styles.label}>Group by</label>
+        <select
+          className={styles.select}
+          value={rollup}
+          onChange={(e) => onRollupChange(e.target.value)}
+          disabled={loading}
+        >
+          <option value="">No grouping</option>
+          <option value="country">Country</option>
+          <option value="port">Port</option>
+        </select>
+      </div>
       {!showImpact ? (
         <div className={styles.row}>
           <button
@@ -78,6 +97,7 @@ export default function Controls({
               onChange={(e) => {
                 onScenarioChange(e.target.value);
                 onTargetChange("");
+                onTargetQueryChange("");
               }}
               disabled={loading}
             >
@@ -89,6 +109,14 @@ export default function Controls({
           {scenario === "supplier_failure" && (
             <div className={styles.row}>
               <label className={styles.label}>Which supplier</label>
+              <input
+                type="search"
+                className={styles.select}
+                placeholder="Search by name"
+                value={targetQuery}
+                onChange={(e) => onTargetQueryChange(e.target.value)}
+                disabled={loading}
+              />
               <select
                 className={styles.select}
                 value={targetId}
@@ -107,6 +135,14 @@ export default function Controls({
           {scenario === "port_closure" && (
             <div className={styles.row}>
               <label className={styles.label}>Which port</label>
+              <input
+                type="search"
+                className={styles.select}
+                placeholder="Search by name"
+                value={targetQuery}
+                onChange={(e) => onTargetQueryChange(e.target.value)}
+                disabled={loading}
+              />
               <select
                 className={styles.select}
                 value={targetId}
@@ -122,6 +158,19 @@ export default function Controls({
               </select>
             </div>
           )}
+          {scenario && (
+            <div className={styles.row}>
+              <label className={styles.checkbox}>
+                <input
+                  type="checkbox"
+                  checked={weighted}
+                  onChange={(e) => onWeightedChange(e.target.checked)}
+                  disabled={loading}
+                />
+                Weight by volume
+              </label>
+            </div>
+          )}
           <div className={styles.row}>
             <button
               type="button"
@@ -1,6 +1,5 @@
 import { useMemo, useEffect } from "react";
-import { MapContainer, TileLayer, CircleMarker, Popup, Tooltip, Polyline, useMap } from "react-leaflet";
-import L from "leaflet";
+import { MapContainer, TileLayer, CircleMarker, Popup, Tooltip, Polyline, useMap, useMapEvents } from "react-leaflet";
 import { getNodeColor } from "../utils/tierColors";
 import Legend from "./Legend";
 import "leaflet/dist/leaflet.css";
@@ -8,17 +7,99 @@ import "leaflet/dist/leaflet.css";
 const WORLD_CENTER = [20, 0];
 const WORLD_ZOOM = 2;
 
-function FitBounds({ nodes }) {
+const clamp = (v, lo, hi) => Math.min(hi, Math.max(lo, v));
+// Longitude folded into [-180, 180); a box crossing the antimeridian then has min_lon > max_lon.
+const wrap = (lon) => ((((lon + 180) % 360) + 360) % 360) - 180;
+
+/** Fit the map to [min_lat, min_lon, max_lat, max_lon] each time fitKey changes. */
+function FitBounds({ bounds, fitKey }) {
   const map = useMap();
-  const withCoords = useMemo(() => nodes.filter((n) => n.lat != null && n.lon != null), [nodes]);
   useEffect(() => {
-    if (withCoords.length === 0) return;
-    const bounds = L.latLngBounds(withCoords.map((n) => [n.lat, n.lon]));
-    map.fitBounds(bounds, { padding: [40, 40], maxZoom: 10 });
-  }, [map, withCoords]);
+    if (!bounds) return;
+    const [minLat, minLon, maxLat, maxLon] = bounds;
+    map.fitBounds(
+      [
+        [minLat, minLon],
+        [maxLat, maxLon],
+      ],
+      { padding: [40, 40], maxZoom: 10 }
+    );
+    // Only refit for a new query, not when the same query is re-fetched for a new viewport.
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [map, fitKey]);
   return null;
 }
 
+/** Report the visible bounding box and zoom after every pan/zoom (and once on mount). */
+function ViewportWatcher({ onViewportChange }) {
+  const report = (map) => {
+    const b = map.getBounds();
+    const wholeWorld = b.getEast() - b.getWest() >= 360;
+    onViewportChange?.({
+      min_lat: clamp(b.getSouth(), -90, 90),
+      min_lon: wholeWorld ? -180 : wrap(b.getWest()),
+      max_lat: clamp(b.getNorth(), -90, 90),
+      max_lon: wholeWorld ? 180 : wrap(b.getEast()),
+      zoom: map.getZoom(),
+    });
+  };
+  const map = useMapEvents({ moveend: () => report(map) });
+  useEffect(() => {
+    report(map);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [map]);
+  return null;
+}
+
+function ClusterMarker({ node }) {
+  const map = useMap();
+  return (
+    <CircleMarker
+      center={[node.lat, node.lon]}
+      radius={Math.min(24, 8 + 3 * Math.log2(node.count))}
+      pathOptions={{ fillColor: getNodeColor(node), color: "#fff", weight: 1.5, fillOpacity: 0.75 }}
+      eventHandlers={{ click: () => map.setView([node.lat, node.lon], map.getZoom() + 2) }}
+    >
+      <Tooltip direction="top" offset={[0, -8]} opacity={0.95}>
+        <strong>{node.count} locations</strong>
+        <br />
+        Click to zoom in
+      </Tooltip>
+    </CircleMarker>
+  );
+}
+
+function GroupMarker({ node, isSelected, onNodeSelect }) {
+  const tiers = Object.entries(node.tier_counts || {});
+  return (
+    <CircleMarker
+      center={[node.lat, node.lon]}
+      radius={Math.min(24, 8 + 3 * Math.log2(1 + node.count))}
+      pathOptions={{
+        fillColor: getNodeColor(node),
+        color: isSelected ? "#0f172a" : "#fff",
+        weight: isSelected ? 3 : 1.5,
+        fillOpacity: 0.8,
+      }}
+      eventHandlers={{ click: () => onNodeSelect?.(isSelected ? null : node.id) }}
+    >
+      <Tooltip direction="top" offset={[0, -8]} opacity={0.95}>
+        <strong>{node.name}</strong>
+        <br />
+        {node.count} node{node.count !== 1 ? "s" : ""}
+        {tiers.map(([tier, n]) => (
+          <span key={tier}>
+            <br />
+            <span style={{ fontSize: "11px", color: "#64748b" }}>
+              Tier {tier}: {n} supplier{n !== 1 ? "s" : ""}
+            </span>
+          </span>
+        ))}
+      </Tooltip>
+    </CircleMarker>
+  );
+}
+
 function NodeMarkers({ nodes, edges, nodeById, selectedNodeId, onNodeSelect }) {
   const suppliesToByNode = useMemo(() => {
     const m = {};
@@ -34,9 +115,16 @@ function NodeMarkers({ nodes, edges, nodeById, selectedNodeId, onNodeSelect }) {
   return nodes
     .filter((n) => n.lat != null && n.lon != null)
     .map((node) => {
+      if (node.type === "Cluster") return <ClusterMarker key={node.id} node={node} />;
+      if (node.tier_counts) {
+        return <GroupMarker key={node.id} node={node} isSelected={selectedNodeId === node.id} onNodeSelect={onNodeSelect} />;
+      }
       const suppliesTo = suppliesToByNode[node.id];
       const suppliesLine = suppliesTo?.length ? `Supplies to: ${suppliesTo.slice(0, 3).join(", ")}${suppliesTo.length > 3 ? "…" : ""}` : null;
+      const exposureLine = node.exposure != null ? `Supply lost: ${Math.round(node.exposure * 100)}%` : null;
       const isSelected = selectedNodeId === node.id;
+      const tier = node.company_tier > 0 ? node.company_tier : node.tier;
+      const tierLabel = tier != null ? ` · Tier ${tier}` : "";
       return (
         <CircleMarker
           key={node.id}
@@ -54,25 +142,37 @@ function NodeMarkers({ nodes, edges, nodeById, selectedNodeId, onNodeSelect }) {
             <strong>{node.name}</strong>
             <br />
             {node.type}
-            {node.tier != null ? ` · Tier ${node.tier}` : ""}
+            {tierLabel}
             {suppliesLine && (
               <>
                 <br />
                 <span style={{ fontSize: "11px", color: "#64748b" }}>{suppliesLine}</span>
               </>
             )}
+            {exposureLine && (
+              <>
+                <br />
+                <span style={{ fontSize: "11px", color: "#b91c1c" }}>{exposureLine}</span>
+              </>
+            )}
           </Tooltip>
           <Popup>
             <strong>{node.name}</strong>
             <br />
             {node.type}
-            {node.tier != null ? ` · Tier ${node.tier}` : ""}
+            {tierLabel}
             {suppliesLine && (
               <>
                 <br />
                 <span style={{ fontSize: "11px", color: "#64748b" }}>{suppliesLine}</span>
               </>
             )}
+            {exposureLine && (
+              <>
+                <br />
+                <span style={{ fontSize: "11px", color: "#b91c1c" }}>{exposureLine}</span>
+              </>
+            )}
           </Popup>
         </CircleMarker>
       );
@@ -101,7 +201,7 @@ function EdgePolylines({ edges, nodeById, selectedNodeId }) {
           positions={positions}
           pathOptions={{
             color: isHighlighted ? (isRisk ? "#b91c1c" : "#0f172a") : isRisk ? "#b91c1c" : "#64748b",
-            weight: isHighlighted ? 4 : 2,
+            weight: (isHighlighted ? 4 : 2) + (e.count > 1 ? Math.min(4, Math.log2(e.count)) : 0),
             opacity: isHighlighted ? 0.95 : 0.4,
           }}
         />
@@ -109,15 +209,13 @@ function EdgePolylines({ edges, nodeById, selectedNodeId }) {
     });
 }
 
-export default function SupplyMap({ nodes = [], edges = [], selectedNodeId, onNodeSelect }) {
+export default function SupplyMap({ nodes = [], edges = [], bounds, fitKey, selectedNodeId, onNodeSelect, onViewportChange }) {
   const nodeById = useMemo(() => {
     const map = {};
     nodes.forEach((n) => (map[n.id] = n));
     return map;
   }, [nodes]);
 
-  const hasData = nodes.length > 0;
-
   return (
     <div className="supply-map" style={{ width: "100%", height: "100%", minHeight: 400 }}>
       <MapContainer
@@ -130,7 +228,8 @@ export default function SupplyMap({ nodes = [], edges = [], selectedNodeId, onNo
           attribution='&copy; <a href="https://carto.com/attributions">CARTO</a>'
           url="https://{s}.basemaps.cartocdn.com/light_all/{z}/{x}/{y}{r}.png"
         />
-        {hasData && <FitBounds nodes={nodes} />}
+        <FitBounds bounds={bounds} fitKey={fitKey} />
+        <ViewportWatcher onViewportChange={onViewportChange} />
         <NodeMarkers
           nodes={nodes}
           edges={edges}
@@ -1,8 +1,10 @@
 /**
- * Marker color by node type and tier (for map and legend).
+ * Marker color by node type and tier (for map and legend). Supply-chain results color suppliers
+ * by their tier for the selected company (`company_tier`) when the backend provides it.
  */
 export function getNodeColor(node) {
-  const { type, tier } = node;
+  const { type } = node;
+  const tier = node.company_tier ?? node.tier;
   if (type === "Company") return "#0f172a";
   if (type === "Supplier" && tier != null) {
     const tierColors = { 1: "#15803d", 2: "#1d4ed8", 3: "#c2410c", 4: "#b91c1c" };
@@ -11,6 +13,7 @@ export function getNodeColor(node) {
   if (type === "Port") return "#64748b";
   if (type === "Factory") return "#475569";
   if (type === "Country") return "#94a3b8";
+  if (type === "Cluster") return "#7c3aed";
   return "#64748b";
 }
 
@@ -22,4 +25,5 @@ export const LEGEND_ITEMS = [
   { label: "Tier 4", color: "#b91c1c" },
   { label: "Port", color: "#64748b" },
   { label: "Factory", color: "#475569" },
+  { label: "Cluster", color: "#7c3aed" },
 ];